@@ -0,0 +1,214 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cleaning_pipeline import CleaningPipeline, DEFAULT_STAGES
+from synthetic_gsaf import SIZES, make_synthetic_gsaf
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+CHAIN_NAME = "CleaningPipeline"
+
+def peak_rss_mb():
+    """
+    Devuelve la memoria residente máxima (peak RSS) del proceso hasta el momento.
+
+    :return: Megabytes o None si no se puede medir en esta plataforma.
+    """
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux devuelve kilobytes y macOS bytes
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 1e6
+    except (ImportError, AttributeError):
+        return None
+
+def _measure(rows, elapsed):
+    """
+    Construye el registro de una medición.
+
+    :param rows: Filas de entrada.
+    :param elapsed: Tiempo de reloj en segundos.
+    :return: Diccionario con el tiempo, las filas por segundo y el peak RSS.
+    """
+    return {
+        "wall_time_s": round(elapsed, 4),
+        "rows_per_s": round(rows / elapsed) if elapsed > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def benchmark_stages(rows, repeat=3, seed=0):
+    """
+    Mide cada etapa de DEFAULT_STAGES sobre la salida de la etapa anterior.
+    El tiempo es el mejor de 'repeat' ejecuciones; el peak RSS es el del
+    proceso tras la etapa (crece de forma monótona).
+
+    :param rows: Número de filas sintéticas.
+    :param repeat: Número de repeticiones por etapa.
+    :param seed: Semilla del generador.
+    :return: Diccionario {etapa: medición}.
+    """
+    df = make_synthetic_gsaf(rows, seed=seed)
+    results = {}
+
+    for cleaner_class, method_name in DEFAULT_STAGES:
+        best = None
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                cleaner = cleaner_class(df, copy=False)
+                getattr(cleaner, method_name)()
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            result = cleaner.get_cleaned_data()
+        results[cleaner_class.__name__] = _measure(len(df), best)
+        if result is not None:
+            df = result
+    return results
+
+def benchmark_chain(rows, repeat=3, seed=0):
+    """
+    Mide la cadena completa con CleaningPipeline.
+
+    :param rows: Número de filas sintéticas.
+    :param repeat: Número de repeticiones.
+    :param seed: Semilla del generador.
+    :return: Medición de la cadena.
+    """
+    df = make_synthetic_gsaf(rows, seed=seed)
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            CleaningPipeline(df).run()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return _measure(rows, best)
+
+def run_isolated(function, *args):
+    """
+    Ejecuta una función de benchmark en un proceso nuevo, para que el peak RSS
+    de cada medición no incluya la memoria de las anteriores.
+
+    :param function: benchmark_stages o benchmark_chain.
+    :param args: Argumentos de la función.
+    :return: Resultado de la función.
+    """
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(function, args)
+
+def run_benchmarks(sizes, repeat=3):
+    """
+    Mide todas las etapas y la cadena completa para cada tamaño.
+
+    :param sizes: Lista de números de filas.
+    :param repeat: Número de repeticiones de cada medición.
+    :return: Diccionario {filas: {etapa: medición}}.
+    """
+    results = {}
+    for rows in sizes:
+        print(f"🔹 Midiendo {rows} filas...")
+        results[str(rows)] = run_isolated(benchmark_stages, rows, repeat)
+        results[str(rows)][CHAIN_NAME] = run_isolated(benchmark_chain, rows, repeat)
+    return results
+
+def compare_with_baseline(results, baseline, tolerance=0.25, min_delta=0.05):
+    """
+    Busca las etapas que han empeorado respecto a la línea base.
+
+    :param results: Resultados de run_benchmarks().
+    :param baseline: Resultados guardados en baseline.json.
+    :param tolerance: Empeoramiento relativo permitido del tiempo (0.25 = 25%).
+    :param min_delta: Diferencia mínima en segundos para considerar una regresión
+                      (evita falsos positivos por ruido en etapas muy rápidas).
+    :return: Lista de textos con las regresiones encontradas.
+    """
+    regressions = []
+    for rows, stages in results.items():
+        for stage, measurement in stages.items():
+            reference = baseline.get("results", {}).get(rows, {}).get(stage)
+            if reference is None:
+                continue
+            current, previous = measurement["wall_time_s"], reference["wall_time_s"]
+            if current > previous * (1 + tolerance) and current - previous > min_delta:
+                regressions.append(f"{stage} con {rows} filas: {previous:.3f}s -> {current:.3f}s")
+    return regressions
+
+def format_results(results):
+    """
+    Convierte los resultados en una tabla.
+
+    :param results: Resultados de run_benchmarks().
+    :return: DataFrame con una fila por tamaño y etapa.
+    """
+    records = [
+        {"rows": int(rows), "stage": stage, **measurement}
+        for rows, stages in results.items()
+        for stage, measurement in stages.items()
+    ]
+    return pd.DataFrame(records).set_index(["rows", "stage"])
+
+def main(argv=None):
+    """
+    Ejecuta los benchmarks desde la línea de comandos.
+
+    :param argv: Argumentos (por defecto los de sys.argv).
+    :return: 0 si no hay regresiones, 1 si alguna etapa ha empeorado.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks de los limpiadores con datos GSAF sintéticos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES[:3],
+                        help=f"Números de filas (por defecto {SIZES[:3]}; {SIZES[-1]} también está disponible).")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición (se guarda la mejor).")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Archivo JSON con la línea base.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento relativo permitido.")
+    parser.add_argument("--update-baseline", action="store_true", help="Guarda los resultados como nueva línea base.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, repeat=args.repeat)
+    print(format_results(results).to_string())
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        baseline = {
+            "machine": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "cpu_count": os.cpu_count(),
+            },
+            "results": results,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2)
+        print(f"✅ Línea base guardada en {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare_with_baseline(results, baseline, tolerance=args.tolerance)
+    if regressions:
+        for regression in regressions:
+            print(f"❌ Regresión: {regression}")
+        return 1
+    print("✅ Ninguna etapa ha empeorado respecto a la línea base.")
+    return 0
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from country_cleaner import country_mapping
+from species_cleaner import SPECIES_MAPPING
+from time_cleaner import SAMPLE_TIMES
+
+# Vocabularios sucios tal y como aparecen en el GSAF (y en los ejemplos de los limpiadores)
+TYPES = ["Unprovoked", " Provoked", "?", "Sea Disaster", "Invalid", "Boat", "Watercraft",
+         "Unconfirmed", "Unverified", "Under investigation", "Questionable", None]
+SEXES = ["F", " M", "M ", "M", "M x 2", "N", "lli", ".", "F", None]
+FATALS = ["N", "Y", "M", "n", None, "Nq", "F", "UNKNOWN", 2017, "Y x 2", " N", "N ", "y"]
+YEARS = list(range(1900, 2026)) + [0, 5, np.nan, "1990", "2015."]
+ACTIVITIES = ["Swimming", " Swimming", "Surfing", "Swimming ", "Fishing", "Spearfishing",
+              "Wading", "Snorkeling", "Diving", "Scuba diving", "Standing", "Body boarding",
+              "Kayaking", "Fell overboard", None]
+SPECIES = list(SPECIES_MAPPING) + ["?", "Invalid", "No shark involvement",
+                                   "Shark involvement not confirmed", "Questionable", None]
+# Países que se añaden a las claves del mapeo de países (que se lee al generar los datos)
+COUNTRIES = ["USA", "AUSTRALIA", "SOUTH AFRICA", "BRAZIL", "BAHAMAS",
+             "MEXICO", "NEW ZEALAND", "EGYPT", "Fiji", "SOUTH AFRICA ", None]
+STATES = ["Florida", "New South Wales", "Queensland", "Hawaii", "California", "KwaZulu-Natal",
+          "Western Cape Province", "Western Australia", "South Carolina", "North Carolina", None]
+AGES = ["16", "17", "18", "20", "25", "35", "50", "20s", "30s", "30 or 40", "teen", "Teens",
+        "18 months", "6½", "adult", "middle-age", "60's", None]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+DATE_PREFIXES = ["", "", "", "", "Reported ", "Before ", "Ca. "]
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+def make_synthetic_gsaf(rows, seed=0):
+    """
+    Genera un DataFrame con la forma del GSAF original (mismos nombres de
+    columnas sin limpiar) y valores sacados de los vocabularios sucios reales.
+    Alrededor del 1% de los 'Case Number' están repetidos.
+
+    :param rows: Número de filas.
+    :param seed: Semilla del generador aleatorio.
+    :return: DataFrame de Pandas.
+    """
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return np.asarray(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+    years = rng.integers(1900, 2026, rows)
+    days = rng.integers(1, 29, rows)
+    months = rng.integers(0, 12, rows)
+    dates = pd.Series(pick(DATE_PREFIXES)) + pd.Series(days).map("{:02d}".format) + "-" \
+        + pd.Series(np.asarray(MONTHS)[months]) + "-" + pd.Series(years).astype(str)
+
+    case_numbers = (pd.Series(years).astype(str) + "." + pd.Series(months + 1).map("{:02d}".format)
+                    + "." + pd.Series(np.arange(rows)).astype(str)).to_numpy(dtype=object)
+    # Las filas repetidas copian el 'Case Number' completo de otra fila no repetida
+    # (copiar solo el número no basta: el año y el mes de cada fila son distintos)
+    repeated = rng.random(rows) < 0.01
+    originals = np.flatnonzero(~repeated)
+    case_numbers[repeated] = case_numbers[originals[rng.integers(0, len(originals), repeated.sum())]]
+
+    return pd.DataFrame({
+        "Date": dates.to_numpy(),
+        "Year": pick(YEARS),
+        "Type": pick(TYPES),
+        "Country": pick(list(country_mapping()) + COUNTRIES),
+        "State": pick(STATES),
+        "Location": pick(["Beach", "Reef", "Harbour", "Bay", None]),
+        "Activity": pick(ACTIVITIES),
+        "Name": pick(["male", "female", "boy", "John Smith", "Unknown", None]),
+        "Sex": pick(SEXES),
+        "Age": pick(AGES),
+        "Injury": pick(["No injury", "Laceration to leg", "FATAL", "Bitten on foot", None]),
+        "Fatal Y/N": pick(FATALS),
+        "Time": pick(SAMPLE_TIMES),
+        "Species ": pick(SPECIES),
+        "Source": pick(["GSAF", "Todd Smith", "B. Myatt, GSAF", None]),
+        "Case Number": case_numbers,
+    })
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    for size in SIZES[:2]:
+        df = make_synthetic_gsaf(size)
+        print(f"✅ {size} filas generadas ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB).")
+    print(df.head())
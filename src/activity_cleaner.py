@@ -1,45 +1,106 @@
 import pandas as pd
 
+from data_exporter import DataExporter
+from group_imputer import GroupImputer
+from imputation_stats import count_values, mode_from_counts
+from value_mapper import ValueMapper
+
 class ActivityCleaner:
     """
     Clase para limpiar la columna 'activity' del DataFrame.
     """
 
-    def __init__(self, df):
+    column = "activity"
+
+    def __init__(self, df, copy=True):
         """
         Inicializa la clase con un DataFrame.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
 
-    def clean_activity_column(self):
+    def clean_activity_column(self, fill_value=None, group_by=None):
         """
         Limpia la columna 'activity':
         - Rellena nulos con la moda
         - Elimina espacios en blanco al inicio y final
         - Normaliza valores comunes
+
+        :param fill_value: Valor de relleno ya calculado (por ejemplo, sobre todo el archivo
+                           en StreamingCleaner). Por defecto se calcula sobre esta columna.
+        :param group_by: Niveles de agrupación para rellenar con la moda de cada grupo
+                         (ver GroupImputer; por ejemplo, IMPUTATION_LEVELS). fill_value
+                         queda como valor para las filas sin grupo con datos suficientes.
         """
         if "activity" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
-
-            # Función de limpieza con apply()
-            def clean_value(value):
-                if pd.isna(value):
-                    return None  # Convertimos valores problemáticos a NaN
-                return str(value).strip()  # Eliminamos espacios extra
-
-            self.cleaned_df["activity"] = self.cleaned_df["activity"].apply(clean_value)
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            activity = self.clean_values(self.cleaned_df["activity"])
 
             # Rellenar valores nulos con la moda
-            mode_value = self.cleaned_df["activity"].mode()[0]
-            self.cleaned_df["activity"] = self.cleaned_df["activity"].fillna(mode_value)
+            if fill_value is None:
+                fill_value = self.fill_value_from_statistics(self.collect_statistics(activity))
+            if group_by is not None:
+                fill_value = GroupImputer(group_by).fill_values(activity, self.cleaned_df, fallback=fill_value)
+            self.cleaned_df["activity"] = self.fill_missing(activity, fill_value)
 
             print("✅ Columna 'activity' limpiada.")
         else:
             print("❌ La columna 'activity' no existe en el DataFrame.")
 
+    @staticmethod
+    def clean_values(activity):
+        """
+        Limpia los valores de 'activity' sin rellenar los nulos.
+
+        :param activity: Serie de Pandas con los valores originales.
+        :return: Serie limpia.
+        """
+        # Función de limpieza (se aplica una sola vez por valor distinto)
+        def clean_value(value):
+            if pd.isna(value):
+                return None  # Convertimos valores problemáticos a NaN
+            return str(value).strip()  # Eliminamos espacios extra
+
+        return ValueMapper(clean_value).map(activity)
+
+    @staticmethod
+    def collect_statistics(values):
+        """
+        Calcula la estadística parcial de la columna limpia (conteos para la moda).
+
+        :param values: Serie devuelta por clean_values().
+        :return: Serie con el número de apariciones por valor.
+        """
+        return count_values(values)
+
+    @staticmethod
+    def fill_value_from_statistics(statistics):
+        """
+        Calcula el valor de relleno a partir de las estadísticas (combinadas) de la columna.
+
+        :param statistics: Conteos devueltos por collect_statistics().
+        :return: La moda.
+        """
+        return mode_from_counts(statistics)
+
+    @staticmethod
+    def fill_missing(values, fill_value):
+        """
+        Rellena los valores nulos con el valor indicado.
+
+        :param values: Serie devuelta por clean_values().
+        :param fill_value: Valor de relleno (si es None no se rellena).
+        :return: Serie rellenada.
+        """
+        if fill_value is None:
+            return values
+        return values.fillna(fill_value)
+
     def get_cleaned_data(self):
         """
         Devuelve el DataFrame con la columna 'activity' limpia.
@@ -48,14 +109,16 @@ class ActivityCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
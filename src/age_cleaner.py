@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+from data_exporter import DataExporter
+
+# Edad máxima que se acepta (el resto se considera un error de captura)
+MAX_AGE = 120
+
+# Palabras que equivalen a una edad aproximada
+AGE_WORDS = {"teen": 15, "teens": 15}
+
+# Edades en meses ('18 months', '2 to 3 months'): se convierten a años cumplidos
+AGE_MONTHS = r"^(\d+)(?:\s*(?:to|or|-)\s*(\d+))?\s*months?\b"
+
+# Décadas ('20s', "60's", 'mid-30s'): el centro de la década, o el principio o el final si se indica
+AGE_DECADES = r"^(?:(early|mid|late)[\s\-]*)?(\d)0\s*'?s\b"
+DECADE_OFFSETS = {"early": 2, "mid": 5, "late": 8}
+
+# Intervalos y alternativas ('30 or 40', '16 to 18'): la media de los dos valores
+AGE_RANGES = r"^(\d+)\s*(?:or|to|-)\s*(\d+)$"
+
+# Cualquier otro número ('6½', 'Ca. 33', '28 & 22'): el primero que aparezca (la primera víctima)
+AGE_NUMBER = r"(\d+)"
+
+# Intervalos de edad para la columna 'age_band' (límite inferior incluido)
+AGE_BANDS = {
+    "bins": [0, 13, 18, 30, 45, 60, MAX_AGE + 1],
+    "labels": ["0-12", "13-17", "18-29", "30-44", "45-59", "60+"],
+}
+
+class AgeCleaner:
+    """
+    Clase para limpiar la columna 'age' del DataFrame.
+    """
+
+    column = "age"
+
+    def __init__(self, df, copy=True):
+        """
+        Inicializa la clase con un DataFrame.
+
+        :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        """
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
+        self.cleaned_df = None
+
+    def clean_age_column(self, bands=AGE_BANDS):
+        """
+        Limpia la columna 'age':
+        - Convierte los valores a edades enteras (Int8)
+        - Interpreta décadas ('20s'), intervalos ('30 or 40'), meses ('18 months'),
+          fracciones ('6½') y palabras ('teen')
+        - Añade 'age_band' (categoría ordenada) si se indican intervalos
+
+        :param bands: Diccionario con 'bins' y 'labels' para 'age_band' (None para no añadirla).
+        """
+        if "age" in self.original_df.columns:
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            age = self.clean_values(self.cleaned_df["age"])
+
+            self.cleaned_df["age"] = age
+            if bands is not None:
+                self.cleaned_df["age_band"] = self.age_bands(age, bands)
+
+            print(f"✅ Columna 'age' limpiada: {age.notna().sum()} edades válidas.")
+        else:
+            print("❌ La columna 'age' no existe en el DataFrame.")
+
+    @staticmethod
+    def clean_values(ages):
+        """
+        Convierte los valores de 'age' a edades enteras analizando una sola vez
+        cada valor distinto.
+
+        :param ages: Serie de Pandas con los valores originales.
+        :return: Serie Int8 con el mismo índice (nula si no hay edad válida).
+        """
+        codes, uniques = pd.factorize(ages)
+        parsed = AgeCleaner.parse_values(pd.Series(np.asarray(uniques, dtype=object), dtype=object))
+
+        # La última posición guarda el resultado para los nulos (código -1)
+        results = np.append(parsed.to_numpy(dtype=float), np.nan)
+        return pd.Series(results[codes], index=ages.index, name=ages.name).astype("Int8")
+
+    @staticmethod
+    def parse_values(values):
+        """
+        Analiza valores distintos. Los números se aceptan tal
+        cual (truncados); en los textos se prueban en orden los meses, las
+        décadas, los intervalos, las palabras y por último el primer número.
+
+        :param values: Serie de Pandas con valores distintos y no nulos.
+        :return: Serie de floats con la edad (NaN si no hay edad válida).
+        """
+        age = pd.to_numeric(values, errors="coerce").astype(float)
+        text = values.astype(str).str.strip().str.lower().where(age.isna())
+
+        months = text.str.extract(AGE_MONTHS).astype(float)
+        age = age.fillna(months.mean(axis=1) // 12)
+
+        decades = text.str.extract(AGE_DECADES)
+        offsets = decades[0].map(DECADE_OFFSETS).astype(float).fillna(5)
+        age = age.fillna(decades[1].astype(float) * 10 + offsets)
+
+        ranges = text.str.extract(AGE_RANGES).astype(float)
+        age = age.fillna(ranges.mean(axis=1))
+
+        age = age.fillna(text.str.strip("\"'()?!. ").map(AGE_WORDS).astype(float))
+        age = age.fillna(text.str.extract(AGE_NUMBER, expand=False).astype(float))
+
+        age = np.floor(age)
+        return age.where((age >= 0) & (age <= MAX_AGE))
+
+    @staticmethod
+    def age_bands(ages, bands=AGE_BANDS):
+        """
+        Agrupa las edades en intervalos.
+
+        :param ages: Serie de edades limpias.
+        :param bands: Diccionario con 'bins' (límites) y 'labels' (nombres de los intervalos).
+        :return: Serie categórica ordenada.
+        """
+        return pd.cut(ages.astype(float), bins=bands["bins"], labels=bands["labels"], right=False)
+
+    def get_cleaned_data(self):
+        """
+        Devuelve el DataFrame con la columna 'age' limpia.
+
+        :return: DataFrame limpio.
+        """
+        return self.cleaned_df
+
+    def save_cleaned_data(self, output_path, **options):
+        """
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
+
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
+        """
+        if self.cleaned_df is not None:
+            DataExporter(self.cleaned_df).save(output_path, **options)
+            print(f"✅ Datos limpios guardados en {output_path}")
+        else:
+            print("❌ No hay datos limpios para guardar.")
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "age": [25, "19", "20s", "mid-30s", "30 or 40", "16 to 18", "Teen", "18 months", "6½",
+                "28 & 22", "Ca. 33", "adult", None, 12.5, "!!", 200],
+    })
+
+    cleaner = AgeCleaner(sample_data)
+    cleaner.clean_age_column()
+    print(pd.concat([sample_data["age"].rename("original"), cleaner.get_cleaned_data()], axis=1))
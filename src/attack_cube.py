@@ -0,0 +1,255 @@
+import numpy as np
+import pandas as pd
+
+from dtype_optimizer import INTEGER_COLUMNS
+from file_cache import atomic_write
+
+# Dimensiones del cubo (las columnas por las que agrupa el análisis exploratorio)
+CUBE_DIMENSIONS = ("country", "state", "year", "month", "species", "type", "sex")
+
+# Medidas que se acumulan en cada celda
+CUBE_MEASURES = ("attacks", "fatal")
+
+class AttackCube:
+    """
+    Clase con un cubo de agregación de los ataques, para responder a los
+    groupby del análisis sin volver a recorrer los datos.
+
+    Cada dimensión guarda sus etiquetas una sola vez (incluido el valor nulo) y
+    el cubo solo guarda las celdas no vacías en formato COO: una matriz de
+    códigos enteros (una columna por dimensión) y un array por medida con el
+    número de ataques y de ataques fatales de cada celda. Los agregados y los
+    filtros se calculan con NumPy sobre esas celdas y el resultado de cada
+    consulta se guarda hasta que el cubo cambia.
+    """
+
+    def __init__(self, df=None, dimensions=CUBE_DIMENSIONS):
+        """
+        Inicializa el cubo y, si se indica, añade las filas de un DataFrame.
+
+        :param df: DataFrame limpio (opcional). Si no tiene 'month', se obtiene de 'date'.
+        :param dimensions: Columnas que forman las dimensiones del cubo.
+        """
+        self.dimensions = list(dimensions)
+        self.labels = {dimension: pd.Index([], dtype=object) for dimension in self.dimensions}
+        self.coords = np.empty((0, len(self.dimensions)), dtype=np.int32)
+        self.measures = {measure: np.empty(0, dtype=np.int64) for measure in CUBE_MEASURES}
+        self.results = {}
+        if df is not None:
+            self.append(df)
+
+    def append(self, df):
+        """
+        Añade filas al cubo (las celdas existentes se suman, no se recalcula el resto).
+
+        :param df: DataFrame limpio con las dimensiones del cubo y 'fatal'.
+        :return: El propio cubo.
+        """
+        if "month" in self.dimensions and "month" not in df.columns:
+            df = df.assign(month=pd.to_datetime(df["date"], errors="coerce", format="mixed").dt.month)
+
+        coords = np.empty((len(df), len(self.dimensions)), dtype=np.int32)
+        for position, dimension in enumerate(self.dimensions):
+            codes, uniques = pd.factorize(df[dimension], use_na_sentinel=False)
+            labels = self.labels[dimension]
+            new_labels = uniques[labels.get_indexer(uniques) < 0]
+            if len(new_labels):
+                labels = self.labels[dimension] = pd.Index(
+                    np.concatenate([labels.to_numpy(dtype=object), np.asarray(new_labels, dtype=object)]), dtype=object)
+            coords[:, position] = labels.get_indexer(uniques)[codes]
+
+        fatal = pd.to_numeric(df["fatal"], errors="coerce").fillna(0).to_numpy(dtype=np.int64) \
+            if "fatal" in df.columns else np.zeros(len(df), dtype=np.int64)
+        self._merge(
+            np.concatenate([self.coords, coords]),
+            {
+                "attacks": np.concatenate([self.measures["attacks"], np.ones(len(df), dtype=np.int64)]),
+                "fatal": np.concatenate([self.measures["fatal"], fatal]),
+            },
+        )
+        return self
+
+    def rollup(self, dimensions=(), measure="attacks", dropna=True, **filters):
+        """
+        Suma una medida agrupando por las dimensiones indicadas, como
+        df[filtros].groupby(dimensiones).size() (o .sum() de 'fatal').
+
+        :param dimensions: Dimensión o lista de dimensiones del resultado (vacía para el total).
+        :param measure: 'attacks' o 'fatal'.
+        :param dropna: Si es True se excluyen los grupos con etiquetas nulas, como en groupby.
+        :param filters: Filtros por dimensión: un valor o una lista de valores (country="USA").
+        :return: Serie indexada por las dimensiones (o un entero si no hay dimensiones).
+        """
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        key = (tuple(dimensions), measure, dropna, self._filters_key(filters))
+        if key in self.results:
+            return self.results[key]
+
+        mask = self._mask(filters)
+        values = self.measures[measure][mask]
+        if not dimensions:
+            result = int(values.sum())
+        else:
+            positions = [self.dimensions.index(dimension) for dimension in dimensions]
+            coords = self.coords[mask][:, positions]
+            if dropna:
+                valid = np.ones(len(coords), dtype=bool)
+                for column, dimension in enumerate(dimensions):
+                    valid &= ~self.labels[dimension].isna()[coords[:, column]]
+                coords, values = coords[valid], values[valid]
+
+            shape = [len(self.labels[dimension]) for dimension in dimensions]
+            cells, inverse = np.unique(np.ravel_multi_index(coords.T, shape), return_inverse=True)
+            totals = np.bincount(inverse, weights=values, minlength=len(cells)).astype(np.int64)
+            codes = np.unravel_index(cells, shape)
+            if len(dimensions) == 1:
+                index = pd.Index(self._labels(dimensions[0], codes[0]), name=dimensions[0])
+            else:
+                index = pd.MultiIndex.from_arrays(
+                    [self._labels(dimension, code) for dimension, code in zip(dimensions, codes)], names=dimensions)
+            result = pd.Series(totals, index=index, name=measure).sort_index()
+
+        self.results[key] = result
+        return result
+
+    def slice(self, **filters):
+        """
+        Devuelve un cubo nuevo solo con las celdas que cumplen los filtros.
+
+        :param filters: Filtros por dimensión: un valor o una lista de valores.
+        :return: AttackCube con las mismas dimensiones y etiquetas.
+        """
+        mask = self._mask(filters)
+        cube = AttackCube(dimensions=self.dimensions)
+        cube.labels = dict(self.labels)
+        cube.coords = self.coords[mask]
+        cube.measures = {measure: values[mask] for measure, values in self.measures.items()}
+        return cube
+
+    def to_frame(self):
+        """
+        Devuelve las celdas no vacías del cubo como DataFrame.
+
+        :return: DataFrame con una columna por dimensión y por medida.
+        """
+        frame = pd.DataFrame({
+            dimension: self._labels(dimension, self.coords[:, position])
+            for position, dimension in enumerate(self.dimensions)
+        })
+        for measure, values in self.measures.items():
+            frame[measure] = values
+        return frame
+
+    def save(self, output_path):
+        """
+        Guarda el cubo en disco (escritura atómica).
+
+        :param output_path: Ruta del archivo (.pkl).
+        """
+        content = {
+            "dimensions": self.dimensions,
+            "labels": {dimension: labels.to_numpy() for dimension, labels in self.labels.items()},
+            "coords": self.coords,
+            "measures": self.measures,
+        }
+        atomic_write(output_path, lambda path: pd.to_pickle(content, path))
+        print(f"✅ Cubo de {len(self.coords)} celdas guardado en {output_path}")
+
+    @staticmethod
+    def load(input_path):
+        """
+        Lee un cubo guardado con save().
+
+        :param input_path: Ruta del archivo.
+        :return: AttackCube.
+        """
+        content = pd.read_pickle(input_path)
+        cube = AttackCube(dimensions=content["dimensions"])
+        cube.labels = {dimension: pd.Index(labels, dtype=object) for dimension, labels in content["labels"].items()}
+        cube.coords = content["coords"]
+        cube.measures = content["measures"]
+        return cube
+
+    def _merge(self, coords, measures):
+        """
+        Junta las celdas repetidas sumando sus medidas y ordena las celdas.
+
+        :param coords: Matriz de códigos (una fila por celda, con posibles repetidas).
+        :param measures: Diccionario {medida: array} alineado con coords.
+        """
+        shape = [max(len(self.labels[dimension]), 1) for dimension in self.dimensions]
+        if np.prod(shape, dtype=float) >= 2 ** 63:
+            raise ValueError(f"Demasiadas combinaciones de etiquetas para el cubo: {shape}")
+
+        cells, inverse = np.unique(np.ravel_multi_index(coords.T, shape), return_inverse=True)
+        self.coords = np.stack(np.unravel_index(cells, shape), axis=1).astype(np.int32)
+        self.measures = {
+            measure: np.bincount(inverse, weights=values, minlength=len(cells)).astype(np.int64)
+            for measure, values in measures.items()
+        }
+        self.results = {}
+
+    def _labels(self, dimension, codes):
+        """
+        Etiquetas de una dimensión para unos códigos. Las etiquetas se guardan como
+        object; las de 'year' y 'month' se devuelven con el entero compacto de
+        DtypeOptimizer (Int16, Int8) para que coincidan con los datos optimizados.
+
+        :param dimension: Nombre de la dimensión.
+        :param codes: Array de códigos.
+        :return: Index de etiquetas.
+        """
+        labels = self.labels[dimension][codes]
+        if dimension in INTEGER_COLUMNS:
+            try:
+                return labels.astype(INTEGER_COLUMNS[dimension])
+            except (TypeError, ValueError):
+                pass  # Etiquetas que no son enteras: se dejan como object
+        return labels
+
+    def _mask(self, filters):
+        """
+        Calcula qué celdas cumplen los filtros.
+
+        :param filters: Diccionario {dimensión: valor o lista de valores}.
+        :return: Array booleano con una posición por celda.
+        """
+        mask = np.ones(len(self.coords), dtype=bool)
+        for dimension, value in filters.items():
+            if dimension not in self.dimensions:
+                raise ValueError(f"Dimensión no soportada: {dimension}. Usa una de {self.dimensions}")
+            values = list(value) if isinstance(value, (list, tuple, set, range)) else [value]
+            codes = self.labels[dimension].get_indexer(pd.Index(values, dtype=object))
+            mask &= np.isin(self.coords[:, self.dimensions.index(dimension)], codes[codes >= 0])
+        return mask
+
+    @staticmethod
+    def _filters_key(filters):
+        """
+        Convierte los filtros en una clave para la caché de resultados.
+
+        :param filters: Diccionario {dimensión: valor o lista de valores}.
+        :return: Tupla ordenada.
+        """
+        return tuple(sorted(
+            (dimension, tuple(value) if isinstance(value, (list, tuple, set, range)) else value)
+            for dimension, value in filters.items()
+        ))
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    import time
+
+    df = pd.read_excel("../data/processed/GSAF5_cleaned.xlsx", engine="openpyxl")
+    cube = AttackCube(df.iloc[:-100])
+    cube.append(df.iloc[-100:])
+    print(f"✅ Cubo con {len(cube.coords)} celdas para {cube.rollup()} ataques.")
+
+    print(cube.rollup("country").sort_values(ascending=False).head())
+    print(cube.rollup("species", measure="fatal").sort_values(ascending=False))
+    print(cube.rollup("state", country="USA").sort_values(ascending=False).head())
+
+    cube.rollup("month", year=range(2000, 2025))
+    start = time.perf_counter()
+    cube.rollup("month", year=range(2000, 2025))
+    print(f"🔹 Consulta repetida en {(time.perf_counter() - start) * 1e6:.0f} µs")
@@ -0,0 +1,162 @@
+import pandas as pd
+
+from data_exporter import DataExporter
+from column_cleaner import ColumnCleaner
+from type_cleaner import TypeCleaner
+from sex_cleaner import SexCleaner
+from country_cleaner import CountryCleaner
+from fatal_cleaner import FatalCleaner
+from time_cleaner import TimeCleaner
+from species_cleaner import SpeciesCleaner
+from date_cleaner import DateCleaner
+from year_cleaner import YearCleaner
+from activity_cleaner import ActivityCleaner
+from age_cleaner import AgeCleaner
+from duplicates_cleaner import DuplicatesCleaner
+from dtype_optimizer import DtypeOptimizer
+from instrumentation import metrics
+from rule_pack import load_rule_pack
+
+# Orden de las etapas tal y como se encadenan en notebooks/main.ipynb,
+# más la conversión final a tipos compactos
+DEFAULT_STAGES = [
+    (ColumnCleaner, "clean_columns"),
+    (TypeCleaner, "clean_type_column"),
+    (SexCleaner, "clean_sex_column"),
+    (CountryCleaner, "clean_country_column"),
+    (FatalCleaner, "clean_fatal_column"),
+    (TimeCleaner, "clean_time_column"),
+    (SpeciesCleaner, "clean_species_column"),
+    (DateCleaner, "clean_date_column"),
+    (YearCleaner, "clean_year_column"),
+    (ActivityCleaner, "clean_activity_column"),
+    (AgeCleaner, "clean_age_column"),
+    (DuplicatesCleaner, "remove_duplicates"),
+    (DtypeOptimizer, "optimize_dtypes"),
+]
+
+
+class CleaningPipeline:
+    """
+    Clase para encadenar los limpiadores de src sobre un único DataFrame de trabajo.
+
+    Cada etapa recibe el DataFrame sin copiarlo (copy=False): las columnas que
+    no cambian se comparten entre etapas y solo se crean de nuevo las columnas
+    que la etapa limpia.
+    """
+
+    def __init__(self, df, stages=None, keep_snapshots=False, group_by=None, rules=None):
+        """
+        Inicializa la clase con un DataFrame y la lista ordenada de etapas.
+
+        :param df: DataFrame de Pandas con los datos originales (no se modifica).
+        :param stages: Lista de tuplas (clase limpiadora, nombre del método de limpieza).
+                       Por defecto se usan las etapas de DEFAULT_STAGES.
+        :param keep_snapshots: Si es True guarda una copia del DataFrame tras cada etapa
+                               para depuración (aumenta el consumo de memoria).
+        :param group_by: Niveles de agrupación para rellenar los nulos con la moda o la media
+                         de cada grupo en las etapas que imputan (ver GroupImputer). Por
+                         defecto se usa un único valor global.
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas) para las
+                      etapas que tienen reglas. Por defecto el de config/rules.json.
+        """
+        self.original_df = df
+        self.stages = list(stages) if stages is not None else list(DEFAULT_STAGES)
+        self.keep_snapshots = keep_snapshots
+        self.group_by = group_by
+        self.rules = load_rule_pack(rules)
+        self.snapshots = {}
+        self.cleaned_df = None
+
+    def run(self):
+        """
+        Ejecuta las etapas en orden sobre el mismo DataFrame de trabajo.
+        Si una etapa no produce datos (por ejemplo, falta su columna) se
+        continúa con el DataFrame de la etapa anterior. Si el registro de
+        métricas está activo (instrumentation.metrics), cada etapa se mide.
+        """
+        working_df = self.original_df
+        self.snapshots = {}
+
+        for cleaner_class, method_name in self.stages:
+            result = metrics.run_stage(cleaner_class, method_name, working_df,
+                                       cleaner_options=self._cleaner_options(cleaner_class),
+                                       **self._stage_options(cleaner_class))
+            if result is not None:
+                working_df = result
+
+            if self.keep_snapshots:
+                self.snapshots[cleaner_class.__name__] = working_df.copy()
+
+        self.cleaned_df = working_df
+        print(f"✅ Pipeline de limpieza completado ({len(self.stages)} etapas).")
+
+    def _cleaner_options(self, cleaner_class):
+        """
+        Argumentos del constructor de una etapa: el paquete de reglas si la etapa tiene reglas.
+
+        :param cleaner_class: Clase limpiadora.
+        :return: Diccionario de argumentos.
+        """
+        return {"rules": self.rules} if hasattr(cleaner_class, "rule_section") else {}
+
+    def _stage_options(self, cleaner_class):
+        """
+        Argumentos del método de limpieza de una etapa: los niveles de agrupación
+        si se indicaron y la etapa imputa nulos.
+
+        :param cleaner_class: Clase limpiadora.
+        :return: Diccionario de argumentos.
+        """
+        return {"group_by": self.group_by} \
+            if self.group_by is not None and hasattr(cleaner_class, "collect_statistics") else {}
+
+    def get_snapshot(self, stage_name):
+        """
+        Devuelve la copia del DataFrame guardada tras una etapa.
+
+        :param stage_name: Nombre de la clase limpiadora (por ejemplo, 'TimeCleaner').
+        :return: DataFrame o None si no se guardaron copias.
+        """
+        return self.snapshots.get(stage_name)
+
+    def get_cleaned_data(self):
+        """
+        Devuelve el DataFrame tras ejecutar todas las etapas.
+
+        :return: DataFrame limpio.
+        """
+        return self.cleaned_df
+
+    def save_cleaned_data(self, output_path, **options):
+        """
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
+
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
+        """
+        if self.cleaned_df is not None:
+            DataExporter(self.cleaned_df).save(output_path, **options)
+            print(f"✅ Datos limpios guardados en {output_path}")
+        else:
+            print("❌ No hay datos limpios para guardar.")
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "Case Number": ["A001", "A002", "A002", "A003"],
+        "Type": ["Unprovoked", " Provoked", " Provoked", "?"],
+        "Sex": ["M", "F ", "F ", "lli"],
+        "Country": ["ENGLAND", "USA", "USA", "REUNION"],
+        "Fatal Y/N": ["N", "Y", "Y", None],
+        "Time": ["14h00", "Morning", "Morning", None],
+        "Species ": ["White shark", "6' shark", "6' shark", "?"],
+        "Year": [2020, 2021, 2021, 0],
+        "Activity": ["Surfing", " Swimming", " Swimming", None],
+    })
+
+    pipeline = CleaningPipeline(sample_data, keep_snapshots=True)
+    pipeline.run()
+    print(pipeline.get_cleaned_data())
+    print(pipeline.get_snapshot("TimeCleaner")["time"].unique())
@@ -0,0 +1,240 @@
+import argparse
+import sys
+
+# Solo se importa la librería estándar al arrancar: pandas, pyarrow, matplotlib y
+# cartopy se importan dentro de cada subcomando, así que '--help' es inmediato y
+# 'clean' nunca carga las librerías de los mapas
+
+def main(argv=None):
+    """
+    Punto de entrada de 'shark-eda'.
+
+    :param argv: Lista de argumentos (por defecto sys.argv[1:]).
+    :return: Código de salida (0 si todo ha ido bien).
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.metrics or args.verbose:
+        from instrumentation import metrics
+
+        if args.metrics:
+            metrics.configure(sink=None if args.metrics == "-" else args.metrics)
+        metrics.quiet = not args.verbose
+
+    try:
+        return args.handler(args)
+    except ImportError as error:
+        print(f"❌ Falta una dependencia opcional para '{args.command}': {error.name}")
+        return 1
+    except (ValueError, OSError) as error:
+        print(f"❌ {error}")
+        return 1
+
+def build_parser():
+    """
+    Crea el analizador de argumentos con los subcomandos.
+
+    :return: argparse.ArgumentParser.
+    """
+    parser = argparse.ArgumentParser(prog="shark-eda", description="Limpieza y análisis de los ataques de tiburones (GSAF).")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Registra las métricas de cada etapa en un archivo JSON lines ('-' para no guardarlas).")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Muestra los mensajes de cada limpiador (por defecto solo los del pipeline).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    clean = subparsers.add_parser("clean", help="Limpia el archivo original del GSAF.")
+    clean.add_argument("input", help="Archivo original (Excel, CSV, Parquet o Feather).")
+    clean.add_argument("output", help="Archivo de salida (el formato se deduce de la extensión).")
+    clean.add_argument("--rules", help="Archivo de reglas JSON o YAML (por defecto config/rules.json).")
+    clean.add_argument("--group-by", action="store_true",
+                       help="Rellena los nulos con la moda o la media de cada país y década (IMPUTATION_LEVELS).")
+    clean.add_argument("--workers", type=int,
+                       help="Limpia las columnas en paralelo con este número de procesos.")
+    clean.add_argument("--chunksize", type=int,
+                       help="Limpia el archivo por bloques de este número de filas (salida CSV o Parquet).")
+    clean.set_defaults(handler=run_clean)
+
+    aggregate = subparsers.add_parser("aggregate", help="Agrega los ataques de los datos limpios con un AttackCube.")
+    aggregate.add_argument("input", help="Datos limpios o cubo guardado con --save-cube (.pkl).")
+    aggregate.add_argument("--by", action="append", default=[], metavar="DIMENSION",
+                           help="Dimensión del resultado (se puede repetir). Sin --by se calcula el total.")
+    aggregate.add_argument("--measure", choices=("attacks", "fatal"), default="attacks", help="Medida que se suma.")
+    aggregate.add_argument("--where", action="append", default=[], metavar="DIMENSION=VALUES",
+                           help="Filtro de igualdad (varios valores separados por comas; se puede repetir).")
+    aggregate.add_argument("--top", type=int, help="Muestra solo los N grupos con más valor.")
+    aggregate.add_argument("--output", help="Guarda el resultado (el formato se deduce de la extensión).")
+    aggregate.add_argument("--save-cube", metavar="PATH", help="Guarda el cubo para las siguientes consultas.")
+    aggregate.set_defaults(handler=run_aggregate)
+
+    render = subparsers.add_parser("render", help="Genera los mapas del informe (matplotlib).")
+    render.add_argument("input", help="Datos limpios (Excel, CSV, Parquet o Feather).")
+    render.add_argument("--output-dir", default="img", help="Carpeta de las imágenes (por defecto img).")
+    render.add_argument("--maps", nargs="+", metavar="NAME", help="Nombres de los mapas de REPORT_MAPS (por defecto todos).")
+    render.add_argument("--dpi", type=int, default=100, help="Resolución de las imágenes.")
+    render.add_argument("--workers", type=int, help="Número de procesos (por defecto el número de núcleos).")
+    render.set_defaults(handler=run_render)
+
+    stats = subparsers.add_parser("stats", help="Arranca el servicio HTTP de estadísticas.")
+    stats.add_argument("input", help="Datos limpios (Excel, CSV, Parquet o Feather).")
+    stats.add_argument("--host", default="127.0.0.1", help="Dirección en la que escuchar.")
+    stats.add_argument("--port", type=int, default=8080, help="Puerto (0 para elegir uno libre).")
+    stats.add_argument("--cache-size", type=int, default=256, help="Número máximo de resultados en la caché.")
+    stats.set_defaults(handler=run_stats)
+    return parser
+
+def run_clean(args):
+    """
+    Subcomando 'clean': CleaningPipeline, ParallelCleaningPipeline (--workers)
+    o StreamingCleaner (--chunksize).
+
+    :param args: Argumentos del subcomando.
+    :return: Código de salida.
+    """
+    if args.chunksize and (args.workers or args.group_by):
+        print("❌ --chunksize no se puede combinar con --workers ni con --group-by.")
+        return 2
+    if args.chunksize:
+        from streaming_cleaner import StreamingCleaner
+
+        StreamingCleaner(args.input, chunksize=args.chunksize, rules=args.rules).save_cleaned_data(args.output)
+        return 0
+
+    df = load_data(args.input)
+    if df is None:
+        return 1
+    from group_imputer import IMPUTATION_LEVELS
+
+    group_by = IMPUTATION_LEVELS if args.group_by else None
+    if args.workers:
+        from parallel_pipeline import ParallelCleaningPipeline
+
+        pipeline = ParallelCleaningPipeline(df, max_workers=args.workers, group_by=group_by, rules=args.rules)
+    else:
+        from cleaning_pipeline import CleaningPipeline
+
+        pipeline = CleaningPipeline(df, group_by=group_by, rules=args.rules)
+    pipeline.run()
+    pipeline.save_cleaned_data(args.output)
+    return 0
+
+def run_aggregate(args):
+    """
+    Subcomando 'aggregate': suma una medida por las dimensiones indicadas.
+
+    :param args: Argumentos del subcomando.
+    :return: Código de salida.
+    """
+    from attack_cube import AttackCube
+
+    if args.input.lower().endswith(".pkl"):
+        cube = AttackCube.load(args.input)
+    else:
+        df = load_data(args.input)
+        if df is None:
+            return 1
+        cube = AttackCube(df)
+    if args.save_cube:
+        cube.save(args.save_cube)
+
+    for dimension in args.by:
+        if dimension not in cube.dimensions:
+            raise ValueError(f"Dimensión no soportada: {dimension}. Usa una de {', '.join(cube.dimensions)}")
+    filters = dict(parse_filter(cube, text) for text in args.where)
+
+    result = cube.rollup(args.by, measure=args.measure, **filters)
+    if not args.by:
+        print(f"✅ {args.measure}: {result}")
+        return 0
+
+    if args.top is not None:
+        result = result.sort_values(ascending=False, kind="stable").head(args.top)
+    print(result.to_string())
+    if args.output:
+        from data_exporter import DataExporter
+
+        DataExporter(result.reset_index()).save(args.output)
+        print(f"✅ Resultado guardado en {args.output}")
+    return 0
+
+def run_render(args):
+    """
+    Subcomando 'render': genera los mapas de REPORT_MAPS con MapRenderer.
+
+    :param args: Argumentos del subcomando.
+    :return: Código de salida.
+    """
+    from map_renderer import MapRenderer, REPORT_MAPS
+
+    specs = REPORT_MAPS
+    if args.maps:
+        names = [spec["name"] for spec in REPORT_MAPS]
+        unknown = [name for name in args.maps if name not in names]
+        if unknown:
+            raise ValueError(f"Mapas no encontrados: {', '.join(unknown)}. Usa alguno de {', '.join(names)}")
+        specs = [spec for spec in REPORT_MAPS if spec["name"] in args.maps]
+
+    df = load_data(args.input)
+    if df is None:
+        return 1
+    MapRenderer(df, max_workers=args.workers).render(specs, output_dir=args.output_dir, dpi=args.dpi)
+    return 0
+
+def run_stats(args):
+    """
+    Subcomando 'stats': sirve las estadísticas por HTTP hasta Ctrl+C.
+
+    :param args: Argumentos del subcomando.
+    :return: Código de salida.
+    """
+    import asyncio
+
+    from stats_service import StatsService
+
+    service = StatsService(args.input, cache_size=args.cache_size)
+    try:
+        asyncio.run(service.serve(host=args.host, port=args.port))
+    except KeyboardInterrupt:
+        print("✅ Servicio detenido.")
+    return 0
+
+def load_data(file_path):
+    """
+    Carga un archivo de datos con DataLoader (con su caché columnar).
+
+    :param file_path: Ruta del archivo.
+    :return: DataFrame o None si no se pudo cargar (DataLoader ya muestra el error).
+    """
+    from data_loader import DataLoader
+
+    loader = DataLoader(file_path)
+    loader.load_data()
+    return loader.get_data()
+
+def parse_filter(cube, text):
+    """
+    Convierte un filtro 'dimensión=valor1,valor2' al tipo de las etiquetas del cubo.
+
+    :param cube: AttackCube.
+    :param text: Texto del filtro.
+    :return: Tupla (dimensión, lista de valores).
+    """
+    dimension, separator, value = text.partition("=")
+    if not separator or dimension not in cube.dimensions:
+        raise ValueError(f"Filtro no válido: {text}. Usa DIMENSIÓN=VALOR con una de {', '.join(cube.dimensions)}")
+
+    import pandas as pd
+
+    values = value.split(",")
+    labels = cube.labels[dimension].dropna()
+    if len(labels) and pd.api.types.is_numeric_dtype(pd.Index(labels.tolist())):
+        try:
+            return dimension, [float(item) for item in values]
+        except ValueError:
+            raise ValueError(f"Valor no numérico para '{dimension}': {value}")
+    return dimension, values
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sys.exit(main())
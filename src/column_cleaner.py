@@ -1,17 +1,22 @@
 import pandas as pd
 
+from data_exporter import DataExporter
+
 class ColumnCleaner:
     """
     Clase para limpiar los nombres de las columnas de un DataFrame.
     """
 
-    def __init__(self, df):
+    def __init__(self, df, copy=True):
         """
         Inicializa la clase con un DataFrame.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
 
     def clean_columns(self):
@@ -22,7 +27,7 @@ class ColumnCleaner:
         - Reemplaza espacios por guiones bajos
         """
         if self.original_df is not None:
-            self.cleaned_df = self.original_df.copy()
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
             self.cleaned_df.columns = (
                 self.cleaned_df.columns
                 .str.strip()
@@ -41,14 +46,16 @@ class ColumnCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
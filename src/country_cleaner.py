@@ -1,106 +1,85 @@
 import pandas as pd
 
+from data_exporter import DataExporter
+from rule_pack import load_rule_pack
+from value_mapper import ValueMapper
+
+def country_mapping(rules=None):
+    """
+    Mapeo de territorios, mares y variantes al país que se usa en el análisis
+    (sección 'country.mapping' del paquete de reglas). Es una función para que
+    importar el módulo no lea ni compile las reglas.
+
+    :param rules: Paquete de reglas, ruta de un archivo de reglas o None para el de por defecto.
+    :return: Diccionario {variante: país}.
+    """
+    return load_rule_pack(rules).country_mapping
+
 class CountryCleaner:
     """
     Clase para limpiar y dar formato a la columna 'country' del DataFrame.
     """
 
-    def __init__(self, df):
+    column = "country"
+    rule_section = "country"
+
+    def __init__(self, df, copy=True, resolver=None, rules=None):
         """
         Inicializa la clase con un DataFrame y un diccionario de mapeo de países.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        :param resolver: CountryResolver opcional para resolver también las variantes
+                         que no están en el diccionario (búsqueda aproximada).
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas) con el
+                      diccionario de mapeo. Por defecto el de config/rules.json.
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
-        self.country_mapping = {
-            'ENGLAND': 'UNITED KINGDOM',
-            'NEW CALEDONIA': 'FRANCE',
-            'ST HELENA, British overseas territory': 'UNITED KINGDOM',
-            'REUNION': 'FRANCE',
-            'FRENCH POLYNESIA': 'FRANCE',
-            'Fiji': 'FIJI',
-            'CAYMAN ISLANDS': 'UNITED KINGDOM',
-            'ARUBA': 'NETHERLANDS',
-            'ST. MARTIN': 'FRANCE',
-            'DIEGO GARCIA': 'UNITED KINGDOM',
-            'GUAM': 'USA',
-            'TURKS & CAICOS': 'UNITED KINGDOM',
-            'AZORES': 'PORTUGAL',
-            'Sierra Leone': 'SIERRA LEONE',
-            'ATLANTIC OCEAN': 'INTERNATIONAL WATERS',
-            'GRAND CAYMAN': 'UNITED KINGDOM',
-            'Seychelles': 'SEYCHELLES',
-            'OKINAWA': 'JAPAN',
-            'NORTHERN ARABIAN SEA': 'INTERNATIONAL WATERS',
-            'CARIBBEAN SEA': 'INTERNATIONAL WATERS',
-            'NORTH ATLANTIC OCEAN': 'INTERNATIONAL WATERS',
-            'SOUTH CHINA SEA': 'INTERNATIONAL WATERS',
-            'WESTERN SAMOA': 'SAMOA',
-            'PACIFIC OCEAN ': 'INTERNATIONAL WATERS',
-            'BRITISH ISLES': 'UNITED KINGDOM',
-            'NEW BRITAIN': 'PAPUA NEW GUINEA',
-            'JOHNSTON ISLAND': 'USA',
-            'SOUTH PACIFIC OCEAN': 'INTERNATIONAL WATERS',
-            'NEW GUINEA': 'PAPUA NEW GUINEA',
-            'RED SEA': 'INTERNATIONAL WATERS',
-            'NORTH PACIFIC OCEAN': 'INTERNATIONAL WATERS',
-            'FEDERATED STATES OF MICRONESIA': 'MICRONESIA',
-            'MID ATLANTIC OCEAN': 'INTERNATIONAL WATERS',
-            'ADMIRALTY ISLANDS': 'PAPUA NEW GUINEA',
-            'BRITISH WEST INDIES': 'INTERNATIONAL WATERS',
-            'SOUTH ATLANTIC OCEAN': 'INTERNATIONAL WATERS',
-            'PERSIAN GULF': 'INTERNATIONAL WATERS',
-            'RED SEA / INDIAN OCEAN': 'INTERNATIONAL WATERS',
-            'PACIFIC OCEAN': 'INTERNATIONAL WATERS',
-            'NORTH SEA': 'INTERNATIONAL WATERS',
-            'AMERICAN SAMOA': 'USA',
-            'ANDAMAN / NICOBAR ISLANDAS': 'INDIA',
-            'MAYOTTE': 'FRANCE',
-            'NORTH ATLANTIC OCEAN ': 'INTERNATIONAL WATERS',
-            'THE BALKANS': 'INTERNATIONAL WATERS',
-            'SUDAN?': 'SUDAN',
-            'NORTHERN MARIANA ISLANDS': 'USA',
-            'IRAN / IRAQ': 'INTERNATIONAL WATERS',
-            ' PHILIPPINES': 'INTERNATIONAL WATERS',
-            'CENTRAL PACIFIC': 'INTERNATIONAL WATERS',
-            'INDIAN OCEAN': 'INTERNATIONAL WATERS',
-            'SOLOMON ISLANDS / VANUATU': 'INTERNATIONAL WATERS',
-            'SOUTHWEST PACIFIC OCEAN': 'INTERNATIONAL WATERS',
-            'BAY OF BENGAL': 'INDIA',
-            'MID-PACIFC OCEAN': 'INTERNATIONAL WATERS',
-            'CURACAO': 'NETHERLANDS',
-            'ITALY / CROATIA': 'INTERNATIONAL WATERS',
-            'SAN DOMINGO': 'DOMINIKANA',
-            'YEMEN ': 'YEMEN',
-            'REUNION ISLAND': 'FRANCE',
-            'FALKLAND ISLANDS': 'UNITED KINGDOM',
-            'CRETE': 'GREECE',
-            'NETHERLANDS ANTILLES': 'NETHERLANDS',
-            'UNITED ARAB EMIRATES (UAE)': 'UNITED ARAB EMIRATES',
-            'EGYPT / ISRAEL': 'INTERNATIONAL WATERS',
-            'PALESTINIAN TERRITORIES': 'INTERNATIONAL WATERS'
-        }
+        self.rules = load_rule_pack(rules)
+        self.country_mapping = dict(self.rules.country_mapping)
+        self.resolver = resolver
+        self.country_confidence = None
 
     def clean_country_column(self):
         """
         Limpia la columna 'country':
         - Elimina espacios en blanco al inicio y final
         - Mapea los valores según el diccionario proporcionado
+        - Con un CountryResolver, resuelve las variantes que no están en el
+          diccionario y guarda la puntuación de cada fila en country_confidence
+          (1.0 para las del diccionario)
         """
         if "country" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
 
-            # Función de limpieza con apply()
+            # Función de limpieza (se aplica una sola vez por valor distinto)
             def clean_value(value):
                 if pd.isna(value):
                     return None  # Convertimos NaN
                 value = str(value).strip()  # Eliminamos espacios extra
                 return self.country_mapping.get(value, value)  # Mapeamos el valor si está en el diccionario
 
-            self.cleaned_df["country"] = self.cleaned_df["country"].apply(clean_value)
+            countries = self.cleaned_df["country"]
+            cleaned = ValueMapper(clean_value).map(countries)
+
+            if self.resolver is not None:
+                # El diccionario de estas reglas va primero; al resolver solo llega el resto
+                mapped = ValueMapper(lambda value: pd.notna(value) and str(value).strip() in self.country_mapping)
+                pending = ~mapped.map(countries).astype(bool)
+                resolved = self.resolver.resolve_series(countries[pending])
+                cleaned = cleaned.astype(object)
+                cleaned[pending] = resolved["country"]
+                self.country_confidence = pd.Series(1.0, index=countries.index)
+                self.country_confidence[pending] = resolved["confidence"]
 
-            print("✅ Columna 'country' limpiada.")
+            self.cleaned_df["country"] = cleaned
+            if self.resolver is not None:
+                print("✅ Columna 'country' limpiada y resuelta con Natural Earth.")
+            else:
+                print("✅ Columna 'country' limpiada.")
         else:
             print("❌ La columna 'country' no existe en el DataFrame.")
 
@@ -112,14 +91,16 @@ class CountryCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from country_cleaner import country_mapping
+from file_cache import atomic_write
+from natural_earth import ADMIN_0_PATH, read_dbf
+
+# Nombres de Natural Earth que en el GSAF se escriben de otra forma
+GSAF_NAMES = {
+    "UNITED STATES OF AMERICA": "USA",
+}
+
+# Nombres que no están en Natural Earth (110m) pero que tienen que competir en la
+# búsqueda aproximada: la isla de San Martín es en parte francesa ('ST MARTIN',
+# en el mapeo de países) y en parte neerlandesa, así que 'St. Maartin' queda sin resolver
+EXTRA_NAMES = {
+    "SINT MAARTEN": "NETHERLANDS",
+    "ST MAARTEN": "NETHERLANDS",
+}
+
+# Palabras muy frecuentes que no se tienen en cuenta en la búsqueda aproximada,
+# para que 'ANDAMAN ISLANDS' no se parezca a 'CAYMAN ISLANDS' solo por 'ISLANDS'
+GENERIC_WORDS = {"ISLAND", "ISLANDS", "ISLES", "IS", "REPUBLIC", "REP", "OF", "THE", "AND"}
+
+class CountryResolver:
+    """
+    Clase para resolver nombres de países escritos de cualquier forma al nombre
+    que se usa en el análisis (en mayúsculas, como en el GSAF).
+
+    Construye un índice invertido de trigramas sobre los campos ADMIN, NAME y
+    NAME_LONG de Natural Earth (admin_0) y sobre las claves y valores del mapeo
+    de países de las reglas. Cada valor se busca primero de forma exacta (normalizado) y
+    si no aparece se comparan solo los nombres que comparten algún trigrama con
+    él, puntuando con el coeficiente de Dice. Una coincidencia aproximada solo se
+    acepta si es clara: con una puntuación alta y con ventaja sobre el mejor
+    nombre de otro país ('NEW MEXICO' o 'COLUMBIA' quedan sin resolver). Los
+    resultados se guardan en una caché que se puede persistir en disco.
+    """
+
+    def __init__(self, shapefile_path=ADMIN_0_PATH, mapping=None, threshold=0.8, margin=0.15, cache_path=None):
+        """
+        Inicializa la clase y construye el índice de nombres.
+
+        :param shapefile_path: Ruta del shapefile (o .dbf) de países de Natural Earth.
+        :param mapping: Diccionario de variantes a país. Por defecto el de las reglas (country_mapping()).
+        :param threshold: Puntuación mínima (0-1) para aceptar una coincidencia aproximada.
+        :param margin: Ventaja mínima sobre el mejor nombre de otro país.
+        :param cache_path: Ruta del archivo JSON con la caché de valores resueltos (opcional).
+        """
+        self.threshold = threshold
+        self.margin = margin
+        self.cache_path = cache_path
+        self.names = {}  # nombre normalizado -> nombre canónico
+
+        countries = read_dbf(shapefile_path, columns=["ADMIN", "NAME", "NAME_LONG"])
+        for admin, name, name_long in countries.itertuples(index=False):
+            canonical = self.canonical_name(name, name_long)
+            for alias in (admin, name, name_long):
+                self.names.setdefault(self.normalize(alias), canonical)
+        for alias, canonical in EXTRA_NAMES.items():
+            self.names.setdefault(self.normalize(alias), canonical)
+
+        # El mapeo tiene prioridad (por ejemplo, 'NEW CALEDONIA' -> 'FRANCE'). Las claves con
+        # espacios al principio o al final nunca se usan en CountryCleaner (se compara el
+        # valor sin espacios), así que tampoco se indexan (' PHILIPPINES')
+        mapping = country_mapping() if mapping is None else mapping
+        mapping = {alias: country for alias, country in mapping.items() if alias == alias.strip()}
+        for alias, country in mapping.items():
+            self.names[self.normalize(country)] = country
+        for alias, country in mapping.items():
+            self.names[self.normalize(alias)] = country
+        for alias, canonical in list(self.names.items()):
+            self.names[alias] = self.names.get(self.normalize(canonical), canonical)
+
+        self.aliases = list(self.names)
+        self.alias_trigrams = [self.trigrams(self._fuzzy_key(alias)) for alias in self.aliases]
+        self.index = {}
+        for position, trigrams in enumerate(self.alias_trigrams):
+            for trigram in trigrams:
+                self.index.setdefault(trigram, []).append(position)
+
+        self.index_key = hashlib.sha256(
+            json.dumps([sorted(self.names.items()), threshold, margin]).encode("utf-8")).hexdigest()[:16]
+        self.cache = self._load_cache()
+        self.cache_changed = False
+
+    def resolve(self, value):
+        """
+        Resuelve un valor al nombre canónico del país.
+
+        :param value: Valor original de la columna 'country'.
+        :return: Tupla (nombre canónico o None si no hay coincidencia suficiente, puntuación 0-1).
+        """
+        key = self.normalize(value)
+        if key in self.cache:
+            return tuple(self.cache[key])
+
+        if key in self.names:
+            result = (self.names[key], 1.0)
+        else:
+            result = self._best_match(key)
+        self.cache[key] = result
+        self.cache_changed = True
+        return result
+
+    def resolve_series(self, countries):
+        """
+        Resuelve una serie de países (una sola vez por valor distinto).
+        Los valores sin coincidencia suficiente se conservan sin espacios extra.
+
+        :param countries: Serie de Pandas con los valores originales.
+        :return: DataFrame con las columnas 'country' y 'confidence'.
+        """
+        codes, uniques = pd.factorize(countries)
+
+        names = np.empty(len(uniques) + 1, dtype=object)
+        scores = np.zeros(len(uniques) + 1)
+        for position, value in enumerate(uniques):
+            name, score = self.resolve(value)
+            names[position] = name if name is not None else str(value).strip()
+            scores[position] = score
+        names[-1] = None
+
+        if self.cache_path is not None and self.cache_changed:
+            self.save_cache()
+
+        resolved = pd.DataFrame({
+            "country": pd.Series(names).infer_objects().take(codes).to_numpy(),
+            "confidence": scores.take(codes),
+        }, index=countries.index)
+        return resolved
+
+    def save_cache(self):
+        """
+        Guarda la caché de valores resueltos en cache_path (escritura atómica).
+        """
+        if self.cache_path is None:
+            print("❌ No se ha indicado la ruta de la caché.")
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        content = json.dumps({"index_key": self.index_key, "values": self.cache}, ensure_ascii=False)
+
+        def write(path):
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(content)
+
+        atomic_write(self.cache_path, write)
+        self.cache_changed = False
+
+    @staticmethod
+    def canonical_name(name, name_long):
+        """
+        Devuelve el nombre que se usa en el análisis para un país de Natural Earth.
+        NAME usa abreviaturas ('Dominican Rep.'); en ese caso se usa NAME_LONG.
+
+        :param name: Campo NAME.
+        :param name_long: Campo NAME_LONG.
+        :return: Nombre en mayúsculas.
+        """
+        canonical = (name_long if "." in name else name).upper()
+        return GSAF_NAMES.get(canonical, canonical)
+
+    @staticmethod
+    def normalize(value):
+        """
+        Normaliza un nombre: sin acentos, en mayúsculas, '&' como 'AND' y sin
+        signos de puntuación ni espacios repetidos.
+
+        :param value: Valor original.
+        :return: Texto normalizado.
+        """
+        text = unicodedata.normalize("NFKD", str(value))
+        text = "".join(character for character in text if not unicodedata.combining(character))
+        text = text.upper().replace("&", " AND ")
+        return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+    @staticmethod
+    def trigrams(text):
+        """
+        Devuelve los trigramas de un texto normalizado, con espacios de relleno
+        para que el principio y el final de cada palabra cuenten.
+
+        :param text: Texto normalizado.
+        :return: Conjunto de trigramas.
+        """
+        padded = f"  {text} "
+        return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+    def _best_match(self, key):
+        """
+        Busca el nombre más parecido usando el índice de trigramas. Se guarda la
+        mejor puntuación de cada país y la del primero tiene que superar el umbral
+        y sacar al menos 'margin' a la del segundo.
+
+        :param key: Valor normalizado.
+        :return: Tupla (nombre canónico o None, puntuación de Dice).
+        """
+        trigrams = self.trigrams(self._fuzzy_key(key))
+        shared = Counter(position for trigram in trigrams for position in self.index.get(trigram, ()))
+        if not shared:
+            return None, 0.0
+
+        scores = {}
+        for position, count in shared.items():
+            score = 2 * count / (len(trigrams) + len(self.alias_trigrams[position]))
+            country = self.names[self.aliases[position]]
+            if score > scores.get(country, 0.0):
+                scores[country] = score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_country, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if round(best_score, 3) < self.threshold or best_score - runner_up < self.margin:
+            return None, round(best_score, 3)
+        return best_country, round(best_score, 3)
+
+    @staticmethod
+    def _fuzzy_key(key):
+        """
+        Quita las palabras genéricas de un valor normalizado (si queda algo).
+
+        :param key: Valor normalizado.
+        :return: Texto para la búsqueda aproximada.
+        """
+        words = [word for word in key.split() if word not in GENERIC_WORDS]
+        return " ".join(words) if words else key
+
+    def _load_cache(self):
+        """
+        Lee la caché de disco si existe y corresponde al mismo índice.
+
+        :return: Diccionario {valor normalizado: [nombre canónico, puntuación]}.
+        """
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        with open(self.cache_path, encoding="utf-8") as file:
+            content = json.load(file)
+        if content.get("index_key") != self.index_key:
+            return {}
+        return {key: tuple(value) for key, value in content["values"].items()}
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    resolver = CountryResolver()
+    for value in ["ENGLAND", "COLUMBIA", "NEW MEXICO", "St. Maartin", "PHILIPINES", "New Zealand",
+                  "TRINIDAD & TOBAGO", "Dominican Rep", "MID-PACIFIC OCEAN", "BAHREIN"]:
+        print(f"🔹 {value!r} -> {resolver.resolve(value)}")
@@ -0,0 +1,103 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from file_cache import atomic_write
+
+# Formato de salida según la extensión del archivo
+EXPORT_FORMATS = {
+    ".parquet": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".csv": "csv",
+    ".xlsx": "xlsx",
+}
+
+class DataExporter:
+    """
+    Clase para guardar un DataFrame en Parquet, Feather (Arrow IPC), CSV o Excel.
+    Todas las escrituras son atómicas: se escribe en un temporal y después se renombra.
+    """
+
+    def __init__(self, df):
+        """
+        Inicializa la clase con el DataFrame a guardar.
+
+        :param df: DataFrame de Pandas a guardar.
+        """
+        self.df = df
+
+    def save(self, output_path, file_format=None, compression=None, chunksize=100_000):
+        """
+        Guarda el DataFrame en el formato indicado o en el que corresponda a la extensión.
+
+        :param output_path: Ruta del archivo de salida.
+        :param file_format: 'parquet', 'feather', 'csv' o 'xlsx' (por defecto según la extensión).
+        :param compression: Compresión para Parquet ('snappy', 'zstd', 'gzip'...) o Feather
+                            ('lz4', 'zstd', 'uncompressed'). Por defecto la del formato.
+        :param chunksize: Número de filas por bloque al escribir CSV.
+        """
+        file_format = file_format or self.detect_format(output_path)
+
+        if file_format == "parquet":
+            df = self._arrow_compatible(self.df)
+            atomic_write(output_path, lambda path: df.to_parquet(
+                path, index=False, compression=compression or "snappy"))
+        elif file_format == "feather":
+            df = self._arrow_compatible(self.df.reset_index(drop=True))
+            atomic_write(output_path, lambda path: df.to_feather(path, compression=compression))
+        elif file_format == "csv":
+            atomic_write(output_path, lambda path: self.df.to_csv(path, index=False, chunksize=chunksize))
+        elif file_format == "xlsx":
+            atomic_write(output_path, lambda path: self.df.to_excel(path, index=False, engine="openpyxl"))
+        else:
+            raise ValueError(f"Formato de salida no soportado: {file_format}")
+
+    @staticmethod
+    def detect_format(output_path):
+        """
+        Deduce el formato de salida a partir de la extensión del archivo.
+
+        :param output_path: Ruta del archivo de salida.
+        :return: Nombre del formato.
+        """
+        extension = os.path.splitext(output_path)[1].lower()
+        if extension not in EXPORT_FORMATS:
+            raise ValueError(f"Extensión no soportada: '{extension}'. Usa una de {sorted(EXPORT_FORMATS)}")
+        return EXPORT_FORMATS[extension]
+
+    @staticmethod
+    def _arrow_compatible(df):
+        """
+        Convierte a texto las columnas con tipos mezclados (por ejemplo, 'age' con números
+        y textos), que Arrow no puede guardar en una sola columna. Los nulos se conservan.
+
+        :param df: DataFrame a guardar.
+        :return: DataFrame compatible con Arrow.
+        """
+        mixed_columns = [
+            column for column in df.columns
+            if df[column].dtype == object
+            and pd.api.types.infer_dtype(df[column], skipna=True) in ("mixed", "mixed-integer")
+        ]
+        if not mixed_columns:
+            return df
+
+        df = df.copy(deep=False)
+        for column in mixed_columns:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+        return df
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "country": ["USA", "AUSTRALIA", None],
+        "age": [25, "20s", None],
+        "fatal": [0, 1, 0],
+    })
+
+    for file_name in ["sample.parquet", "sample.feather", "sample.csv"]:
+        path = os.path.join(tempfile.gettempdir(), file_name)
+        DataExporter(sample_data).save(path)
+        print(f"✅ Datos guardados en {path}")
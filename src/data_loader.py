@@ -1,36 +1,84 @@
+import glob
+import os
+
 import pandas as pd
 
+from file_cache import atomic_write, file_fingerprint
+
+# Motor de lectura según la extensión del archivo Excel
+EXCEL_ENGINES = {
+    ".xls": "xlrd",
+    ".xlsx": "openpyxl",
+}
+
+# Formatos columnares que se leen directamente, sin caché (ver DataExporter)
+COLUMNAR_READERS = {
+    ".parquet": pd.read_parquet,
+    ".feather": pd.read_feather,
+    ".arrow": pd.read_feather,
+}
+
 class DataLoader:
     """
     Clase para cargar datos desde un archivo Excel y almacenarlos en un DataFrame de Pandas.
+    Guarda una caché columnar (Parquet o Feather) junto al archivo para no volver a leer el Excel.
+    También lee directamente los archivos CSV, Parquet y Feather que genera DataExporter.
     """
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, use_cache=True, cache_dir=None, cache_format="parquet"):
         """
         Inicializa la clase con la ruta del archivo de datos.
-        
-        :param file_path: Ruta del archivo de datos (Excel).
+
+        :param file_path: Ruta del archivo de datos (Excel, CSV, Parquet o Feather).
+        :param use_cache: Si es True se usa la caché columnar.
+        :param cache_dir: Carpeta de la caché (por defecto '.cache' junto al archivo).
+        :param cache_format: Formato de la caché: 'parquet' o 'feather'.
         """
         self.file_path = file_path
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(file_path)), ".cache")
+        self.cache_format = cache_format
         self.df = None
 
     def load_data(self):
         """
         Carga los datos desde el archivo Excel en un DataFrame de Pandas.
+        Si existe una caché válida para el contenido actual del archivo se lee de ella.
         Maneja errores en caso de que el archivo no se pueda leer.
         """
         try:
-            self.df = pd.read_excel(self.file_path, engine="xlrd")
+            use_cache = self.use_cache and self._extension() not in COLUMNAR_READERS
+            if use_cache:
+                self.df = self._read_cache(file_fingerprint(self.file_path))
+                if self.df is not None:
+                    print(f"✅ Datos cargados desde la caché de {self.file_path}")
+                    return
+
+            self.df = self._read_source()
             print(f"✅ Datos cargados correctamente desde {self.file_path}")
+
+            if use_cache:
+                try:
+                    self._write_cache(file_fingerprint(self.file_path))
+                except Exception as e:
+                    # Los datos ya están cargados: sin caché solo se pierde velocidad la próxima vez
+                    print(f"❌ No se pudo guardar la caché de {self.file_path} (los datos sí se han cargado): {e}")
         except FileNotFoundError:
             print(f"❌ Error: No se encontró el archivo en {self.file_path}")
         except Exception as e:
             print(f"❌ Error al cargar el archivo {self.file_path}: {e}")
 
+    def clear_cache(self):
+        """
+        Elimina las cachés guardadas para este archivo.
+        """
+        for cache_path in self._cache_files():
+            os.remove(cache_path)
+
     def get_data(self):
         """
         Devuelve el DataFrame con los datos cargados.
-        
+
         :return: Pandas DataFrame con los datos.
         """
         if self.df is not None:
@@ -42,7 +90,7 @@ class DataLoader:
     def show_head(self, n=5):
         """
         Muestra las primeras n filas del DataFrame.
-        
+
         :param n: Número de filas a mostrar (por defecto 5).
         """
         if self.df is not None:
@@ -50,6 +98,85 @@ class DataLoader:
         else:
             print("❌ No hay datos cargados. Usa load_data() primero.")
 
+    def _extension(self):
+        """
+        Devuelve la extensión del archivo de datos en minúsculas.
+
+        :return: Extensión con el punto inicial.
+        """
+        return os.path.splitext(self.file_path)[1].lower()
+
+    def _read_source(self):
+        """
+        Lee el archivo de datos según su extensión: Excel, CSV, Parquet o Feather.
+
+        :return: DataFrame con los datos.
+        """
+        extension = self._extension()
+        if extension in COLUMNAR_READERS:
+            return COLUMNAR_READERS[extension](self.file_path)
+        if extension == ".csv":
+            return pd.read_csv(self.file_path)
+        return pd.read_excel(self.file_path, engine=EXCEL_ENGINES.get(extension, "openpyxl"))
+
+    def _cache_prefix(self):
+        """
+        Devuelve el prefijo de los archivos de caché de este archivo de datos.
+
+        :return: Ruta sin huella ni extensión.
+        """
+        return os.path.join(self.cache_dir, os.path.basename(self.file_path))
+
+    def _cache_files(self):
+        """
+        Lista los archivos de caché existentes para este archivo de datos.
+
+        :return: Lista de rutas.
+        """
+        return glob.glob(glob.escape(self._cache_prefix()) + ".*.*")
+
+    def _read_cache(self, fingerprint):
+        """
+        Lee la caché que corresponde a la huella actual del archivo.
+
+        :param fingerprint: Huella del archivo de datos.
+        :return: DataFrame o None si no hay caché válida.
+        """
+        base_path = f"{self._cache_prefix()}.{fingerprint}"
+        try:
+            if os.path.exists(f"{base_path}.{self.cache_format}"):
+                if self.cache_format == "feather":
+                    return pd.read_feather(f"{base_path}.feather")
+                return pd.read_parquet(f"{base_path}.parquet")
+            if os.path.exists(f"{base_path}.pkl"):
+                return pd.read_pickle(f"{base_path}.pkl")
+        except Exception as e:
+            print(f"❌ Caché no válida, se vuelve a leer el Excel: {e}")
+        return None
+
+    def _write_cache(self, fingerprint):
+        """
+        Guarda el DataFrame en la caché y elimina las cachés de versiones anteriores del archivo.
+        Las columnas con tipos mezclados (por ejemplo, números y textos en 'time') no se pueden
+        guardar en Arrow sin perder información; en ese caso se guarda en formato pickle.
+
+        :param fingerprint: Huella del archivo de datos.
+        """
+        base_path = f"{self._cache_prefix()}.{fingerprint}"
+        try:
+            cache_path = f"{base_path}.{self.cache_format}"
+            if self.cache_format == "feather":
+                atomic_write(cache_path, lambda path: self.df.to_feather(path))
+            else:
+                atomic_write(cache_path, lambda path: self.df.to_parquet(path, index=False))
+        except (ImportError, ValueError, TypeError, NotImplementedError):
+            cache_path = f"{base_path}.pkl"
+            atomic_write(cache_path, lambda path: self.df.to_pickle(path))
+
+        for old_path in self._cache_files():
+            if old_path != cache_path:
+                os.remove(old_path)
+
 # Ejemplo de uso
 if __name__ == "__main__":
     loader = DataLoader("../data/raw/GSAF5.xls")
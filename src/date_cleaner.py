@@ -0,0 +1,260 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_exporter import DataExporter
+
+# Formatos de fecha completa que se prueban en orden (el primero cubre casi todo el GSAF)
+DATE_FORMATS = ["%d-%b-%Y", "%d-%B-%Y", "%Y.%m.%d", "%m-%d-%Y"]
+
+# Forma exacta del primer formato, para la vía rápida con pyarrow ('15-Jun-2023')
+COMMON_DATE_SHAPE = r"^\d{2}-[A-Z][a-z]{2}-\d{4}$"
+
+# Formatos de mes y año ('Feb-1955', 'June-1874')
+MONTH_FORMATS = ["%b-%Y", "%B-%Y"]
+
+# Prefijos que acompañan a la fecha y no cambian su valor ('Reported 06-Jun-2023', 'Before 1903', 'Ca. 1900')
+DATE_PREFIXES = (
+    r"^(?:(?:reported(?: in| to have taken place in)?|reportd|reprted|before|beforer|after|prior to|"
+    r"ca\s*\.?|circa|said to be|letter dated|no date,?|some time between|between|last incident of|"
+    r"early|mid|late|summer(?: of)?|fall|winter|spring)[\s\-,.]+)+"
+)
+
+# Rango de los números de serie de Excel que se aceptan como fechas (1927-2118)
+EXCEL_SERIAL_RANGE = (10_000, 80_000)
+EXCEL_EPOCH = "1899-12-30"
+
+# Fecha o mes y año dentro de un texto más largo ('02-Mar-1943 to 07-Mar-1943', '26-Jul-1975.b')
+EMBEDDED_DATE = r"(\d{1,2}-[A-Za-z]{3,9}-\d{4}|\d{4}\.\d{2}\.\d{2})"
+EMBEDDED_MONTH = r"([A-Za-z]{3,9}-\d{4})"
+EMBEDDED_YEAR = r"(?<!\d)(\d{4})(?!\d)"
+
+class DateCleaner:
+    """
+    Clase para limpiar la columna 'date' del DataFrame.
+    """
+
+    column = "date"
+    input_columns = ("date", "year")
+
+    def __init__(self, df, copy=True):
+        """
+        Inicializa la clase con un DataFrame.
+
+        :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        """
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
+        self.cleaned_df = None
+
+    def clean_date_column(self):
+        """
+        Limpia la columna 'date':
+        - Convierte los valores a datetime (el día 1 del mes o del año si no hay más detalle)
+        - Añade 'date_precision': 'day', 'month' o 'year'
+        - Añade 'month' (solo para los valores con día o con mes y año)
+        - Añade 'date_consistent': si el año de la fecha coincide con 'year'
+        """
+        if "date" in self.original_df.columns:
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            parsed = self.clean_values(self.cleaned_df["date"])
+
+            self.cleaned_df["date"] = parsed["date"]
+            self.cleaned_df["date_precision"] = parsed["date_precision"]
+            self.cleaned_df["month"] = parsed["month"]
+            if "year" in self.cleaned_df.columns:
+                self.cleaned_df["date_consistent"] = self.check_year(parsed["date_year"], self.cleaned_df["year"])
+
+            print(f"✅ Columna 'date' limpiada: {(parsed['date_precision'] == 'day').sum()} fechas completas, "
+                  f"{parsed['month'].notna().sum()} con mes y {parsed['date'].notna().sum()} con año.")
+        else:
+            print("❌ La columna 'date' no existe en el DataFrame.")
+
+    @staticmethod
+    def clean_values(dates):
+        """
+        Analiza los valores de 'date' una sola vez por valor distinto y reparte
+        el resultado a las filas con los códigos de pd.factorize.
+
+        :param dates: Serie de Pandas con los valores originales.
+        :return: DataFrame con 'date' (datetime), 'date_precision', 'month' (Int8) y 'date_year' (Int16).
+        """
+        codes, uniques = pd.factorize(dates)
+        parsed = DateCleaner.parse_values(pd.Series(np.asarray(uniques, dtype=object), dtype=object))
+
+        # La última posición de cada array guarda el resultado para los nulos (código -1)
+        def take(values, null):
+            return np.append(values, np.array([null], dtype=values.dtype))[codes]
+
+        return pd.DataFrame({
+            "date": pd.Series(take(parsed["date"].to_numpy(dtype="datetime64[us]"), np.datetime64("NaT", "us")),
+                              index=dates.index),
+            "date_precision": pd.Series(take(parsed["date_precision"].to_numpy(dtype=object), None),
+                                        index=dates.index, dtype=object),
+            "month": pd.Series(take(parsed["month"].to_numpy(dtype=float), np.nan), index=dates.index).astype("Int8"),
+            "date_year": pd.Series(take(parsed["date_year"].to_numpy(dtype=float), np.nan), index=dates.index).astype("Int16"),
+        })
+
+    @staticmethod
+    def parse_values(values):
+        """
+        Analiza valores distintos. Primero se prueba el formato más frecuente sobre
+        el texto sin prefijos (los números grandes son números de serie de Excel). El
+        resto se normaliza y se prueban los formatos de fecha completa sobre todo el
+        texto, después sobre la fecha que aparezca dentro del texto, luego el mes y
+        año y por último solo el año. Cada paso solo recibe los valores que siguen
+        sin resolver.
+
+        :param values: Serie de Pandas con valores distintos y no nulos.
+        :return: DataFrame con 'date', 'date_precision', 'month' y 'date_year' (mismo índice que values).
+        """
+        is_date = pd.Series(False, index=values.index)
+        if pd.api.types.infer_dtype(values, skipna=True) != "string":
+            is_date = values.map(lambda value: isinstance(value, (datetime.date, pd.Timestamp)))
+        date = pd.to_datetime(values.where(is_date), errors="coerce").astype("datetime64[us]")
+
+        # Vía rápida: el formato más frecuente sobre el texto sin prefijos ('Reported 06-Jun-2023').
+        # Con '(?i)' en el patrón y sin 'case' pandas puede usar pyarrow en vez de re
+        text = values.astype(str).str.strip()
+        text = text[date.isna()].str.replace("(?i)" + DATE_PREFIXES, "", regex=True)
+        date = date.fillna(DateCleaner._parse_common_format(text))
+
+        numbers = pd.to_numeric(values[date.isna()], errors="coerce").reindex(values.index)
+        serials = numbers.where(numbers.between(*EXCEL_SERIAL_RANGE))
+        date = date.fillna(pd.to_datetime(serials, unit="D", origin=EXCEL_EPOCH, errors="coerce").astype("datetime64[us]"))
+
+        # Solo se normaliza (y se analiza con expresiones regulares) lo que queda sin fecha
+        text = DateCleaner.normalize(text[date[text.index].isna()])
+        date = DateCleaner._parse_formats(date, text, DATE_FORMATS)
+        text = text[date[text.index].isna()]
+        date = DateCleaner._parse_formats(date, text.str.extract(EMBEDDED_DATE, expand=False), DATE_FORMATS)
+
+        text = text[date[text.index].isna()]
+        month_date = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+        month_date = DateCleaner._parse_formats(month_date, text, MONTH_FORMATS)
+        text = text[month_date[text.index].isna()]
+        month_date = DateCleaner._parse_formats(month_date, text.str.extract(EMBEDDED_MONTH, expand=False), MONTH_FORMATS)
+
+        text = text[month_date[text.index].isna()]
+        years = pd.to_numeric(text.str.extract(EMBEDDED_YEAR, expand=False), errors="coerce").reindex(values.index)
+        years = years.where(numbers.isna(), numbers.where((numbers >= 1000) & (numbers <= 9999)))
+        years = years.where(date.isna() & month_date.isna())
+        year_date = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+        year_date[years.notna()] = pd.to_datetime(years[years.notna()].astype(int).astype(str), format="%Y",
+                                                  errors="coerce").astype("datetime64[us]")
+
+        precision = np.select([date.notna(), month_date.notna(), years.notna()], ["day", "month", "year"], default="")
+        return pd.DataFrame({
+            "date": date.fillna(month_date).fillna(year_date),
+            "date_precision": pd.Series(precision, index=values.index, dtype=object).replace("", None),
+            "month": date.dt.month.fillna(month_date.dt.month),
+            "date_year": date.dt.year.fillna(month_date.dt.year).fillna(years),
+        }, index=values.index)
+
+    @staticmethod
+    def normalize(text):
+        """
+        Quita los prefijos conocidos y unifica los separadores ('22- Jan-1831',
+        '20-May2015' y '15 Jun 2023' pasan a '22-Jan-1831', '20-May-2015' y '15-Jun-2023').
+
+        :param text: Serie de textos sin espacios al principio ni al final.
+        :return: Serie normalizada.
+        """
+        text = text.str.replace(DATE_PREFIXES, "", case=False, regex=True)
+        text = text.str.replace(r"\bSept\b", "Sep", case=False, regex=True)
+        return text.str.replace(r"\s*-+\s*|(?<=[A-Za-z\d])\s+(?=[A-Za-z\d])|(?<=[A-Za-z])(?=\d)", "-", regex=True)
+
+    @staticmethod
+    def check_year(date_years, years):
+        """
+        Comprueba si el año de la fecha coincide con la columna 'year'.
+
+        :param date_years: Serie con el año obtenido de 'date'.
+        :param years: Serie con la columna 'year'.
+        :return: Serie booleana (nula si falta alguno de los dos años).
+        """
+        years = pd.to_numeric(years, errors="coerce")
+        consistent = pd.Series(date_years.to_numpy(dtype=float) == years.to_numpy(dtype=float),
+                               index=years.index, dtype="boolean")
+        return consistent.mask(date_years.isna() | years.isna())
+
+    @staticmethod
+    def _parse_common_format(text):
+        """
+        Analiza el formato más frecuente (DATE_FORMATS[0], '15-Jun-2023'). Con
+        pyarrow se usa su strptime, varias veces más rápido que pd.to_datetime, solo
+        sobre los textos con la forma exacta COMMON_DATE_SHAPE, y se descartan los
+        días que no existen ('31-Feb-2020' pasaría al 2 de marzo). El resto se queda
+        para los pasos siguientes. Sin pyarrow se usa pd.to_datetime.
+
+        :param text: Serie de textos.
+        :return: Serie de fechas (NaT si el texto no tiene ese formato).
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+        except ImportError:
+            return pd.to_datetime(text, format=DATE_FORMATS[0], errors="coerce").astype("datetime64[us]")
+
+        array = pa.array(text.to_numpy(dtype=object, na_value=None), type=pa.string())
+        array = pc.if_else(pc.match_substring_regex(array, COMMON_DATE_SHAPE), array, None)
+        parsed = pc.strptime(array, format=DATE_FORMATS[0], unit="us", error_is_null=True)
+        days = pc.cast(pc.utf8_slice_codeunits(array, 0, 2), pa.int64())
+        parsed = pc.if_else(pc.equal(pc.day(parsed), days), parsed, None)
+        return pd.Series(parsed.to_numpy(zero_copy_only=False), index=text.index).astype("datetime64[us]")
+
+    @staticmethod
+    def _parse_formats(date, text, formats):
+        """
+        Rellena las fechas que faltan probando los formatos en orden (cada formato se
+        aplica de forma vectorizada solo a los valores que siguen sin fecha).
+
+        :param date: Serie de fechas ya analizadas (NaT las que faltan).
+        :param text: Serie de textos con parte del índice de date.
+        :param formats: Lista de formatos de strptime.
+        :return: Serie de fechas.
+        """
+        for date_format in formats:
+            missing = date[text.index].isna() & text.notna()
+            if not missing.any():
+                break
+            parsed = pd.to_datetime(text[missing], format=date_format, errors="coerce")
+            date = date.fillna(parsed.astype("datetime64[us]"))
+        return date
+
+    def get_cleaned_data(self):
+        """
+        Devuelve el DataFrame con la columna 'date' limpia.
+
+        :return: DataFrame limpio.
+        """
+        return self.cleaned_df
+
+    def save_cleaned_data(self, output_path, **options):
+        """
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
+
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
+        """
+        if self.cleaned_df is not None:
+            DataExporter(self.cleaned_df).save(output_path, **options)
+            print(f"✅ Datos limpios guardados en {output_path}")
+        else:
+            print("❌ No hay datos limpios para guardar.")
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "date": ["15-Jun-2023", "Reported 06-Jun-2023", "Before 1903", "Feb-1955", "2017.06.05",
+                 "12-30-1980", "Reported 22- Jan-1831", "Late Jul-1980", "No date", None, 1957],
+        "year": [2023, 2023, 1903, 1955, 2017, 1980, 1831, 1981, 0, 2001, 1957],
+    })
+
+    cleaner = DateCleaner(sample_data)
+    cleaner.clean_date_column()
+    print(pd.concat([sample_data["date"].rename("original"), cleaner.get_cleaned_data()], axis=1))
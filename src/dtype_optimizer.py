@@ -0,0 +1,115 @@
+import pandas as pd
+
+from data_exporter import DataExporter
+
+# Columnas de texto con pocos valores distintos
+CATEGORICAL_COLUMNS = ["country", "species", "type", "sex", "time", "activity", "date_precision"]
+
+# Columnas numéricas y su tipo entero compacto (admite nulos)
+INTEGER_COLUMNS = {
+    "year": "Int16",
+    "fatal": "Int8",
+    "month": "Int8",
+    "age": "Int8",
+}
+
+class DtypeOptimizer:
+    """
+    Clase para convertir el DataFrame limpio a tipos de datos compactos:
+    categorías para los textos con pocos valores distintos y enteros pequeños
+    para 'year', 'fatal', 'month' y 'age'.
+    """
+
+    def __init__(self, df, copy=True, text_dtype="category"):
+        """
+        Inicializa la clase con un DataFrame.
+
+        :param df: DataFrame de Pandas con los datos limpios.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        :param text_dtype: Tipo para las columnas de texto: 'category' o 'string[pyarrow]'.
+        """
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
+        self.text_dtype = text_dtype
+        self.cleaned_df = None
+
+    def optimize_dtypes(self):
+        """
+        Convierte las columnas a tipos compactos:
+        - Textos de baja cardinalidad a 'category' (o cadenas de Arrow)
+        - 'year' a Int16 y 'fatal', 'month' y 'age' a Int8
+        """
+        if self.original_df is not None:
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+
+            for column in CATEGORICAL_COLUMNS:
+                if column in self.cleaned_df.columns:
+                    self.cleaned_df[column] = self.cleaned_df[column].astype(self.text_dtype)
+
+            for column, dtype in INTEGER_COLUMNS.items():
+                if column in self.cleaned_df.columns:
+                    values = pd.to_numeric(self.cleaned_df[column], errors="coerce")
+                    self.cleaned_df[column] = values.astype(dtype)
+
+            report = self.memory_report()
+            before, after = report.loc["total", ["before_bytes", "after_bytes"]]
+            print(f"✅ Tipos de datos optimizados: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB.")
+        else:
+            print("❌ No hay datos cargados.")
+
+    def memory_report(self):
+        """
+        Compara la memoria de cada columna antes y después de optimizar los tipos.
+
+        :return: DataFrame con los bytes antes, después y el factor de reducción por columna.
+        """
+        if self.cleaned_df is None:
+            print("❌ No hay datos optimizados. Usa optimize_dtypes() primero.")
+            return None
+
+        report = pd.DataFrame({
+            "before_dtype": self.original_df.dtypes.astype(str),
+            "after_dtype": self.cleaned_df.dtypes.astype(str),
+            "before_bytes": self.original_df.memory_usage(index=False, deep=True),
+            "after_bytes": self.cleaned_df.memory_usage(index=False, deep=True),
+        })
+        report.loc["total"] = ["", "", report["before_bytes"].sum(), report["after_bytes"].sum()]
+        report["reduction"] = report["before_bytes"] / report["after_bytes"]
+        return report
+
+    def get_cleaned_data(self):
+        """
+        Devuelve el DataFrame con los tipos optimizados.
+
+        :return: DataFrame optimizado.
+        """
+        return self.cleaned_df
+
+    def save_cleaned_data(self, output_path, **options):
+        """
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
+
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
+        """
+        if self.cleaned_df is not None:
+            DataExporter(self.cleaned_df).save(output_path, **options)
+            print(f"✅ Datos limpios guardados en {output_path}")
+        else:
+            print("❌ No hay datos limpios para guardar.")
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "country": ["USA", "AUSTRALIA", "USA", "SOUTH AFRICA"] * 1000,
+        "sex": ["M", "F", "M", None] * 1000,
+        "year": [2020.0, 1990.0, 2005.0, 1960.0] * 1000,
+        "fatal": [0.0, 1.0, 0.0, 0.0] * 1000,
+    })
+
+    optimizer = DtypeOptimizer(sample_data)
+    optimizer.optimize_dtypes()
+    print(optimizer.get_cleaned_data().dtypes)
+    print(optimizer.memory_report())
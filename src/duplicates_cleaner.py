@@ -1,25 +1,32 @@
 import pandas as pd
 
+from data_exporter import DataExporter
+from near_duplicates import NearDuplicateDetector
+
 class DuplicatesCleaner:
     """
     Clase para eliminar duplicados en el DataFrame basados en la columna 'case_number'.
     """
 
-    def __init__(self, df):
+    def __init__(self, df, copy=True):
         """
         Inicializa la clase con un DataFrame.
 
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
+        self.clusters = None
 
     def remove_duplicates(self):
         """
         Elimina duplicados en la columna 'case_number', manteniendo la primera ocurrencia.
         """
         if "case_number" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
             
             # Mostrar tamaño antes
             print(f"\n🔹 Tamaño antes de eliminar duplicados: {self.cleaned_df.shape}")
@@ -32,6 +39,28 @@ class DuplicatesCleaner:
         else:
             print("❌ La columna 'case_number' no existe en el DataFrame.")
 
+    def remove_near_duplicates(self, threshold=0.9, window=5, collapse=True):
+        """
+        Busca incidentes repetidos con distinto 'case_number' (ver NearDuplicateDetector)
+        y, si se indica, deja solo la primera fila de cada grupo. Los grupos encontrados
+        quedan en self.clusters.
+
+        :param threshold: Similitud mínima (0-1) para considerar dos filas duplicadas.
+        :param window: Tamaño de la ventana del vecindario ordenado.
+        :param collapse: Si es False solo se buscan los grupos y no se elimina ninguna fila.
+        """
+        if self.original_df is not None:
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            detector = NearDuplicateDetector(self.cleaned_df, window=window, threshold=threshold)
+            self.clusters = detector.find_clusters()
+
+            if collapse:
+                print(f"\n🔹 Tamaño antes de eliminar casi duplicados: {self.cleaned_df.shape}")
+                self.cleaned_df = detector.collapse(self.clusters)
+                print(f"✅ Tamaño después de eliminar casi duplicados: {self.cleaned_df.shape}")
+        else:
+            print("❌ No hay datos cargados.")
+
     def get_cleaned_data(self):
         """
         Devuelve el DataFrame sin duplicados.
@@ -40,14 +69,16 @@ class DuplicatesCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
 
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
@@ -62,4 +93,16 @@ if __name__ == "__main__":
     cleaner = DuplicatesCleaner(sample_data)
     print("🔹 Antes de la limpieza:", sample_data.shape)
     cleaner.remove_duplicates()
-    print("🔹 Después de la limpieza:", cleaner.get_cleaned_data().shape)
\ No newline at end of file
+    print("🔹 Después de la limpieza:", cleaner.get_cleaned_data().shape)
+
+    near_data = pd.DataFrame({
+        "case_number": ["2022.09.06", "2022.09.06.R", "2021.01.02"],
+        "date": ["06-Sep-2022", "06-Sep-2022", "02-Jan-2021"],
+        "year": [2022, 2022, 2021],
+        "country": ["BAHAMAS", "BAHAMAS", "USA"],
+        "location": ["Green Cay, Exumas", "Green Cay, Exuma", "Cocoa Beach"],
+        "name": ["Caroline DiPlacido", "Caroline Diplacido", "male"],
+    })
+    cleaner = DuplicatesCleaner(near_data)
+    cleaner.remove_near_duplicates()
+    print(cleaner.clusters)
\ No newline at end of file
@@ -1,48 +1,118 @@
 import pandas as pd
 
+from data_exporter import DataExporter
+from group_imputer import GroupImputer
+from imputation_stats import count_values, mode_from_counts
+from rule_pack import load_rule_pack
+from value_mapper import ValueMapper
+
 class FatalCleaner:
     """
     Clase para limpiar y dar formato a la columna 'fatal_y/n' del DataFrame.
     """
 
-    def __init__(self, df):
+    input_column = "fatal_y/n"
+    column = "fatal"
+    rule_section = "fatal"
+
+    def __init__(self, df, copy=True, rules=None):
         """
         Inicializa la clase con un DataFrame.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas).
+                      Por defecto el de config/rules.json (ver load_rule_pack).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
+        self.rules = load_rule_pack(rules)
 
-    def clean_fatal_column(self):
+    def clean_fatal_column(self, fill_value=None, group_by=None):
         """
         Limpia la columna 'fatal_y/n':
         - Renombra la columna a 'fatal'
         - Convierte los valores a booleanos (1 para fatal, 0 para no fatal)
         - Rellena valores nulos o no concluyentes con la moda
+
+        :param fill_value: Valor de relleno ya calculado (por ejemplo, sobre todo el archivo
+                           en StreamingCleaner). Por defecto se calcula sobre esta columna.
+        :param group_by: Niveles de agrupación para rellenar con la moda de cada grupo
+                         (ver GroupImputer; por ejemplo, IMPUTATION_LEVELS). fill_value
+                         queda como valor para las filas sin grupo con datos suficientes.
         """
         if "fatal_y/n" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
             self.cleaned_df.rename(columns={"fatal_y/n": "fatal"}, inplace=True)
-
-            # Función de limpieza con apply()
-            def clean_value(value):
-                if pd.isna(value) or value in ["UNKNOWN", "Nq", "F", 2017, " N", "N "]:
-                    return None  # Convertimos valores problemáticos a NaN
-                if str(value).strip().upper() in ["Y", "Y X 2"]:
-                    return 1  # Fatal
-                return 0  # No fatal
-
-            self.cleaned_df["fatal"] = self.cleaned_df["fatal"].apply(clean_value)
+            fatal = self.clean_values(self.cleaned_df["fatal"], self.rules)
 
             # Rellenar valores nulos con la moda
-            mode_value = self.cleaned_df["fatal"].mode()[0]
-            self.cleaned_df["fatal"] = self.cleaned_df["fatal"].fillna(mode_value)
+            if fill_value is None:
+                fill_value = self.fill_value_from_statistics(self.collect_statistics(fatal))
+            if group_by is not None:
+                fill_value = GroupImputer(group_by).fill_values(fatal, self.cleaned_df, fallback=fill_value)
+            self.cleaned_df["fatal"] = self.fill_missing(fatal, fill_value)
 
             print("✅ Columna 'fatal' limpiada.")
         else:
             print("❌ La columna 'fatal_y/n' no existe en el DataFrame.")
 
+    @staticmethod
+    def clean_values(fatal, rules=None):
+        """
+        Convierte los valores de 'fatal_y/n' a 1/0 sin rellenar los nulos.
+
+        :param fatal: Serie de Pandas con los valores originales.
+        :param rules: Paquete de reglas (por defecto el de config/rules.json).
+        :return: Serie limpia.
+        """
+        rules = load_rule_pack(rules)
+
+        # Función de limpieza (se aplica una sola vez por valor distinto)
+        def clean_value(value):
+            if pd.isna(value) or value in rules.fatal_invalid:
+                return None  # Convertimos valores problemáticos a NaN
+            if str(value).strip().upper() in rules.fatal_values:
+                return 1  # Fatal
+            return 0  # No fatal
+
+        return ValueMapper(clean_value).map(fatal)
+
+    @staticmethod
+    def collect_statistics(values):
+        """
+        Calcula la estadística parcial de la columna limpia (conteos para la moda).
+
+        :param values: Serie devuelta por clean_values().
+        :return: Serie con el número de apariciones por valor.
+        """
+        return count_values(values)
+
+    @staticmethod
+    def fill_value_from_statistics(statistics):
+        """
+        Calcula el valor de relleno a partir de las estadísticas (combinadas) de la columna.
+
+        :param statistics: Conteos devueltos por collect_statistics().
+        :return: La moda.
+        """
+        return mode_from_counts(statistics)
+
+    @staticmethod
+    def fill_missing(values, fill_value):
+        """
+        Rellena los valores nulos con el valor indicado.
+
+        :param values: Serie devuelta por clean_values().
+        :param fill_value: Valor de relleno (si es None no se rellena).
+        :return: Serie rellenada.
+        """
+        if fill_value is None:
+            return values
+        return values.fillna(fill_value)
+
     def get_cleaned_data(self):
         """
         Devuelve el DataFrame con la columna 'fatal' limpia.
@@ -51,14 +121,16 @@ class FatalCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
@@ -0,0 +1,47 @@
+import hashlib
+import os
+import secrets
+
+def file_fingerprint(file_path, chunk_size=1024 * 1024):
+    """
+    Calcula una huella del archivo a partir de su contenido (SHA-256) y su fecha de modificación.
+    Si el archivo cambia, cambia la huella y las cachés asociadas dejan de ser válidas.
+
+    :param file_path: Ruta del archivo.
+    :param chunk_size: Tamaño de los bloques de lectura en bytes.
+    :return: Cadena hexadecimal de 16 caracteres.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as source:
+        for block in iter(lambda: source.read(chunk_size), b""):
+            digest.update(block)
+    digest.update(str(os.stat(file_path).st_mtime_ns).encode())
+    return digest.hexdigest()[:16]
+
+def atomic_write(output_path, write_func):
+    """
+    Escribe un archivo de forma atómica: primero en un temporal del mismo directorio
+    y después lo renombra, así un lector nunca ve un archivo a medio escribir.
+
+    :param output_path: Ruta final del archivo.
+    :param write_func: Función que recibe la ruta temporal y escribe en ella.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    suffix = os.path.splitext(output_path)[1]  # Algunos motores eligen el formato por la extensión
+    # El temporal se crea con 0666 y el sistema le aplica la umask, como a un archivo
+    # normal (mkstemp lo crearía con 0600 y leer la umask la cambia para todos los hilos)
+    while True:
+        temp_path = os.path.join(directory, f".tmp-{secrets.token_hex(8)}{suffix}")
+        try:
+            os.close(os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+            break
+        except FileExistsError:
+            continue
+    try:
+        write_func(temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
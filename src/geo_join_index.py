@@ -0,0 +1,265 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from country_resolver import CountryResolver
+from file_cache import atomic_write, file_fingerprint
+from natural_earth import ADMIN_0_PATH, ADMIN_1_PATH, read_dbf
+
+# Atributos de cada capa que se conservan en el índice
+ADMIN_0_FIELDS = ["ADMIN", "NAME", "NAME_LONG", "ADM0_A3", "ISO_A3", "CONTINENT", "POP_EST", "POP_YEAR"]
+ADMIN_1_FIELDS = ["name", "name_alt", "postal", "abbrev", "admin", "adm1_code", "iso_3166_2"]
+
+class GeoJoinIndex:
+    """
+    Clase para unir los datos del GSAF con los polígonos de Natural Earth.
+
+    Construye una sola vez un índice de claves: cada 'country' normalizado
+    (incluidas las variantes de CountryResolver) apunta al identificador del
+    polígono de admin_0 y cada par país/'state' al de admin_1. El identificador
+    es la posición del registro en el shapefile, la misma que usan los lectores
+    de shapefiles (cartopy, geopandas). El índice se guarda en disco junto a los
+    shapefiles y se reconstruye solo si cambian.
+
+    Con el índice, los agregados se unen a los polígonos con una única unión
+    por hash y las tasas por habitante salen de POP_EST sin más búsquedas.
+    """
+
+    def __init__(self, admin_0_path=ADMIN_0_PATH, admin_1_path=ADMIN_1_PATH, resolver=None, index_path=None):
+        """
+        Inicializa la clase y carga (o construye) el índice.
+
+        :param admin_0_path: Shapefile de países de Natural Earth.
+        :param admin_1_path: Shapefile de estados y provincias de Natural Earth.
+        :param resolver: CountryResolver para los nombres de país (se crea uno por defecto).
+        :param index_path: Ruta del índice persistido. Por defecto en la carpeta .cache
+                           junto a los shapefiles, con la huella de los archivos en el nombre.
+        """
+        self.admin_0_path = admin_0_path
+        self.admin_1_path = admin_1_path
+        self.resolver = resolver or CountryResolver(admin_0_path)
+        self.index_path = index_path or self._default_index_path()
+
+        if os.path.exists(self.index_path):
+            tables = pd.read_pickle(self.index_path)
+        else:
+            tables = self.build()
+            atomic_write(self.index_path, lambda path: pd.to_pickle(tables, path))
+            print(f"✅ Índice de unión geográfica guardado en {self.index_path}")
+
+        self.countries = tables["countries"]
+        self.states = tables["states"]
+        self.country_keys = tables["country_keys"]
+        self.state_keys = tables["state_keys"]
+
+    def build(self):
+        """
+        Construye las tablas del índice a partir de los shapefiles.
+
+        :return: Diccionario con las tablas 'countries', 'states', 'country_keys' y 'state_keys'.
+        """
+        countries = read_dbf(self.admin_0_path, columns=ADMIN_0_FIELDS)
+        countries.index.name = "admin_0_id"
+        countries["country"] = [
+            self.resolver.canonical_name(name, name_long)
+            for name, name_long in zip(countries["NAME"], countries["NAME_LONG"])
+        ]
+
+        # Cada variante conocida apunta al polígono de su país canónico
+        # (por ejemplo, 'REUNION' -> 'FRANCE' -> polígono de Francia)
+        feature_ids = pd.Series(countries.index, index=countries["country"])
+        feature_ids = feature_ids[~feature_ids.index.duplicated()]
+        canonical_ids = {name: feature_ids[name] for name in feature_ids.index}
+        country_keys = pd.Series({
+            alias: canonical_ids[self.resolver.names[alias]]
+            for alias in self.resolver.names
+            if self.resolver.names[alias] in canonical_ids
+        }, name="admin_0_id", dtype="int64")
+        country_keys.index.name = "key"
+
+        states = read_dbf(self.admin_1_path, columns=ADMIN_1_FIELDS)
+        states.index.name = "admin_1_id"
+        states["country"] = [self.resolver.resolve(admin)[0] for admin in states["admin"]]
+
+        state_records = []
+        for admin_1_id, state in states.iterrows():
+            aliases = [state["name"], state["postal"], state["abbrev"]]
+            aliases += str(state["name_alt"] or "").split("|")
+            for alias in aliases:
+                if alias:
+                    key = (self.resolver.normalize(state["country"]), self.resolver.normalize(alias))
+                    state_records.append((key, admin_1_id))
+        state_keys = pd.Series(dict(reversed(state_records)), name="admin_1_id", dtype="int64")
+        state_keys.index.names = ["country_key", "state_key"]
+
+        return {
+            "countries": countries,
+            "states": states,
+            "country_keys": country_keys,
+            "state_keys": state_keys,
+        }
+
+    def country_ids(self, countries, fuzzy=True):
+        """
+        Devuelve el identificador de admin_0 de cada fila (una búsqueda por valor distinto).
+
+        :param countries: Serie con la columna 'country'.
+        :param fuzzy: Si es True, los valores sin clave exacta se resuelven con CountryResolver.
+        :return: Serie Int64 con el identificador (nulo si no hay polígono).
+        """
+        codes, uniques = pd.factorize(countries)
+        keys = [self._country_key(value, fuzzy) for value in uniques]
+        positions = self.country_keys.index.get_indexer(keys)
+        ids = np.where(positions >= 0, self.country_keys.to_numpy()[positions], -1)
+        return self._broadcast(ids, codes, countries.index, "admin_0_id")
+
+    def state_ids(self, countries, states, fuzzy=True):
+        """
+        Devuelve el identificador de admin_1 de cada fila a partir del país y el estado.
+
+        :param countries: Serie con la columna 'country'.
+        :param states: Serie con la columna 'state'.
+        :param fuzzy: Si es True, los países sin clave exacta se resuelven con CountryResolver.
+        :return: Serie Int64 con el identificador (nulo si no hay polígono).
+        """
+        pairs = pd.MultiIndex.from_arrays([countries, states])
+        codes, uniques = pd.factorize(pairs)
+        keys = [
+            (self.resolver.normalize(self._canonical_country(country, fuzzy)), self.resolver.normalize(state))
+            for country, state in uniques
+        ]
+        positions = self.state_keys.index.get_indexer(pd.MultiIndex.from_tuples(keys, names=["country_key", "state_key"])) \
+            if keys else np.array([], dtype=int)
+        ids = np.where(positions >= 0, self.state_keys.to_numpy()[positions], -1)
+        return self._broadcast(ids, codes, countries.index, "admin_1_id")
+
+    def join_countries(self, df, per=1_000_000, fuzzy=True):
+        """
+        Agrega los ataques por país y los une a los atributos de admin_0.
+
+        :param df: DataFrame limpio con 'country' (y opcionalmente 'fatal').
+        :param per: Base de las tasas por habitante (por defecto por millón).
+        :param fuzzy: Si es True, los países sin clave exacta se resuelven con CountryResolver.
+        :return: DataFrame indexado por admin_0_id con los atributos, 'attacks', 'fatal'
+                 y las tasas 'attacks_per_capita' y 'fatal_per_capita'.
+        """
+        ids = self.country_ids(df["country"], fuzzy=fuzzy)
+        return self._join(df, ids, self.countries, "POP_EST", per)
+
+    def join_states(self, df, fuzzy=True):
+        """
+        Agrega los ataques por estado y los une a los atributos de admin_1.
+
+        :param df: DataFrame limpio con 'country', 'state' (y opcionalmente 'fatal').
+        :param fuzzy: Si es True, los países sin clave exacta se resuelven con CountryResolver.
+        :return: DataFrame indexado por admin_1_id con los atributos, 'attacks' y 'fatal'.
+        """
+        ids = self.state_ids(df["country"], df["state"], fuzzy=fuzzy)
+        return self._join(df, ids, self.states, None, None)
+
+    def _join(self, df, ids, features, population_column, per):
+        """
+        Cuenta los ataques (y los fatales) por identificador y los une a la capa.
+
+        :param df: DataFrame limpio.
+        :param ids: Identificador del polígono de cada fila.
+        :param features: Tabla de atributos de la capa.
+        :param population_column: Columna de población para las tasas (o None).
+        :param per: Base de las tasas por habitante.
+        :return: DataFrame con una fila por polígono.
+        """
+        matched = ids.notna()
+        aggregates = pd.DataFrame({"attacks": np.ones(int(matched.sum()), dtype="int64")},
+                                  index=pd.Index(ids[matched].to_numpy(), name=features.index.name))
+        if "fatal" in df.columns:
+            aggregates["fatal"] = pd.to_numeric(df["fatal"][matched], errors="coerce").fillna(0).to_numpy()
+        aggregates = aggregates.groupby(level=0).sum()
+
+        joined = features.join(aggregates, how="left")
+        joined[aggregates.columns] = joined[aggregates.columns].fillna(0).astype("int64")
+        if population_column is not None:
+            population = joined[population_column].where(joined[population_column] > 0)
+            for column in aggregates.columns:
+                joined[f"{column}_per_capita"] = joined[column] / population * per
+
+        print(f"✅ {int(matched.sum())} filas unidas a {int((joined['attacks'] > 0).sum())} polígonos "
+              f"({int((~matched).sum())} sin polígono).")
+        return joined
+
+    def _country_key(self, value, fuzzy):
+        """
+        Normaliza un país para buscarlo en el índice.
+
+        :param value: Valor de 'country'.
+        :param fuzzy: Si es True y no hay clave exacta, se resuelve con CountryResolver.
+        :return: Clave normalizada.
+        """
+        key = self.resolver.normalize(value)
+        if key in self.country_keys.index or not fuzzy:
+            return key
+        name, _ = self.resolver.resolve(value)
+        return self.resolver.normalize(name) if name is not None else key
+
+    def _canonical_country(self, value, fuzzy):
+        """
+        Devuelve el nombre canónico de un país (o el propio valor si no se resuelve).
+
+        :param value: Valor de 'country'.
+        :param fuzzy: Si es True se admite la búsqueda aproximada.
+        :return: Nombre del país.
+        """
+        if pd.isna(value):
+            return ""
+        key = self.resolver.normalize(value)
+        if key in self.resolver.names:
+            return self.resolver.names[key]
+        if fuzzy:
+            name, _ = self.resolver.resolve(value)
+            if name is not None:
+                return name
+        return str(value)
+
+    @staticmethod
+    def _broadcast(ids, codes, index, name):
+        """
+        Reparte los identificadores de los valores distintos a todas las filas.
+
+        :param ids: Identificador por valor distinto (-1 si no hay).
+        :param codes: Códigos de factorize (-1 para los nulos).
+        :param index: Índice de la serie original.
+        :param name: Nombre de la serie resultante.
+        :return: Serie Int64.
+        """
+        ids = np.append(ids, -1).astype("int64")[codes]
+        return pd.Series(ids, index=index, name=name).where(ids >= 0).astype("Int64")
+
+    def _default_index_path(self):
+        """
+        Calcula la ruta del índice a partir de la huella de los shapefiles y de los nombres.
+
+        :return: Ruta del archivo del índice.
+        """
+        parts = [
+            file_fingerprint(os.path.splitext(self.admin_0_path)[0] + ".dbf"),
+            file_fingerprint(os.path.splitext(self.admin_1_path)[0] + ".dbf"),
+            self.resolver.index_key,
+        ]
+        fingerprint = hashlib.sha256("-".join(parts).encode("utf-8")).hexdigest()[:16]
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(self.admin_0_path)), ".cache")
+        return os.path.join(cache_dir, f"geo_join_index.{fingerprint}.pkl")
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "country": ["USA", "USA", "AUSTRALIA", "SOUTH AFRICA", "REUNION", "COLUMBIA", "INTERNATIONAL WATERS"],
+        "state": ["Florida", "FL", "New South Wales", "KwaZulu-Natal", None, None, None],
+        "fatal": [0, 1, 1, 0, 1, 0, 1],
+    })
+
+    index = GeoJoinIndex()
+    countries = index.join_countries(sample_data)
+    print(countries.loc[countries["attacks"] > 0, ["country", "POP_EST", "attacks", "fatal", "attacks_per_capita"]])
+    states = index.join_states(sample_data)
+    print(states.loc[states["attacks"] > 0, ["name", "country", "attacks", "fatal"]])
@@ -0,0 +1,316 @@
+import json
+import os
+import struct
+
+import numpy as np
+import pyarrow as pa
+
+from file_cache import atomic_write, file_fingerprint
+from natural_earth import ADMIN_0_PATH, ADMIN_1_PATH, read_dbf, read_shp
+
+# Tolerancias de simplificación en grados (además de la geometría original)
+SIMPLIFY_TOLERANCES = (0.1, 0.5)
+
+# Códigos de tipo de WKB
+WKB_TYPES = {"Point": 1, "LineString": 2, "Polygon": 3, "MultiPoint": 4, "MultiLineString": 5, "MultiPolygon": 6}
+
+class GeometryStore:
+    """
+    Clase para leer las capas de Natural Earth desde una caché binaria en vez
+    de analizar el shapefile cada vez.
+
+    La primera vez convierte la capa a un archivo Arrow IPC sin comprimir con
+    los atributos del .dbf y la geometría en WKB: la original y una versión
+    simplificada (Douglas-Peucker) por cada tolerancia. El archivo lleva los
+    metadatos 'geo' de GeoParquet, así que también se puede abrir con
+    geopandas.read_feather(). Las siguientes veces el archivo se abre mapeado
+    en memoria y solo cuando se accede a él, y cada mapa lee únicamente la
+    columna de la resolución que necesita.
+    """
+
+    def __init__(self, shapefile_path=ADMIN_0_PATH, tolerances=SIMPLIFY_TOLERANCES, cache_dir=None):
+        """
+        Inicializa la clase sin leer todavía ningún archivo.
+
+        :param shapefile_path: Ruta del shapefile (.shp) de la capa.
+        :param tolerances: Tolerancias de simplificación en unidades de la capa (grados).
+        :param cache_dir: Carpeta de la caché. Por defecto .cache junto al shapefile.
+        """
+        self.shapefile_path = shapefile_path
+        self.tolerances = tuple(sorted(tolerances))
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(shapefile_path)), ".cache")
+        self._cache_path = None
+        self._table = None
+        self._parts = {}
+
+    @property
+    def cache_path(self):
+        """
+        Ruta del archivo de caché, con la huella del shapefile y las tolerancias en el nombre.
+        """
+        if self._cache_path is None:
+            base_path = os.path.splitext(self.shapefile_path)[0]
+            fingerprint = "-".join(file_fingerprint(base_path + extension) for extension in (".shp", ".dbf"))
+            tolerances = "-".join(f"{tolerance:g}" for tolerance in self.tolerances)
+            name = os.path.basename(base_path)
+            self._cache_path = os.path.join(self.cache_dir, f"{name}.{fingerprint[:16]}.{tolerances}.arrow")
+        return self._cache_path
+
+    @property
+    def table(self):
+        """
+        Tabla Arrow de la capa, mapeada en memoria (se construye la caché si no existe).
+        """
+        if self._table is None:
+            if not os.path.exists(self.cache_path):
+                self.build()
+            with pa.memory_map(self.cache_path) as source:
+                self._table = pa.ipc.open_file(source).read_all()
+        return self._table
+
+    def build(self):
+        """
+        Lee el shapefile, simplifica las geometrías y guarda la caché.
+        """
+        attributes = read_dbf(self.shapefile_path)
+        shape_type, geometries = read_shp(self.shapefile_path)
+
+        table = pa.Table.from_pandas(attributes, preserve_index=False)
+        geometry_types = set()
+        for tolerance in (0, *self.tolerances):
+            wkb = []
+            for parts in geometries:
+                parts = [self.simplify(part, tolerance, closed=shape_type == "Polygon") for part in parts] \
+                    if tolerance else parts
+                geometry_type, geometry = self.to_wkb(shape_type, parts)
+                geometry_types.add(geometry_type)
+                wkb.append(geometry)
+            table = table.append_column(self.column_name(tolerance), pa.array(wkb, type=pa.binary()))
+
+        geometry_types.discard(None)
+        columns = {
+            self.column_name(tolerance): {"encoding": "WKB", "geometry_types": sorted(geometry_types)}
+            for tolerance in (0, *self.tolerances)
+        }
+        geo = {"version": "1.0.0", "primary_column": "geometry", "columns": columns}
+        table = table.replace_schema_metadata({
+            "geo": json.dumps(geo),
+            "tolerances": json.dumps(list(self.tolerances)),
+        })
+
+        def write(path):
+            with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        atomic_write(self.cache_path, write)
+        print(f"✅ Caché de geometrías guardada en {self.cache_path}")
+
+    def attributes(self, columns=None):
+        """
+        Devuelve los atributos de la capa (sin geometría).
+
+        :param columns: Lista de columnas a leer (por defecto todas).
+        :return: DataFrame con una fila por registro.
+        """
+        geometry_columns = {self.column_name(tolerance) for tolerance in (0, *self.tolerances)}
+        names = columns or [name for name in self.table.column_names if name not in geometry_columns]
+        return self.table.select(names).to_pandas()
+
+    def geometries(self, tolerance=None):
+        """
+        Devuelve la geometría WKB de cada registro en la resolución pedida.
+
+        :param tolerance: Tolerancia de simplificación (None u 0 para la original).
+        :return: Lista de bytes WKB (None en los registros sin geometría).
+        """
+        return self.table.column(self.column_name(tolerance)).to_pylist()
+
+    def parts(self, tolerance=None):
+        """
+        Devuelve las coordenadas de cada registro en la resolución pedida, como
+        lista de arrays (n, 2) (anillos, líneas o puntos). Se guardan en memoria
+        para que los siguientes mapas no vuelvan a decodificar el WKB.
+
+        :param tolerance: Tolerancia de simplificación (None u 0 para la original).
+        :return: Lista con las partes de cada registro.
+        """
+        column = self.column_name(tolerance)
+        if column not in self._parts:
+            self._parts[column] = [self.from_wkb(geometry) for geometry in self.geometries(tolerance)]
+        return self._parts[column]
+
+    def to_geodataframe(self, tolerance=None):
+        """
+        Devuelve la capa como GeoDataFrame (requiere geopandas).
+
+        :param tolerance: Tolerancia de simplificación (None u 0 para la original).
+        :return: GeoDataFrame con los atributos y la geometría en la resolución pedida.
+        """
+        import geopandas as gpd
+
+        geometry = gpd.GeoSeries.from_wkb(self.geometries(tolerance), crs="EPSG:4326")
+        return gpd.GeoDataFrame(self.attributes(), geometry=geometry)
+
+    def column_name(self, tolerance=None):
+        """
+        Devuelve la columna de geometría de una tolerancia.
+
+        :param tolerance: Tolerancia de simplificación (None u 0 para la original).
+        :return: Nombre de la columna.
+        """
+        if not tolerance:
+            return "geometry"
+        if tolerance not in self.tolerances:
+            raise ValueError(f"Tolerancia no disponible: {tolerance}. Usa una de {list(self.tolerances)}")
+        return f"geometry_{tolerance:g}"
+
+    @staticmethod
+    def simplify(points, tolerance, closed=False):
+        """
+        Simplifica una línea o un anillo con el algoritmo de Douglas-Peucker.
+        Los anillos que se quedarían sin área se devuelven sin simplificar.
+
+        :param points: Array (n, 2) de coordenadas.
+        :param tolerance: Distancia máxima entre la línea original y la simplificada.
+        :param closed: Si es True la parte es un anillo (necesita al menos 4 puntos).
+        :return: Array con los puntos que se conservan.
+        """
+        if len(points) <= 2:
+            return points
+
+        keep = np.zeros(len(points), dtype=bool)
+        keep[0] = keep[-1] = True
+        stack = [(0, len(points) - 1)]
+        while stack:
+            first, last = stack.pop()
+            if last - first < 2:
+                continue
+            segment = points[last] - points[first]
+            offsets = points[first + 1:last] - points[first]
+            length = np.hypot(*segment)
+            if length == 0:
+                # Principio y final iguales (anillo): se usa la distancia al punto
+                distances = np.hypot(offsets[:, 0], offsets[:, 1])
+            else:
+                distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+            farthest = int(np.argmax(distances))
+            if distances[farthest] > tolerance:
+                middle = first + 1 + farthest
+                keep[middle] = True
+                stack += [(first, middle), (middle, last)]
+
+        simplified = points[keep]
+        if closed and len(simplified) < 4:
+            return points
+        return simplified
+
+    @staticmethod
+    def to_wkb(shape_type, parts):
+        """
+        Codifica las partes de un registro de shapefile como WKB (little-endian).
+        En los polígonos, los anillos en sentido horario empiezan un polígono nuevo
+        y los antihorarios son huecos del anterior, como define el formato shapefile.
+
+        :param shape_type: Tipo de geometría del shapefile ('Point', 'LineString', 'Polygon', 'MultiPoint').
+        :param parts: Lista de arrays (n, 2) de coordenadas.
+        :return: Tupla (tipo de geometría WKB, bytes) o (None, None) si no hay partes.
+        """
+        if not parts:
+            return None, None
+
+        def header(geometry_type, count=None):
+            code = struct.pack("<BI", 1, WKB_TYPES[geometry_type])
+            return code if count is None else code + struct.pack("<I", count)
+
+        def coordinates(points):
+            return struct.pack("<I", len(points)) + np.ascontiguousarray(points, dtype="<f8").tobytes()
+
+        if shape_type in ("Point", "MultiPoint"):
+            points = [header("Point") + np.ascontiguousarray(part[0], dtype="<f8").tobytes() for part in parts]
+            if shape_type == "Point":
+                return "Point", points[0]
+            return "MultiPoint", header("MultiPoint", len(points)) + b"".join(points)
+
+        if shape_type == "LineString":
+            lines = [header("LineString") + coordinates(part) for part in parts]
+            if len(lines) == 1:
+                return "LineString", lines[0]
+            return "MultiLineString", header("MultiLineString", len(lines)) + b"".join(lines)
+
+        polygons = []
+        for ring in parts:
+            x, y = ring[:, 0], ring[:, 1]
+            clockwise = np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]) < 0
+            if clockwise or not polygons:
+                polygons.append([ring])
+            else:
+                polygons[-1].append(ring)
+        polygons = [header("Polygon", len(rings)) + b"".join(coordinates(ring) for ring in rings)
+                    for rings in polygons]
+        if len(polygons) == 1:
+            return "Polygon", polygons[0]
+        return "MultiPolygon", header("MultiPolygon", len(polygons)) + b"".join(polygons)
+
+    @staticmethod
+    def from_wkb(geometry):
+        """
+        Decodifica WKB (little-endian, 2D) a una lista de arrays (n, 2) de coordenadas.
+
+        :param geometry: Bytes WKB (o None).
+        :return: Lista de partes (anillos, líneas o puntos).
+        """
+        if geometry is None:
+            return []
+
+        parts = []
+
+        def read(position):
+            geometry_type = struct.unpack_from("<I", geometry, position + 1)[0]
+            position += 5
+            if geometry_type == WKB_TYPES["Point"]:
+                parts.append(np.frombuffer(geometry, "<f8", 2, position).reshape(1, 2))
+                return position + 16
+            count = struct.unpack_from("<I", geometry, position)[0]
+            position += 4
+            if geometry_type == WKB_TYPES["LineString"]:
+                parts.append(np.frombuffer(geometry, "<f8", 2 * count, position).reshape(-1, 2))
+                return position + 16 * count
+            if geometry_type == WKB_TYPES["Polygon"]:
+                for _ in range(count):
+                    point_count = struct.unpack_from("<I", geometry, position)[0]
+                    parts.append(np.frombuffer(geometry, "<f8", 2 * point_count, position + 4).reshape(-1, 2))
+                    position += 4 + 16 * point_count
+                return position
+            for _ in range(count):
+                position = read(position)
+            return position
+
+        read(0)
+        return parts
+
+# Capas compartidas por los mapas (cada una se abre una sola vez por proceso)
+LAYERS = {}
+
+def load_layer(shapefile_path, tolerances=SIMPLIFY_TOLERANCES):
+    """
+    Devuelve el GeometryStore de una capa, reutilizando el ya abierto si lo hay.
+
+    :param shapefile_path: Ruta del shapefile (.shp) de la capa.
+    :param tolerances: Tolerancias de simplificación.
+    :return: GeometryStore de la capa.
+    """
+    key = (os.path.abspath(shapefile_path), tuple(sorted(tolerances)))
+    if key not in LAYERS:
+        LAYERS[key] = GeometryStore(shapefile_path, tolerances)
+    return LAYERS[key]
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    for path in (ADMIN_0_PATH, ADMIN_1_PATH):
+        store = load_layer(path)
+        points = {
+            tolerance: sum(len(part) for parts in store.parts(tolerance) for part in parts)
+            for tolerance in (None, *store.tolerances)
+        }
+        print(f"🔹 {os.path.basename(path)}: {len(store.table)} registros, puntos por resolución {points}")
+    print(load_layer(ADMIN_0_PATH).attributes(["NAME", "POP_EST"]).head())
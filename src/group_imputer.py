@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+# Niveles de agrupación por defecto, del más fino al más general (al final se usa el valor global)
+IMPUTATION_LEVELS = [("country", "decade"), ("country",), ("decade",)]
+
+# Claves que no son columnas sino que se calculan a partir de una
+DERIVED_KEYS = {
+    "decade": ("year", lambda year: pd.to_numeric(year, errors="coerce") // 10 * 10),
+}
+
+class GroupImputer:
+    """
+    Clase para calcular valores de relleno por grupo (por ejemplo, la moda de
+    'species' en cada país y década) en lugar de un único valor global.
+
+    Cada fila toma el valor del primer nivel de IMPUTATION_LEVELS en el que su
+    grupo tiene al menos 'min_count' valores observados; si no hay ninguno, el
+    valor global. Las claves de todos los niveles se convierten en códigos
+    enteros y se apilan, así que las estadísticas de todos los grupos de todos
+    los niveles salen de una sola pasada de groupby.
+    """
+
+    def __init__(self, levels=IMPUTATION_LEVELS, strategy="mode", min_count=5):
+        """
+        Inicializa la clase con los niveles de agrupación.
+
+        :param levels: Lista de tuplas de columnas (o claves de DERIVED_KEYS), del nivel más fino al más general.
+        :param strategy: 'mode' (valor más frecuente) o 'mean' (media truncada a entero).
+        :param min_count: Número mínimo de valores observados para usar la estadística de un grupo.
+        """
+        if strategy not in ("mode", "mean"):
+            raise ValueError(f"Estrategia no soportada: {strategy}. Usa 'mode' o 'mean'")
+        self.levels = [tuple(level) for level in levels]
+        self.strategy = strategy
+        self.min_count = min_count
+
+    def fill_values(self, values, df, fallback=None):
+        """
+        Calcula el valor de relleno de cada fila.
+
+        :param values: Serie con los valores limpios (nulos los que hay que rellenar).
+        :param df: DataFrame con las columnas de agrupación, alineado con values.
+        :param fallback: Valor global para las filas sin ningún grupo con datos suficientes.
+        :return: Serie con el mismo índice que values.
+        """
+        keys = self.group_keys(df)
+        if self.strategy == "mode":
+            value_codes, uniques = pd.factorize(values, sort=True)
+            table, counts = self._statistics(keys, value_codes)
+        else:
+            uniques = None
+            table, counts = self._statistics(keys, pd.to_numeric(values, errors="coerce").to_numpy(dtype=float))
+
+        # Se toma el primer nivel con datos suficientes (un bucle por nivel, no por fila)
+        fill = np.full(len(values), np.nan)
+        for level_keys in keys:
+            valid = level_keys >= 0
+            statistic = np.full(len(values), np.nan)
+            statistic[valid] = np.where(counts[level_keys[valid]] >= self.min_count, table[level_keys[valid]], np.nan)
+            fill = np.where(np.isnan(fill), statistic, fill)
+
+        if uniques is not None:
+            codes = np.nan_to_num(fill, nan=-1).astype(np.int64)
+            fill = pd.Series(np.asarray(uniques, dtype=object).take(codes), index=values.index).mask(codes < 0)
+        else:
+            fill = pd.Series(np.trunc(fill), index=values.index)
+        return fill if fallback is None else fill.fillna(fallback)
+
+    def group_keys(self, df):
+        """
+        Convierte las columnas de cada nivel en un código entero por fila. Los
+        códigos de los distintos niveles no se solapan, para poder apilarlos.
+
+        :param df: DataFrame con las columnas de agrupación.
+        :return: Matriz (niveles, filas) de códigos (-1 si falta alguna clave).
+        """
+        key_codes = {}
+        for column in {column for level in self.levels for column in level}:
+            if column in DERIVED_KEYS:
+                source, derive = DERIVED_KEYS[column]
+                key = derive(df[source]) if source in df.columns else pd.Series(np.nan, index=df.index)
+            elif column in df.columns:
+                key = df[column]
+            else:
+                raise ValueError(f"Columna de agrupación no encontrada: {column}")
+            codes, uniques = pd.factorize(key)
+            key_codes[column] = (codes.astype(np.int64), max(len(uniques), 1))
+
+        keys = np.empty((len(self.levels), len(df)), dtype=np.int64)
+        offset = 0
+        for position, level in enumerate(self.levels):
+            level_keys = np.zeros(len(df), dtype=np.int64)
+            missing = np.zeros(len(df), dtype=bool)
+            size = 1
+            for column in level:
+                codes, count = key_codes[column]
+                level_keys = level_keys * count + codes
+                missing |= codes < 0
+                size *= count
+            keys[position] = np.where(missing, -1, level_keys + offset)
+            offset += size
+        return keys
+
+    def _statistics(self, keys, values):
+        """
+        Calcula la estadística de todos los grupos de todos los niveles en una
+        sola pasada de groupby sobre las claves apiladas.
+
+        :param keys: Matriz (niveles, filas) de group_keys().
+        :param values: Códigos de los valores (moda, -1 para los nulos) o valores numéricos (media).
+        :return: Tupla (estadística por grupo, número de valores observados por grupo), indexadas por código de grupo.
+        """
+        size = int(keys.max()) + 1 if keys.size else 0
+        stacked = pd.DataFrame({"group": keys.ravel(), "value": np.tile(values, len(keys))})
+        observed = (stacked["group"] >= 0) & (stacked["value"] >= 0 if self.strategy == "mode" else stacked["value"].notna())
+        stacked = stacked[observed]
+
+        table = np.full(size, np.nan)
+        counts = np.zeros(size, dtype=np.int64)
+        if self.strategy == "mode":
+            # Moda: el valor con más apariciones y, en caso de empate, el menor (igual que mode_from_counts)
+            frequencies = stacked.groupby(["group", "value"]).size().reset_index(name="count")
+            frequencies = frequencies.sort_values(["group", "count", "value"], ascending=[True, False, True])
+            modes = frequencies.drop_duplicates("group")
+            table[modes["group"].to_numpy()] = modes["value"].to_numpy()
+            totals = frequencies.groupby("group")["count"].sum()
+        else:
+            statistics = stacked.groupby("group")["value"].agg(["sum", "count"])
+            table[statistics.index.to_numpy()] = statistics["sum"].to_numpy() / statistics["count"].to_numpy()
+            totals = statistics["count"]
+        counts[totals.index.to_numpy()] = totals.to_numpy()
+        return table, counts
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "country": ["USA"] * 6 + ["AUSTRALIA"] * 6 + ["FIJI"],
+        "year": [2001, 2003, 2005, 2008, 1955, 1958] * 2 + [2010],
+        "species": ["Large", "Large", "Large", None, "Small", None,
+                    "Medium", "Medium", None, "Medium", "Large", None, None],
+    })
+
+    imputer = GroupImputer(min_count=2)
+    fill = imputer.fill_values(sample_data["species"], sample_data, fallback="Medium")
+    print(sample_data.assign(fill=fill, imputed=sample_data["species"].fillna(fill)))
@@ -0,0 +1,73 @@
+import pandas as pd
+
+def count_values(values):
+    """
+    Cuenta las apariciones de cada valor no nulo. Es la estadística parcial
+    con la que se calcula la moda por bloques.
+
+    :param values: Serie de Pandas.
+    :return: Serie con el número de apariciones por valor.
+    """
+    return values.value_counts()
+
+def sum_values(values):
+    """
+    Suma y cuenta los valores no nulos. Es la estadística parcial con la que
+    se calcula la media por bloques.
+
+    :param values: Serie numérica de Pandas.
+    :return: Tupla (suma, número de valores).
+    """
+    return float(values.sum()), int(values.count())
+
+def combine_statistics(left, right):
+    """
+    Combina dos estadísticas parciales del mismo tipo (conteos o suma y número de valores).
+
+    :param left: Estadística acumulada (o None si es la primera).
+    :param right: Estadística de un nuevo bloque.
+    :return: Estadística combinada.
+    """
+    if left is None:
+        return right
+    if isinstance(left, pd.Series):
+        return left.add(right, fill_value=0)
+    return tuple(a + b for a, b in zip(left, right))
+
+def subtract_statistics(left, right):
+    """
+    Resta una estadística parcial de otra (por ejemplo, al quitar filas que han cambiado).
+
+    :param left: Estadística acumulada.
+    :param right: Estadística de las filas que se quitan.
+    :return: Estadística resultante.
+    """
+    if isinstance(left, pd.Series):
+        return left.sub(right, fill_value=0)
+    return tuple(a - b for a, b in zip(left, right))
+
+def mode_from_counts(counts):
+    """
+    Calcula la moda a partir de los conteos. En caso de empate devuelve el menor
+    valor, igual que Series.mode()[0].
+
+    :param counts: Serie con el número de apariciones por valor.
+    :return: Valor más frecuente o None si no hay valores.
+    """
+    counts = counts[counts > 0]
+    if counts.empty:
+        return None
+    return counts[counts == counts.max()].index.sort_values()[0]
+
+def mean_from_sums(sums):
+    """
+    Calcula la media entera a partir de la suma y el número de valores,
+    igual que int(Series.mean()).
+
+    :param sums: Tupla (suma, número de valores).
+    :return: Media truncada a entero o None si no hay valores.
+    """
+    total, count = sums
+    if count == 0:
+        return None
+    return int(total / count)
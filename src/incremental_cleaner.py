@@ -0,0 +1,274 @@
+import contextlib
+import io
+import os
+
+import pandas as pd
+
+from cleaning_pipeline import DEFAULT_STAGES
+from column_cleaner import ColumnCleaner
+from data_exporter import DataExporter
+from data_loader import DataLoader
+from dtype_optimizer import DtypeOptimizer
+from duplicates_cleaner import DuplicatesCleaner
+from file_cache import atomic_write
+from imputation_stats import combine_statistics, subtract_statistics
+from instrumentation import metrics
+from rule_pack import load_rule_pack
+
+# Versión del formato del archivo de estado
+STATE_VERSION = 1
+
+class IncrementalCleaner:
+    """
+    Clase para volver a limpiar una nueva versión del archivo GSAF limpiando solo
+    las filas nuevas o modificadas.
+
+    Guarda un archivo de estado con cada fila limpia pero sin imputar, una huella
+    de la fila original y las estadísticas de imputación acumuladas. En cada
+    actualización compara el archivo nuevo con el estado por 'case_number',
+    limpia solo las filas que han cambiado, actualiza las estadísticas restando
+    las filas antiguas y sumando las nuevas, y vuelve a rellenar los nulos de
+    todas las filas. El resultado es el mismo que limpiar el archivo completo.
+    El estado guarda la huella del paquete de reglas: si las reglas cambian,
+    se limpian de nuevo todas las filas.
+    """
+
+    def __init__(self, file_path, state_path, stages=None, verbose=False, rules=None):
+        """
+        Inicializa la clase con el archivo de datos y el archivo de estado.
+
+        :param file_path: Ruta del archivo de datos original (Excel, CSV, Parquet o Feather).
+        :param state_path: Ruta del archivo de estado (se crea en la primera ejecución).
+        :param stages: Lista de tuplas (clase limpiadora, método). Por defecto DEFAULT_STAGES.
+        :param verbose: Si es True se muestran los mensajes de cada limpiador.
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas) para las
+                      etapas que tienen reglas. Por defecto el de config/rules.json.
+        """
+        self.file_path = file_path
+        self.state_path = state_path
+        self.stages = list(stages) if stages is not None else list(DEFAULT_STAGES)
+        self.verbose = verbose
+        self.rules = load_rule_pack(rules)
+        self.cleaned_df = None
+        self.summary = None
+
+    def refresh(self):
+        """
+        Actualiza la limpieza con el contenido actual del archivo de datos.
+        """
+        with self._quiet():
+            loader = DataLoader(self.file_path)
+            loader.load_data()
+            raw_df = loader.get_data()
+            if raw_df is None:
+                print(f"❌ No se pudo cargar el archivo {self.file_path}")
+                return
+            raw_df = self._run_frame_stage(raw_df, ColumnCleaner)
+
+        if "case_number" not in raw_df.columns:
+            print("❌ La columna 'case_number' no existe en el DataFrame.")
+            return
+
+        keys = self._row_keys(raw_df["case_number"])
+        hashes = pd.Series(pd.util.hash_pandas_object(raw_df, index=False).to_numpy(), index=keys)
+        state = self._load_state()
+
+        # Filas nuevas o modificadas y filas que ya no existen
+        stored_hashes = state["row_hashes"]
+        known = keys.isin(stored_hashes.index)
+        dirty = ~known
+        dirty[known] = stored_hashes.loc[keys[known]].to_numpy() != hashes.to_numpy()[known]
+        stale_keys = stored_hashes.index.difference(keys).append(keys[dirty].intersection(stored_hashes.index))
+
+        # Estadísticas: se restan las filas antiguas y se suman las nuevas
+        statistics = dict(state["statistics"])
+        stale_rows = state["rows"].loc[stale_keys]
+        dirty_rows = self._clean_rows(raw_df[dirty].set_axis(keys[dirty]))
+        for stage in self._imputing_stages():
+            name = stage.__name__
+            if stage.column in stale_rows.columns and len(stale_rows):
+                statistics[name] = subtract_statistics(statistics[name], stage.collect_statistics(stale_rows[stage.column]))
+            if stage.column in dirty_rows.columns:
+                statistics[name] = combine_statistics(statistics.get(name), stage.collect_statistics(dirty_rows[stage.column]))
+
+        kept_rows = state["rows"].drop(stale_keys)
+        rows = pd.concat([part for part in (kept_rows, dirty_rows) if len(part)]).reindex(keys)
+        self._save_state({
+            "version": STATE_VERSION,
+            "rules_hash": self.rules.hash,
+            "rows": rows,
+            "row_hashes": hashes,
+            "statistics": statistics,
+        })
+
+        self.cleaned_df = self._finish(rows.set_axis(raw_df.index), statistics)
+        self.summary = {
+            "rows": len(raw_df),
+            "cleaned": int(dirty.sum()),
+            "removed": len(stored_hashes.index.difference(keys)),
+        }
+        print(f"✅ Limpieza incremental: {self.summary['cleaned']} filas limpiadas de {self.summary['rows']} "
+              f"({self.summary['removed']} eliminadas).")
+
+    def get_cleaned_data(self):
+        """
+        Devuelve el DataFrame limpio tras la última actualización.
+
+        :return: DataFrame limpio.
+        """
+        return self.cleaned_df
+
+    def save_cleaned_data(self, output_path, **options):
+        """
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
+
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
+        """
+        if self.cleaned_df is not None:
+            DataExporter(self.cleaned_df).save(output_path, **options)
+            print(f"✅ Datos limpios guardados en {output_path}")
+        else:
+            print("❌ No hay datos limpios para guardar.")
+
+    @staticmethod
+    def _row_keys(case_numbers):
+        """
+        Construye la clave de cada fila: 'case_number' y el número de aparición,
+        para distinguir las filas con el mismo 'case_number' (se eliminan al final,
+        pero cuentan para las estadísticas como en la limpieza completa).
+
+        :param case_numbers: Serie con los valores de 'case_number'.
+        :return: Índice con una clave única por fila.
+        """
+        occurrence = case_numbers.groupby(case_numbers.astype(str)).cumcount()
+        return pd.Index(case_numbers.astype(str) + "#" + occurrence.astype(str), name="row_key")
+
+    def _imputing_stages(self):
+        """
+        Devuelve las clases limpiadoras que rellenan nulos con una estadística global.
+
+        :return: Lista de clases.
+        """
+        return [stage for stage, _ in self.stages if hasattr(stage, "collect_statistics")]
+
+    def _clean_rows(self, rows):
+        """
+        Limpia las filas indicadas sin rellenar los nulos de las columnas imputadas.
+
+        :param rows: Filas originales con los nombres de columnas ya limpios.
+        :return: Filas limpias sin imputar.
+        """
+        with self._quiet():
+            for cleaner_class, method_name in self.stages:
+                if cleaner_class in (ColumnCleaner, DuplicatesCleaner, DtypeOptimizer):
+                    continue
+
+                if hasattr(cleaner_class, "collect_statistics"):
+                    input_column = getattr(cleaner_class, "input_column", cleaner_class.column)
+                    if input_column in rows.columns:
+                        values = cleaner_class.clean_values(rows[input_column], **self._rule_options(cleaner_class))
+                        rows = rows.rename(columns={input_column: cleaner_class.column})
+                        rows[cleaner_class.column] = values
+                    continue
+
+                result = metrics.run_stage(cleaner_class, method_name, rows,
+                                           cleaner_options=self._rule_options(cleaner_class))
+                if result is not None:
+                    rows = result
+        return rows
+
+    def _finish(self, rows, statistics):
+        """
+        Rellena los nulos con las estadísticas actualizadas y ejecuta las etapas finales
+        (eliminación de duplicados y tipos compactos).
+
+        :param rows: Todas las filas limpias sin imputar, en el orden del archivo.
+        :param statistics: Estadísticas de imputación acumuladas.
+        :return: DataFrame limpio.
+        """
+        df = rows.copy(deep=False)
+        for stage in self._imputing_stages():
+            if stage.column in df.columns and stage.__name__ in statistics:
+                fill_value = stage.fill_value_from_statistics(statistics[stage.__name__])
+                df[stage.column] = stage.fill_missing(df[stage.column], fill_value)
+
+        with self._quiet():
+            for cleaner_class in (DuplicatesCleaner, DtypeOptimizer):
+                if cleaner_class in [stage for stage, _ in self.stages]:
+                    df = self._run_frame_stage(df, cleaner_class)
+        return df
+
+    def _run_frame_stage(self, df, cleaner_class):
+        """
+        Ejecuta una etapa de la lista sobre el DataFrame completo.
+
+        :param df: DataFrame de entrada.
+        :param cleaner_class: Clase limpiadora.
+        :return: DataFrame de salida.
+        """
+        for stage_class, method_name in self.stages:
+            if stage_class is cleaner_class:
+                result = metrics.run_stage(stage_class, method_name, df, cleaner_options=self._rule_options(stage_class))
+                return result if result is not None else df
+        return df
+
+    def _rule_options(self, cleaner_class):
+        """
+        Argumentos con el paquete de reglas para las etapas que tienen reglas.
+
+        :param cleaner_class: Clase limpiadora.
+        :return: Diccionario de argumentos.
+        """
+        return {"rules": self.rules} if hasattr(cleaner_class, "rule_section") else {}
+
+    def _load_state(self):
+        """
+        Lee el archivo de estado o devuelve un estado vacío si no existe, es de
+        otra versión o se limpió con otro paquete de reglas.
+
+        :return: Diccionario con las filas, las huellas y las estadísticas.
+        """
+        if os.path.exists(self.state_path):
+            state = pd.read_pickle(self.state_path)
+            if state.get("version") != STATE_VERSION:
+                print("❌ El archivo de estado es de otra versión; se limpia todo de nuevo.")
+            elif state.get("rules_hash") != self.rules.hash:
+                print("❌ Las reglas de limpieza han cambiado; se limpia todo de nuevo.")
+            else:
+                return state
+
+        empty_index = pd.Index([], dtype=object, name="row_key")
+        return {
+            "version": STATE_VERSION,
+            "rules_hash": self.rules.hash,
+            "rows": pd.DataFrame(index=empty_index),
+            "row_hashes": pd.Series(dtype="uint64", index=empty_index),
+            "statistics": {},
+        }
+
+    def _save_state(self, state):
+        """
+        Guarda el archivo de estado de forma atómica.
+
+        :param state: Diccionario con las filas, las huellas y las estadísticas.
+        """
+        atomic_write(self.state_path, lambda path: pd.to_pickle(state, path))
+
+    def _quiet(self):
+        """
+        Silencia los mensajes de los limpiadores salvo en modo detallado, en el que
+        también se imprimen los de las etapas que se ejecutan con metrics.run_stage.
+
+        :return: Gestor de contexto.
+        """
+        if self.verbose:
+            return metrics.show_messages()
+        return contextlib.redirect_stdout(io.StringIO())
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    incremental_cleaner = IncrementalCleaner("../data/raw/GSAF5.xls", "../data/processed/GSAF5_state.pkl")
+    incremental_cleaner.refresh()
+    incremental_cleaner.save_cleaned_data("../data/processed/GSAF5_cleaned.parquet")
@@ -0,0 +1,239 @@
+import contextlib
+import io
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+class MetricsRegistry:
+    """
+    Clase para registrar métricas estructuradas de cada etapa de limpieza:
+    duración, filas de entrada y salida, celdas modificadas, nulos imputados
+    y, opcionalmente, el pico de memoria con tracemalloc.
+
+    Está desactivada por defecto y se activa en tiempo de ejecución con
+    configure() o con la variable de entorno SHARK_EDA_METRICS (ruta de un
+    archivo JSON lines o '1' para guardar los eventos solo en memoria).
+    Los mensajes de los limpiadores que se ejecutan con run_stage no se
+    imprimen (salvo con quiet=False o dentro de show_messages()): con el
+    registro activo se guardan en el campo 'message' de cada evento. Al usar
+    un limpiador por separado sus mensajes se siguen imprimiendo.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el registro desactivado y sin eventos.
+        """
+        self.enabled = False
+        self.sink = None
+        self.trace_memory = False
+        self.quiet = True
+        self.events = []
+
+    def configure(self, enabled=True, sink=None, trace_memory=False, quiet=True):
+        """
+        Activa o desactiva el registro de métricas.
+
+        :param enabled: Si es False no se mide nada (sin coste añadido).
+        :param sink: Ruta de un archivo o un objeto con write() donde se escribe
+                     cada evento como una línea JSON. Si es None solo se guardan en memoria.
+        :param trace_memory: Si es True mide el pico de memoria de cada etapa con tracemalloc
+                             (ralentiza la ejecución).
+        :param quiet: Si es True se capturan los mensajes de los limpiadores en vez de imprimirlos.
+        """
+        self.enabled = enabled
+        self.sink = sink
+        self.trace_memory = trace_memory
+        self.quiet = quiet
+
+    def disable(self):
+        """
+        Desactiva el registro de métricas (los eventos ya registrados se conservan).
+        """
+        self.enabled = False
+
+    def clear(self):
+        """
+        Elimina los eventos registrados en memoria.
+        """
+        self.events = []
+
+    @contextlib.contextmanager
+    def show_messages(self):
+        """
+        Imprime los mensajes de los limpiadores dentro del bloque aunque quiet
+        sea True (lo usan los modos detallados de StreamingCleaner e IncrementalCleaner).
+        """
+        quiet = self.quiet
+        self.quiet = False
+        try:
+            yield
+        finally:
+            self.quiet = quiet
+
+    def capture_messages(self, output):
+        """
+        Devuelve el gestor de contexto que desvía los mensajes de una etapa a output
+        si quiet es True.
+
+        :param output: Objeto con write() (por ejemplo, io.StringIO).
+        :return: Gestor de contexto.
+        """
+        return contextlib.redirect_stdout(output) if self.quiet else contextlib.nullcontext()
+
+    def run_stage(self, cleaner_class, method_name, df, cleaner_options=None, **kwargs):
+        """
+        Ejecuta una etapa sobre el DataFrame (sin copiarlo) y registra sus métricas
+        si el registro está activo. Los mensajes de la etapa solo se imprimen si
+        quiet es False.
+
+        :param cleaner_class: Clase limpiadora.
+        :param method_name: Nombre del método de limpieza.
+        :param df: DataFrame de entrada.
+        :param cleaner_options: Argumentos del constructor de la clase limpiadora (por ejemplo, rules).
+        :param kwargs: Argumentos del método de limpieza (por ejemplo, fill_value).
+        :return: DataFrame devuelto por la etapa o None si no produjo datos.
+        """
+        cleaner_options = cleaner_options or {}
+        output = io.StringIO()
+        if not self.enabled:
+            with self.capture_messages(output):
+                cleaner = cleaner_class(df, copy=False, **cleaner_options)
+                getattr(cleaner, method_name)(**kwargs)
+                return cleaner.get_cleaned_data()
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        with self.capture_messages(output):
+            cleaner = cleaner_class(df, copy=False, **cleaner_options)
+            getattr(cleaner, method_name)(**kwargs)
+            result = cleaner.get_cleaned_data()
+        duration = time.perf_counter() - start
+
+        peak_memory = None
+        if self.trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1] - memory_before
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.measure(cleaner_class.__name__, df, result if result is not None else df, duration,
+                     peak_memory_bytes=peak_memory, message=output.getvalue())
+        return result
+
+    def measure(self, stage, df_in, df_out, duration, peak_memory_bytes=None, message=""):
+        """
+        Calcula las métricas de una etapa ya ejecutada y registra el evento.
+
+        :param stage: Nombre de la etapa.
+        :param df_in: DataFrame de entrada.
+        :param df_out: DataFrame de salida.
+        :param duration: Duración en segundos.
+        :param peak_memory_bytes: Pico de memoria de la etapa (o None si no se midió).
+        :param message: Mensajes que imprimió la etapa.
+        :return: Diccionario con el evento.
+        """
+        cells_modified, nulls_imputed = self.count_changes(df_in, df_out)
+        event = {
+            "timestamp": time.time(),
+            "stage": stage,
+            "duration_s": round(duration, 6),
+            "rows_in": len(df_in),
+            "rows_out": len(df_out),
+            "cells_modified": cells_modified,
+            "nulls_imputed": nulls_imputed,
+            "peak_memory_bytes": peak_memory_bytes,
+            "message": " ".join(message.split()),
+        }
+        self.record(event)
+        return event
+
+    def record(self, event):
+        """
+        Guarda un evento en memoria y, si hay destino, lo escribe como una línea JSON.
+
+        :param event: Diccionario con el evento.
+        """
+        self.events.append(event)
+        if self.sink is None:
+            return
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        if hasattr(self.sink, "write"):
+            self.sink.write(line)
+        else:
+            with open(self.sink, "a", encoding="utf-8") as file:
+                file.write(line)
+
+    def to_frame(self):
+        """
+        Devuelve los eventos registrados como DataFrame.
+
+        :return: DataFrame con un evento por fila.
+        """
+        return pd.DataFrame(self.events)
+
+    @staticmethod
+    def count_changes(df_in, df_out):
+        """
+        Cuenta las celdas que cambian entre la entrada y la salida de una etapa
+        (en las filas que se conservan) y cuántas de ellas eran nulas y dejan de serlo.
+        Si el número de columnas no cambia, las columnas se emparejan por posición
+        para tener en cuenta los renombrados (por ejemplo, 'fatal_y/n' a 'fatal').
+
+        :param df_in: DataFrame de entrada.
+        :param df_out: DataFrame de salida.
+        :return: Tupla (celdas modificadas, nulos imputados).
+        """
+        if len(df_in.columns) == len(df_out.columns):
+            pairs = list(zip(df_in.columns, df_out.columns))
+        else:
+            pairs = [(column, column) for column in df_out.columns if column in df_in.columns]
+        same_rows = df_in.index.equals(df_out.index)
+
+        cells_modified = 0
+        nulls_imputed = 0
+        for column_in, column_out in pairs:
+            before = df_in[column_in] if same_rows else df_in[column_in].loc[df_out.index]
+            after = df_out[column_out]
+            if before.equals(after):
+                continue
+
+            before = before.to_numpy(dtype=object)
+            after = after.to_numpy(dtype=object)
+            before_null = pd.isna(before)
+            after_null = pd.isna(after)
+            both = ~before_null & ~after_null
+            equal = before_null & after_null
+            equal[both] = before[both] == after[both]
+            cells_modified += int(np.count_nonzero(~equal))
+            nulls_imputed += int(np.count_nonzero(before_null & ~after_null))
+        return cells_modified, nulls_imputed
+
+# Registro compartido por los pipelines
+metrics = MetricsRegistry()
+
+if os.environ.get("SHARK_EDA_METRICS"):
+    metrics.configure(
+        sink=None if os.environ["SHARK_EDA_METRICS"] == "1" else os.environ["SHARK_EDA_METRICS"],
+        trace_memory=os.environ.get("SHARK_EDA_TRACE_MEMORY") == "1",
+    )
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    from fatal_cleaner import FatalCleaner
+
+    sample_data = pd.DataFrame({
+        "fatal_y/n": ["N", "Y", "M", "n", None, "Nq", "F", "UNKNOWN", 2017, "Y x 2", " N", "N ", "y"]
+    })
+
+    metrics.configure(trace_memory=True)
+    metrics.run_stage(FatalCleaner, "clean_fatal_column", sample_data)
+    print(metrics.to_frame().T)
@@ -0,0 +1,286 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from file_cache import atomic_write
+from geo_join_index import GeoJoinIndex
+from geometry_store import load_layer
+from natural_earth import ADMIN_0_PATH, ADMIN_1_PATH
+
+# Capas de Natural Earth que se pueden colorear
+LAYERS = {"admin_0": ADMIN_0_PATH, "admin_1": ADMIN_1_PATH}
+
+# Extensión de cada región en grados [lon_min, lon_max, lat_min, lat_max] (None: todo el mundo)
+REGIONS = {
+    "world": None,
+    "usa": (-130, -60, 20, 50),
+    "australia": (110, 155, -45, -10),
+}
+
+# Códigos de matplotlib.path.Path (se copian para no importar matplotlib en el proceso principal)
+MOVETO, LINETO, CLOSEPOLY = 1, 2, 79
+
+# Colores de fondo (los mismos que cartopy.feature.OCEAN y el gris de los países sin datos)
+OCEAN_COLOR = "#97b6e1"
+NO_DATA_COLOR = "lightgrey"
+
+# Mapas del informe (img/)
+REPORT_MAPS = [
+    {
+        "name": "attacks_world_map",
+        "layer": "admin_0",
+        "region": "world",
+        "metric": "attacks",
+        "bins": [50, 100, 170],
+        "colors": ["green", "yellow", "red"],
+        "title": "Mapa Mundial con Países según Peligrosidad por Ataques de Tiburones",
+    },
+    {
+        "name": "attacks_usa_map",
+        "layer": "admin_1",
+        "region": "usa",
+        "metric": "attacks",
+        "bins": [40, 70, 300],
+        "colors": ["green", "yellow", "red"],
+        "title": "Mapa de Estados de EE.UU. según Peligrosidad por Ataques de Tiburones",
+    },
+]
+
+# Trayectos proyectados ya leídos en este proceso
+PROJECTED = {}
+
+class MapRenderer:
+    """
+    Clase para generar varios mapas de coropletas de una vez.
+
+    Cada mapa se describe con un diccionario (ver REPORT_MAPS): capa, región,
+    métrica, límites de los intervalos de color, colores, título y, opcionalmente,
+    la proyección ('crs', nombre de una clase de cartopy.crs) y la tolerancia de
+    simplificación de la geometría.
+
+    Las geometrías de cada capa se proyectan una sola vez por proyección y los
+    trayectos resultantes se guardan en la caché de la capa, así que ni los
+    siguientes mapas ni las siguientes ejecuciones vuelven a proyectarlas. Los
+    valores de cada capa se calculan una vez con GeoJoinIndex y los mapas se
+    dibujan en paralelo con matplotlib sin pantalla (FigureCanvasAgg, sin cambiar
+    el backend de pyplot, que puede ser el de un notebook) y sin GeoAxes.
+    En PlateCarree (la proyección por defecto) no hace falta cartopy.
+    """
+
+    def __init__(self, df, index=None, max_workers=None):
+        """
+        Inicializa la clase con los datos limpios.
+
+        :param df: DataFrame limpio con 'country', 'state' y 'fatal'.
+        :param index: GeoJoinIndex para unir los datos a las capas (se crea uno por defecto).
+        :param max_workers: Número de procesos (por defecto el número de núcleos).
+        """
+        self.df = df
+        self.index = index or GeoJoinIndex()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.layer_values = {}
+
+    def render(self, specs=None, output_dir="../img", tolerance=0.1, dpi=100):
+        """
+        Genera los mapas y los guarda como PNG.
+
+        :param specs: Lista de diccionarios con la descripción de cada mapa (por defecto REPORT_MAPS).
+        :param output_dir: Carpeta donde se guardan las imágenes ('<name>.png').
+        :param tolerance: Tolerancia de simplificación por defecto (None para la geometría original).
+        :param dpi: Resolución de las imágenes.
+        :return: Lista con las rutas de las imágenes generadas.
+        """
+        specs = REPORT_MAPS if specs is None else specs
+        tasks = []
+        for spec in specs:
+            spec = {"crs": "PlateCarree", "tolerance": tolerance, **spec}
+            values = self.values(spec["layer"], spec["metric"])
+            projected_path = self.project(spec["layer"], spec["tolerance"], spec["crs"])
+            output_path = os.path.join(output_dir, f"{spec['name']}.png")
+            tasks.append((spec, values, projected_path, output_path, dpi))
+
+        start = time.perf_counter()
+        os.makedirs(output_dir, exist_ok=True)
+        workers = min(self.max_workers, len(tasks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                output_paths = list(executor.map(_render_map, tasks))
+        else:
+            output_paths = [_render_map(task) for task in tasks]
+
+        print(f"✅ {len(output_paths)} mapas generados en {time.perf_counter() - start:.2f} s.")
+        return output_paths
+
+    def values(self, layer, metric):
+        """
+        Devuelve el valor de una métrica para cada registro de la capa
+        (la unión con la capa se hace una sola vez).
+
+        :param layer: 'admin_0' o 'admin_1'.
+        :param metric: Columna de la unión ('attacks', 'fatal', 'attacks_per_capita', ...).
+        :return: Array con un valor por registro de la capa (NaN sin datos).
+        """
+        if layer not in self.layer_values:
+            if layer == "admin_0":
+                joined = self.index.join_countries(self.df)
+            elif layer == "admin_1":
+                joined = self.index.join_states(self.df)
+            else:
+                raise ValueError(f"Capa no soportada: {layer}. Usa una de {sorted(LAYERS)}")
+            self.layer_values[layer] = joined
+        joined = self.layer_values[layer]
+        return joined[metric].where(joined["attacks"] > 0).to_numpy(dtype=float)
+
+    def project(self, layer, tolerance, crs):
+        """
+        Proyecta las geometrías de una capa y guarda los trayectos en disco
+        (solo si no estaban ya en la caché).
+
+        :param layer: 'admin_0' o 'admin_1'.
+        :param tolerance: Tolerancia de simplificación (None para la geometría original).
+        :param crs: Nombre de la proyección de cartopy.crs.
+        :return: Ruta del archivo con los trayectos proyectados.
+        """
+        store = load_layer(LAYERS[layer])
+        key = hashlib.sha256(f"{os.path.basename(store.cache_path)}-{tolerance}-{crs}".encode("utf-8")).hexdigest()[:16]
+        projected_path = os.path.join(store.cache_dir, f"projected.{layer}.{key}.npz")
+        if os.path.exists(projected_path):
+            return projected_path
+
+        if crs == "PlateCarree":
+            paths = [self.parts_to_path(parts) for parts in store.parts(tolerance)]
+        else:
+            import cartopy.crs as ccrs
+            import shapely
+            from cartopy.mpl.patch import geos_to_path
+            from matplotlib.path import Path
+
+            projection = getattr(ccrs, crs)()
+            paths = []
+            for geometry in store.geometries(tolerance):
+                if geometry is None:
+                    paths.append((np.empty((0, 2)), np.empty(0, dtype=np.uint8)))
+                    continue
+                projected = projection.project_geometry(shapely.from_wkb(geometry), ccrs.PlateCarree())
+                path = Path.make_compound_path(*geos_to_path(projected))
+                paths.append((path.vertices, path.codes.astype(np.uint8)))
+
+        arrays = {
+            "vertices": np.concatenate([vertices for vertices, _ in paths]),
+            "codes": np.concatenate([codes for _, codes in paths]),
+            "offsets": np.cumsum([0] + [len(codes) for _, codes in paths]),
+        }
+        atomic_write(projected_path, lambda path: np.savez(path, **arrays))
+        print(f"✅ Capa {layer} proyectada en {crs} y guardada en {projected_path}")
+        return projected_path
+
+    @staticmethod
+    def parts_to_path(parts):
+        """
+        Convierte las partes de un registro en los vértices y códigos de un
+        trayecto de matplotlib (cada anillo termina con CLOSEPOLY).
+
+        :param parts: Lista de arrays (n, 2) de coordenadas.
+        :return: Tupla (vértices, códigos).
+        """
+        if not parts:
+            return np.empty((0, 2)), np.empty(0, dtype=np.uint8)
+        vertices = np.concatenate(parts)
+        codes = np.full(len(vertices), LINETO, dtype=np.uint8)
+        starts = np.cumsum([0] + [len(part) for part in parts[:-1]])
+        ends = starts + [len(part) - 1 for part in parts]
+        codes[starts] = MOVETO
+        codes[ends] = CLOSEPOLY
+        return vertices, codes
+
+def _load_projected(projected_path):
+    """
+    Lee los trayectos proyectados de una capa (una sola vez por proceso).
+
+    :param projected_path: Ruta del archivo .npz.
+    :return: Lista de objetos matplotlib.path.Path, uno por registro.
+    """
+    if projected_path not in PROJECTED:
+        from matplotlib.path import Path
+
+        with np.load(projected_path) as data:
+            vertices, codes, offsets = data["vertices"], data["codes"], data["offsets"]
+        PROJECTED[projected_path] = [
+            Path(vertices[start:end], codes[start:end]) for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+    return PROJECTED[projected_path]
+
+def _render_map(task):
+    """
+    Dibuja un mapa y lo guarda como PNG. Se ejecuta en los procesos del pool,
+    así que solo recibe datos (la descripción, los valores y la ruta de los trayectos).
+
+    :param task: Tupla (descripción, valores por registro, ruta de los trayectos, ruta de salida, dpi).
+    :return: Ruta de la imagen generada.
+    """
+    spec, values, projected_path, output_path, dpi = task
+
+    # Se dibuja en una Figure con su propio lienzo Agg en vez de con pyplot: con un
+    # solo proceso el mapa se dibuja en el proceso principal y no se debe cambiar su backend
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import PathCollection
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    paths = _load_projected(projected_path)
+    bins, colors = spec["bins"], spec["colors"]
+    classes = np.digitize(np.nan_to_num(values, nan=-np.inf), bins) - 1
+    facecolors = [colors[value] if value >= 0 else NO_DATA_COLOR for value in classes]
+
+    fig = Figure(figsize=spec.get("figsize", (15, 10)))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    ax.add_collection(PathCollection(paths, facecolors=facecolors, edgecolors="black", linewidths=0.5))
+    ax.set_facecolor(OCEAN_COLOR)
+    ax.set_aspect("equal")
+
+    extent = REGIONS[spec["region"]] if isinstance(spec["region"], str) else spec["region"]
+    if extent is None:
+        ax.autoscale_view()
+    elif spec["crs"] == "PlateCarree":
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+    else:
+        import cartopy.crs as ccrs
+
+        longitudes, latitudes = np.meshgrid(np.linspace(extent[0], extent[1], 20), np.linspace(extent[2], extent[3], 20))
+        corners = getattr(ccrs, spec["crs"])().transform_points(ccrs.PlateCarree(), longitudes.ravel(), latitudes.ravel())
+        ax.set_xlim(np.nanmin(corners[:, 0]), np.nanmax(corners[:, 0]))
+        ax.set_ylim(np.nanmin(corners[:, 1]), np.nanmax(corners[:, 1]))
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    limits = list(bins[1:]) + [None]
+    labels = [f"{low:g} - {high:g}" if high is not None else f"≥ {low:g}" for low, high in zip(bins, limits)]
+    handles = [Patch(facecolor=color, edgecolor="black", label=label) for color, label in zip(colors, labels)]
+    ax.legend(handles=handles[::-1], title=spec["metric"], loc="lower left")
+    ax.set_title(spec.get("title", spec["name"]))
+
+    fig.savefig(output_path, dpi=dpi, bbox_inches="tight")
+    print(f"✅ Mapa guardado en {output_path}")
+    return output_path
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    import pandas as pd
+
+    df = pd.read_excel("../data/processed/GSAF5_cleaned.xlsx", engine="openpyxl")
+    renderer = MapRenderer(df)
+    renderer.render(REPORT_MAPS + [{
+        "name": "attacks_per_capita_world_map",
+        "layer": "admin_0",
+        "region": "world",
+        "metric": "attacks_per_capita",
+        "bins": [1, 5, 20],
+        "colors": ["green", "yellow", "red"],
+        "title": "Ataques de Tiburones por Millón de Habitantes",
+        "crs": "Robinson",
+    }])
@@ -0,0 +1,115 @@
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+# Archivos de Natural Earth incluidos en el repositorio
+NATURAL_EARTH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "naturalearth_lowres")
+ADMIN_0_PATH = os.path.join(NATURAL_EARTH_DIR, "ne_110m_admin_0_countries.shp")
+ADMIN_1_PATH = os.path.join(NATURAL_EARTH_DIR, "ne_110m_admin_1_states_provinces.shp")
+
+# Tipos de geometría de los shapefiles (las variantes Z y M se leen solo en X/Y)
+SHAPE_TYPES = {0: None, 1: "Point", 3: "LineString", 5: "Polygon", 8: "MultiPoint",
+               11: "Point", 13: "LineString", 15: "Polygon", 18: "MultiPoint",
+               21: "Point", 23: "LineString", 25: "Polygon", 28: "MultiPoint"}
+
+def read_dbf(path, columns=None, encoding=None):
+    """
+    Lee la tabla de atributos (.dbf) de un shapefile sin depender de geopandas.
+    Los campos numéricos se convierten a números y los lógicos a booleanos.
+
+    :param path: Ruta del .dbf (o del .shp, se usa el .dbf con el mismo nombre).
+    :param columns: Lista de campos a leer (por defecto todos).
+    :param encoding: Codificación del texto (por defecto la del .cpg o UTF-8).
+    :return: DataFrame con una fila por registro no borrado.
+    """
+    path = os.path.splitext(path)[0] + ".dbf"
+    if encoding is None:
+        cpg_path = os.path.splitext(path)[0] + ".cpg"
+        encoding = "utf-8"
+        if os.path.exists(cpg_path):
+            with open(cpg_path, encoding="ascii") as file:
+                encoding = file.read().strip() or encoding
+
+    with open(path, "rb") as file:
+        record_count, header_length, record_length = struct.unpack("<4xIHH20x", file.read(32))
+
+        fields = []
+        offset = 1  # El primer byte de cada registro marca si está borrado
+        while True:
+            descriptor = file.read(32)
+            if descriptor[0] == 0x0D:
+                break
+            name = descriptor[:11].split(b"\0")[0].decode("ascii")
+            field_type = chr(descriptor[11])
+            length = descriptor[16]
+            fields.append((name, field_type, offset, length))
+            offset += length
+
+        file.seek(header_length)
+        data = file.read(record_count * record_length)
+
+    if columns is not None:
+        fields = [field for field in fields if field[0] in columns]
+
+    records = [data[start:start + record_length] for start in range(0, len(data), record_length)]
+    records = [record for record in records if record[:1] != b"*"]
+
+    table = {}
+    for name, field_type, offset, length in fields:
+        raw = [record[offset:offset + length].decode(encoding, errors="replace").strip(" \x00") for record in records]
+        if field_type in ("N", "F"):
+            table[name] = pd.to_numeric(pd.Series(raw, dtype=object).replace("", None), errors="coerce")
+        elif field_type == "L":
+            table[name] = pd.Series([value.upper() in ("Y", "T") if value not in ("", "?") else None for value in raw],
+                                    dtype=object)
+        else:
+            table[name] = pd.Series(raw, dtype=object).replace("", None)
+    return pd.DataFrame(table)
+
+def read_shp(path):
+    """
+    Lee las geometrías (.shp) de un shapefile sin depender de geopandas ni de shapely.
+
+    :param path: Ruta del .shp.
+    :return: Tupla (tipo de geometría, lista con las partes de cada registro). Cada parte
+             es un array (n, 2) de coordenadas X/Y: un anillo en los polígonos, una línea
+             en las polilíneas y un punto en los puntos. Los registros nulos no tienen partes.
+    """
+    with open(os.path.splitext(path)[0] + ".shp", "rb") as file:
+        data = file.read()
+
+    shape_type = SHAPE_TYPES[struct.unpack_from("<i", data, 32)[0]]
+    geometries = []
+    position = 100
+    while position < len(data):
+        content_length = struct.unpack_from(">2i", data, position)[1] * 2
+        content = position + 8
+        position = content + content_length
+
+        record_type = struct.unpack_from("<i", data, content)[0]
+        if SHAPE_TYPES[record_type] is None:
+            geometries.append([])
+        elif SHAPE_TYPES[record_type] == "Point":
+            geometries.append([np.frombuffer(data, "<f8", 2, content + 4).reshape(1, 2)])
+        elif SHAPE_TYPES[record_type] == "MultiPoint":
+            point_count = struct.unpack_from("<i", data, content + 36)[0]
+            points = np.frombuffer(data, "<f8", 2 * point_count, content + 40).reshape(-1, 2)
+            geometries.append([point.reshape(1, 2) for point in points])
+        else:
+            part_count, point_count = struct.unpack_from("<2i", data, content + 36)
+            starts = np.frombuffer(data, "<i4", part_count, content + 44)
+            points = np.frombuffer(data, "<f8", 2 * point_count, content + 44 + 4 * part_count).reshape(-1, 2)
+            bounds = list(starts[1:]) + [point_count]
+            geometries.append([points[start:end] for start, end in zip(starts, bounds)])
+    return shape_type, geometries
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    countries = read_dbf(ADMIN_0_PATH, columns=["ADMIN", "NAME", "ISO_A3", "POP_EST"])
+    print(f"✅ {len(countries)} países leídos.")
+    print(countries.head())
+
+    shape_type, geometries = read_shp(ADMIN_0_PATH)
+    print(f"✅ {len(geometries)} geometrías de tipo {shape_type} leídas.")
@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+
+# Columnas que forman los bloques: solo se comparan filas del mismo año y país
+BLOCK_COLUMNS = ("year", "country")
+
+# Columnas que se comparan y su peso en la similitud (y por las que se ordenan las filas de cada bloque)
+COMPARE_COLUMNS = {"date": 2, "name": 2, "location": 1, "activity": 1, "injury": 1}
+
+# Longitud máxima (en bytes) del texto del que se sacan los trigramas
+MAX_TEXT_BYTES = 64
+
+# Primo de Mersenne 2^31 - 1 para el hashing universal de MinHash (a * x + b cabe en int64)
+MINHASH_PRIME = 2 ** 31 - 1
+
+# Número máximo de pares que se puntúan a la vez (acota la memoria con muchos pares)
+SCORE_BATCH_SIZE = 500_000
+
+# Sufijo de letra de los casos distintos del mismo día en el GSAF (2016.07.16.a y
+# 2016.07.16.b son dos incidentes, aunque la fecha y el lugar coincidan)
+SIBLING_CASE_SUFFIX = r"\.([a-z])$"
+
+class NearDuplicateDetector:
+    """
+    Clase para encontrar incidentes repetidos con distinto 'case_number'
+    (misma fecha, país, lugar y nombre escritos de forma ligeramente distinta).
+
+    Comparar todos los pares es O(n²), así que los candidatos salen de un
+    vecindario ordenado (sorted neighbourhood) dentro de cada bloque de año y
+    país: las filas del bloque se ordenan por cada columna comparada y solo se
+    comparan con las 'window' - 1 siguientes. La similitud de un par es la media
+    ponderada de la similitud de cada columna, que es la de Jaccard entre los
+    trigramas de caracteres de los dos textos estimada con firmas MinHash. Las
+    firmas se calculan una sola vez por valor distinto de cada columna, así que
+    todo el proceso es lineal en el número de filas. Solo se unen filas con
+    el mismo sufijo de letra en 'case_number' (ninguno, .a, .b...), así que dos
+    casos hermanos como 2016.07.16.a y 2016.07.16.b nunca acaban en el mismo
+    grupo, ni directamente ni a través de una tercera fila.
+    """
+
+    def __init__(self, df, block_columns=BLOCK_COLUMNS, columns=COMPARE_COLUMNS,
+                 window=5, threshold=0.9, num_permutations=64, seed=0):
+        """
+        Inicializa la clase con un DataFrame.
+
+        :param df: DataFrame de Pandas con los datos (limpios o no).
+        :param block_columns: Columnas que deben coincidir para comparar dos filas.
+        :param columns: Diccionario {columna: peso} con las columnas que se comparan.
+        :param window: Tamaño de la ventana del vecindario ordenado.
+        :param threshold: Similitud mínima (0-1) para considerar dos filas duplicadas.
+        :param num_permutations: Número de funciones hash de las firmas MinHash.
+        :param seed: Semilla de las funciones hash (los resultados son reproducibles).
+        """
+        if window < 2:
+            raise ValueError(f"La ventana debe ser de al menos 2 filas, no {window}")
+        if not 0 < threshold <= 1:
+            raise ValueError(f"El umbral debe estar entre 0 y 1, no {threshold}")
+
+        self.df = df
+        self.block_columns = [column for column in block_columns if column in df.columns]
+        self.columns = {column: weight for column, weight in columns.items() if column in df.columns}
+        self.window = window
+        self.threshold = threshold
+        self.num_permutations = num_permutations
+        self.seed = seed
+        self.pairs = None
+        self.clusters = None
+
+    def find_clusters(self):
+        """
+        Agrupa las filas duplicadas entre sí (componentes conexas de los pares
+        con similitud mayor o igual que el umbral).
+
+        :return: DataFrame con una fila por fila duplicada: 'cluster', 'row'
+                 (etiqueta en el índice de df), 'position' y 'score' (mejor
+                 similitud con otra fila del grupo), ordenado por grupo y posición.
+        """
+        pairs = self.find_pairs()
+        suffixes = self._case_suffixes()
+        pairs = pairs[(pairs["score"] >= self.threshold)
+                      & (suffixes[pairs["left"].to_numpy()] == suffixes[pairs["right"].to_numpy()])]
+        left, right, score = pairs["left"].to_numpy(), pairs["right"].to_numpy(), pairs["score"].to_numpy()
+
+        labels = self._connected_components(len(self.df), left, right)
+        scores = np.zeros(len(self.df))
+        np.maximum.at(scores, left, score)
+        np.maximum.at(scores, right, score)
+
+        positions = np.unique(np.concatenate([left, right]))
+        clusters = pd.DataFrame({
+            "cluster": pd.factorize(labels[positions], sort=True)[0],
+            "row": self.df.index[positions],
+            "position": positions,
+            "score": scores[positions],
+        })
+        self.clusters = clusters.sort_values(["cluster", "position"], ignore_index=True)
+
+        print(f"✅ {self.clusters['cluster'].nunique()} grupos de casi duplicados "
+              f"({len(self.clusters)} filas) entre {len(self.pairs)} pares comparados.")
+        return self.clusters
+
+    def find_pairs(self):
+        """
+        Genera los pares candidatos y calcula su similitud.
+
+        :return: DataFrame con 'left' y 'right' (posiciones, left < right) y 'score'.
+        """
+        codes = {column: self._codes(column) for column in self.columns}
+        left, right = self.candidate_pairs(codes)
+
+        total = np.zeros(len(left))
+        weights = np.zeros(len(left))
+        for column, weight in self.columns.items():
+            column_codes, uniques = codes[column]
+            signatures = self.signatures(uniques)
+            left_codes, right_codes = column_codes[left], column_codes[right]
+
+            # Los nulos en las dos filas no cuentan; en una sola cuentan como distintos.
+            # Las firmas solo se comparan cuando los dos textos son distintos
+            compared = (left_codes >= 0) | (right_codes >= 0)
+            similarity = (left_codes == right_codes) & (left_codes >= 0)
+            similarity = similarity.astype(float)
+            different = np.flatnonzero((left_codes >= 0) & (right_codes >= 0) & (left_codes != right_codes))
+            for start in range(0, len(different), SCORE_BATCH_SIZE):
+                batch = different[start:start + SCORE_BATCH_SIZE]
+                similarity[batch] = (signatures[left_codes[batch]] == signatures[right_codes[batch]]).mean(axis=1)
+
+            total += weight * similarity
+            weights += weight * compared
+
+        scores = np.divide(total, weights, out=np.zeros(len(left)), where=weights > 0)
+        self.pairs = pd.DataFrame({"left": left, "right": right, "score": scores})
+        return self.pairs
+
+    def candidate_pairs(self, codes=None):
+        """
+        Pares de filas del mismo bloque que quedan a menos de 'window' posiciones
+        al ordenar el bloque por alguna de las columnas comparadas.
+
+        :param codes: Diccionario {columna: (códigos, valores)} de _codes() (se calcula si no se indica).
+        :return: Tupla (left, right) de arrays de posiciones sin repetir, con left < right.
+        """
+        codes = codes or {column: self._codes(column) for column in self.columns}
+        size = len(self.df)
+        blocks = self._block_codes()
+
+        keys = []
+        sort_keys = [column_codes for column_codes, _ in codes.values()] or [np.zeros(size, dtype=np.int64)]
+        for sort_key in sort_keys:
+            order = np.lexsort((sort_key, blocks))
+            sorted_blocks = blocks[order]
+            for offset in range(1, self.window):
+                same_block = sorted_blocks[:-offset] == sorted_blocks[offset:]
+                first, second = order[:-offset][same_block], order[offset:][same_block]
+                keys.append(np.minimum(first, second).astype(np.int64) * size + np.maximum(first, second))
+
+        keys = np.sort(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+        keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])] if len(keys) else keys
+        return keys // max(size, 1), keys % max(size, 1)
+
+    def signatures(self, values):
+        """
+        Calcula las firmas MinHash de los trigramas de caracteres de cada texto
+        (con un espacio delante y detrás, para que cuenten los bordes de las palabras).
+
+        :param values: Array de textos distintos.
+        :return: Matriz (textos, num_permutations) de uint32.
+        """
+        if len(values) == 0:
+            return np.empty((0, self.num_permutations), dtype=np.uint32)
+
+        # NumPy rellena con ceros hasta el texto más largo (como mucho MAX_TEXT_BYTES)
+        text = np.array([f" {value} ".encode("utf-8")[:MAX_TEXT_BYTES] for value in values])
+        chars = text.view(np.uint8).reshape(len(text), text.itemsize).astype(np.int64)
+        trigrams = chars[:, :-2] * 65_536 + chars[:, 1:-1] * 256 + chars[:, 2:]
+        valid = chars[:, 2:] != 0  # Los ceros son el relleno del final
+
+        rng = np.random.default_rng(self.seed)
+        a = rng.integers(1, MINHASH_PRIME, self.num_permutations, dtype=np.int64)
+        b = rng.integers(0, MINHASH_PRIME, self.num_permutations, dtype=np.int64)
+
+        signatures = np.empty((len(text), self.num_permutations), dtype=np.uint32)
+        for permutation in range(self.num_permutations):
+            hashes = (a[permutation] * trigrams + b[permutation]) % MINHASH_PRIME
+            signatures[:, permutation] = np.where(valid, hashes, MINHASH_PRIME).min(axis=1, initial=MINHASH_PRIME)
+        return signatures
+
+    def collapse(self, clusters=None):
+        """
+        Deja una sola fila por grupo de duplicados (la primera de cada grupo).
+
+        :param clusters: Resultado de find_clusters() (se calcula si no se indica).
+        :return: DataFrame sin los casi duplicados.
+        """
+        clusters = self.find_clusters() if clusters is None else clusters
+        first = clusters.groupby("cluster")["position"].transform("min")
+        drop = clusters.loc[clusters["position"] != first, "position"].to_numpy()
+
+        keep = np.ones(len(self.df), dtype=bool)
+        keep[drop] = False
+        return self.df[keep]
+
+    def _case_suffixes(self):
+        """
+        Sufijo de letra del 'case_number' de cada fila (SIBLING_CASE_SUFFIX).
+
+        :return: Array de textos ('' si la fila no tiene sufijo o no hay 'case_number').
+        """
+        if "case_number" not in self.df.columns:
+            return np.full(len(self.df), "", dtype=object)
+        cases = self.df["case_number"].astype(str).str.strip()
+        return cases.str.extract(SIBLING_CASE_SUFFIX, expand=False).fillna("").to_numpy(dtype=object)
+
+    def _codes(self, column):
+        """
+        Factoriza el texto normalizado de una columna. Los códigos siguen el orden
+        alfabético, así que sirven también como clave de ordenación.
+
+        :param column: Nombre de la columna.
+        :return: Tupla (códigos con -1 para los nulos, array de textos distintos).
+        """
+        codes, uniques = pd.factorize(self._normalized_text(column), sort=True)
+        return codes, np.asarray(uniques, dtype=object)
+
+    def _block_codes(self):
+        """
+        Código entero del bloque de cada fila (los nulos forman su propio bloque).
+
+        :return: Array de códigos.
+        """
+        if not self.block_columns:
+            return np.zeros(len(self.df), dtype=np.int64)
+        keys = pd.DataFrame({column: self._normalized_text(column).to_numpy() for column in self.block_columns})
+        return keys.groupby(list(keys.columns), dropna=False, sort=False).ngroup().to_numpy()
+
+    def _normalized_text(self, column):
+        """
+        Texto de una columna en minúsculas y sin espacios sobrantes. Las fechas
+        y los números se escriben igual aunque vengan como texto o como valor.
+
+        :param column: Nombre de la columna.
+        :return: Serie de textos (nula donde falta el valor).
+        """
+        values = self.df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            text = values.dt.strftime("%Y-%m-%d")
+        elif pd.api.types.is_numeric_dtype(values):
+            text = values.astype("Float64").astype(str).str.removesuffix(".0").where(values.notna())
+        else:
+            text = values.astype(str).where(values.notna())
+        return text.str.lower().str.strip().str.replace(r"\s+", " ", regex=True)
+
+    @staticmethod
+    def _connected_components(size, left, right):
+        """
+        Etiqueta cada posición con la menor posición de su componente conexa, sin
+        bucles por fila. En cada pasada la raíz mayor de cada arista se cuelga de
+        la menor y después se salta de puntero en puntero hasta que cada posición
+        apunta a su raíz, así una cadena de n filas se resuelve en una pasada (con
+        O(log n) saltos) en lugar de en O(n) pasadas.
+
+        :param size: Número de posiciones.
+        :param left: Array con un extremo de cada arista.
+        :param right: Array con el otro extremo.
+        :return: Array de etiquetas.
+        """
+        labels = np.arange(size)
+        while True:
+            left_labels, right_labels = labels[left], labels[right]
+            updated = labels.copy()
+            np.minimum.at(updated, np.maximum(left_labels, right_labels), np.minimum(left_labels, right_labels))
+            while True:
+                jumped = updated[updated]
+                if np.array_equal(jumped, updated):
+                    break
+                updated = jumped
+            if np.array_equal(updated, labels):
+                return labels
+            labels = updated
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.DataFrame({
+        "case_number": ["2022.09.06", "2022.09.06.R", "2022.07.01.a", "2022.07.01.b", "2021.01.02"],
+        "date": ["06-Sep-2022", "06-Sep-2022", "01-Jul-2022", "01-Jul-2022", "02-Jan-2021"],
+        "year": [2022, 2022, 2022, 2022, 2021],
+        "country": ["BAHAMAS", "BAHAMAS ", "USA", "USA", "USA"],
+        "location": ["Green Cay", "Green Cay, Exumas", "Cocoa Beach", "Cocoa Beach", "Cocoa Beach"],
+        "name": ["Caroline DiPlacido", "Caroline Diplacido", "male", "female", "male"],
+        "activity": ["Snorkeling", "Snorkeling", "Surfing", "Surfing", "Surfing"],
+        "injury": ["FATAL", "Fatal", "Bite to left foot", "Laceration to right hand", "Bite to left foot"],
+    })
+
+    detector = NearDuplicateDetector(sample_data)
+    print(detector.find_clusters())
+    print(detector.pairs)
+    print(detector.collapse(detector.clusters))
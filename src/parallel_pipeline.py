@@ -0,0 +1,233 @@
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
+from cleaning_pipeline import CleaningPipeline, DEFAULT_STAGES
+from instrumentation import metrics
+
+def stage_columns(cleaner_class):
+    """
+    Devuelve las columnas que lee y escribe una etapa. Las etapas sin atributo
+    'column' (ColumnCleaner, DuplicatesCleaner, DtypeOptimizer) trabajan sobre
+    todo el DataFrame y no se pueden repartir por columnas. Las etapas que leen
+    varias columnas las indican en 'input_columns' (DateCleaner lee 'year').
+
+    :param cleaner_class: Clase limpiadora.
+    :return: Tupla (columnas de entrada..., columna de salida) o None.
+    """
+    column = getattr(cleaner_class, "column", None)
+    if column is None:
+        return None
+    input_columns = getattr(cleaner_class, "input_columns", (getattr(cleaner_class, "input_column", column),))
+    return (*input_columns, column)
+
+def schedule_stages(stages, barriers=()):
+    """
+    Agrupa las etapas según sus dependencias:
+    - Una etapa sin columna propia o incluida en 'barriers' es una barrera: se
+      ejecuta sola sobre todo el DataFrame y las etapas posteriores dependen de ella.
+    - Entre dos barreras, las etapas que comparten alguna columna (de entrada o de
+      salida, como el renombrado de 'fatal_y/n' a 'fatal') forman un grupo que se
+      ejecuta en orden; los grupos son independientes entre sí.
+
+    :param stages: Lista de tuplas (clase limpiadora, método).
+    :param barriers: Clases limpiadoras que se ejecutan como barrera aunque tengan
+                     columna propia (por ejemplo, las que imputan por grupos).
+    :return: Lista de pasos ('barrier', etapa) o ('parallel', [grupos de etapas]).
+    """
+    steps = []
+    groups = []
+
+    for stage in stages:
+        columns = stage_columns(stage[0])
+        if columns is None or stage[0] in barriers:
+            if groups:
+                steps.append(("parallel", [group for group, _ in groups]))
+                groups = []
+            steps.append(("barrier", stage))
+            continue
+
+        # Se juntan en un grupo todas las etapas que tocan alguna de estas columnas
+        touched = set(columns)
+        related = [entry for entry in groups if entry[1] & touched]
+        merged_stages = [stage_ for group, _ in related for stage_ in group] + [stage]
+        merged_columns = touched.union(*(group_columns for _, group_columns in related))
+        groups = [entry for entry in groups if entry not in related]
+        groups.append((sorted(merged_stages, key=stages.index), merged_columns))
+
+    if groups:
+        steps.append(("parallel", [group for group, _ in groups]))
+    return steps
+
+def _clean_column_group(group, frame, rules=None, quiet=True):
+    """
+    Ejecuta en orden las etapas de un grupo sobre las columnas que necesitan.
+    Es una función de módulo para que el pool de procesos la pueda enviar.
+
+    :param group: Lista de tuplas (clase limpiadora, método).
+    :param frame: DataFrame solo con las columnas de entrada del grupo.
+    :param rules: Paquete de reglas para las etapas que tienen reglas (por defecto el de config/rules.json).
+    :param quiet: Si es True los mensajes de las etapas se devuelven en vez de imprimirse
+                  (el valor de metrics.quiet en el proceso principal).
+    :return: Tupla (DataFrame con las columnas limpias, duración en segundos, mensajes).
+    """
+    start = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        for cleaner_class, method_name in group:
+            options = {"rules": rules} if rules is not None and hasattr(cleaner_class, "rule_section") else {}
+            cleaner = cleaner_class(frame, copy=False, **options)
+            getattr(cleaner, method_name)()
+            result = cleaner.get_cleaned_data()
+            if result is not None:
+                frame = result
+    return frame, time.perf_counter() - start, output.getvalue()
+
+class ParallelCleaningPipeline(CleaningPipeline):
+    """
+    Clase para ejecutar las etapas de limpieza en paralelo por columnas.
+
+    Las barreras (ColumnCleaner, DuplicatesCleaner, DtypeOptimizer) se ejecutan
+    sobre todo el DataFrame. Los grupos de etapas independientes que hay entre
+    ellas se reparten en un pool de procesos: cada proceso recibe solo sus
+    columnas y devuelve las columnas limpias, que se unen al DataFrame de trabajo.
+    El resultado es el mismo que con CleaningPipeline.
+
+    Con group_by, las etapas que imputan nulos necesitan las columnas de los
+    grupos (país y año), así que se ejecutan también como barreras.
+    """
+
+    def __init__(self, df, stages=None, keep_snapshots=False, max_workers=None, min_rows=50_000,
+                 group_by=None, rules=None):
+        """
+        Inicializa la clase con un DataFrame y la lista ordenada de etapas.
+
+        :param df: DataFrame de Pandas con los datos originales (no se modifica).
+        :param stages: Lista de tuplas (clase limpiadora, método). Por defecto DEFAULT_STAGES.
+        :param keep_snapshots: Si es True guarda una copia del DataFrame tras cada etapa.
+        :param max_workers: Número de procesos (por defecto el número de núcleos).
+        :param min_rows: Por debajo de este número de filas las etapas se ejecutan en
+                         este proceso, porque enviar las columnas cuesta más que limpiarlas.
+        :param group_by: Niveles de agrupación de las etapas que imputan (ver GroupImputer).
+                         Por defecto se usa un único valor global.
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas). El paquete
+                      compilado se envía a cada proceso. Por defecto el de config/rules.json.
+        """
+        super().__init__(df, stages=stages, keep_snapshots=keep_snapshots, group_by=group_by, rules=rules)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+
+    def run(self):
+        """
+        Ejecuta los pasos de schedule_stages(): las barreras en orden y los grupos
+        independientes de cada paso a la vez. Con el registro de métricas activo,
+        cada grupo se registra como una etapa con la duración medida en su proceso.
+        """
+        working_df = self.original_df
+        self.snapshots = {}
+        barriers = [stage for stage, _ in self.stages if self._stage_options(stage)]
+        steps = schedule_stages(self.stages, barriers)
+        executor = None
+
+        try:
+            for kind, step in steps:
+                if kind == "barrier":
+                    result = metrics.run_stage(*step, working_df, cleaner_options=self._cleaner_options(step[0]),
+                                               **self._stage_options(step[0]))
+                    working_df = result if result is not None else working_df
+                    self._keep_snapshot([step], working_df)
+                    continue
+
+                frames = [working_df[self._input_columns(group, working_df)] for group in step]
+                if len(step) > 1 and self.max_workers > 1 and len(working_df) >= self.min_rows:
+                    executor = executor or ProcessPoolExecutor(max_workers=self.max_workers)
+                    results = list(executor.map(_clean_column_group, step, frames, repeat(self.rules),
+                                                repeat(metrics.quiet)))
+                else:
+                    results = [_clean_column_group(group, frame, self.rules, metrics.quiet)
+                               for group, frame in zip(step, frames)]
+
+                for group, frame, (result, duration, message) in zip(step, frames, results):
+                    if metrics.enabled:
+                        metrics.measure("+".join(stage.__name__ for stage, _ in group), frame, result, duration,
+                                        message=message)
+                    working_df = self._merge_columns(working_df, frame, result)
+                    self._keep_snapshot(group, working_df)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.cleaned_df = working_df
+        print(f"✅ Pipeline de limpieza en paralelo completado ({len(self.stages)} etapas, {len(steps)} pasos).")
+
+    @staticmethod
+    def _input_columns(group, df):
+        """
+        Devuelve las columnas del DataFrame que necesita un grupo de etapas.
+
+        :param group: Lista de tuplas (clase limpiadora, método).
+        :param df: DataFrame de trabajo.
+        :return: Lista de columnas en el orden del DataFrame.
+        """
+        needed = {column for stage, _ in group for column in stage_columns(stage)}
+        return [column for column in df.columns if column in needed]
+
+    @staticmethod
+    def _merge_columns(df, frame, result):
+        """
+        Sustituye en el DataFrame de trabajo las columnas enviadas por las limpias.
+        Las columnas renombradas (por ejemplo, 'fatal_y/n' a 'fatal') conservan su posición.
+
+        :param df: DataFrame de trabajo.
+        :param frame: Columnas enviadas al grupo.
+        :param result: Columnas devueltas por el grupo.
+        :return: DataFrame con las columnas limpias.
+        """
+        renamed = {old: new for old, new in zip(frame.columns, result.columns) if old != new}
+        if renamed:
+            df = df.rename(columns=renamed)
+        else:
+            df = df.copy(deep=False)
+        for column in result.columns:
+            df[column] = result[column]
+        return df
+
+    def _keep_snapshot(self, group, df):
+        """
+        Guarda una copia del DataFrame tras las etapas de un grupo si se pidió.
+
+        :param group: Lista de tuplas (clase limpiadora, método).
+        :param df: DataFrame de trabajo.
+        """
+        if self.keep_snapshots:
+            for cleaner_class, _ in group:
+                self.snapshots[cleaner_class.__name__] = df.copy()
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    for kind, step in schedule_stages(DEFAULT_STAGES):
+        if kind == "barrier":
+            print(f"🔹 Barrera: {step[0].__name__}")
+        else:
+            print(f"🔹 En paralelo: {[[stage.__name__ for stage, _ in group] for group in step]}")
+
+    sample_data = pd.DataFrame({
+        "Case Number": ["A001", "A002", "A002", "A003"],
+        "Type": ["Unprovoked", " Provoked", " Provoked", "?"],
+        "Sex": ["M", "F ", "F ", "lli"],
+        "Country": ["ENGLAND", "USA", "USA", "REUNION"],
+        "Fatal Y/N": ["N", "Y", "Y", None],
+        "Time": ["14h00", "Morning", "Morning", None],
+        "Species ": ["White shark", "6' shark", "6' shark", "?"],
+        "Year": [2020, 2021, 2021, 0],
+        "Activity": ["Surfing", " Swimming", " Swimming", None],
+    })
+
+    pipeline = ParallelCleaningPipeline(sample_data, min_rows=0)
+    pipeline.run()
+    print(pipeline.get_cleaned_data())
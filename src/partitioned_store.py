@@ -0,0 +1,235 @@
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from data_exporter import DataExporter
+
+# Columnas de partición (carpetas decade=1990/country=USA/)
+PARTITION_SCHEMA = pa.schema([("decade", pa.int32()), ("country", pa.string())])
+
+# Operadores de los filtros
+OPERATORS = {
+    "==": lambda field, value: field == value,
+    "!=": lambda field, value: field != value,
+    "<": lambda field, value: field < value,
+    "<=": lambda field, value: field <= value,
+    ">": lambda field, value: field > value,
+    ">=": lambda field, value: field >= value,
+    "in": lambda field, value: field.isin(list(value)),
+    "not in": lambda field, value: ~field.isin(list(value)),
+}
+
+class PartitionedStore:
+    """
+    Clase para guardar los datos limpios como un dataset Parquet particionado
+    por década y país, y consultarlo sin cargarlo entero.
+
+    Las consultas (ver LazyQuery) no leen nada hasta to_pandas(). Entonces los
+    filtros por 'country' y por 'year' descartan carpetas enteras (los filtros
+    por año se traducen también a la década), el resto de filtros usa las
+    estadísticas de los row groups de cada archivo y solo se leen las columnas
+    pedidas.
+    """
+
+    def __init__(self, root_path):
+        """
+        Inicializa la clase con la carpeta del dataset.
+
+        :param root_path: Carpeta raíz del dataset particionado.
+        """
+        self.root_path = root_path
+        self._dataset = None
+
+    @property
+    def dataset(self):
+        """
+        Dataset de pyarrow (solo se leen los metadatos, y una sola vez).
+        """
+        if self._dataset is None:
+            partitioning = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+            self._dataset = ds.dataset(self.root_path, format="parquet", partitioning=partitioning)
+        return self._dataset
+
+    def write(self, df, row_group_size=10_000):
+        """
+        Escribe el DataFrame como dataset particionado, sustituyendo el anterior
+        de forma atómica (se escribe en una carpeta temporal y después se renombra).
+        Dentro de cada partición las filas se ordenan por año para que las
+        estadísticas de los row groups sirvan para filtrar.
+
+        :param df: DataFrame limpio con 'year' y 'country'.
+        :param row_group_size: Número máximo de filas por row group.
+        """
+        df = DataExporter._arrow_compatible(df.reset_index(drop=True))
+        df = df.assign(decade=(pd.to_numeric(df["year"], errors="coerce") // 10 * 10).astype("Int32"))
+        df = df.sort_values(["decade", "country", "year"], kind="stable")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        parent = os.path.dirname(os.path.abspath(self.root_path))
+        os.makedirs(parent, exist_ok=True)
+        temp_path = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            ds.write_dataset(
+                table, temp_path, format="parquet",
+                partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+                max_rows_per_group=row_group_size, min_rows_per_group=min(row_group_size, 1_000),
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            old_path = None
+            if os.path.exists(self.root_path):
+                old_path = tempfile.mkdtemp(dir=parent, prefix=".old-")
+                os.replace(self.root_path, os.path.join(old_path, "dataset"))
+            os.replace(temp_path, self.root_path)
+            if old_path is not None:
+                shutil.rmtree(old_path)
+        except BaseException:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            raise
+
+        self._dataset = None
+        print(f"✅ {len(df)} filas guardadas en {len(self.dataset.files)} archivos en {self.root_path}")
+
+    def query(self):
+        """
+        Empieza una consulta sobre el dataset.
+
+        :return: LazyQuery sin filtros.
+        """
+        return LazyQuery(self)
+
+class LazyQuery:
+    """
+    Consulta perezosa sobre un PartitionedStore. Cada método devuelve una
+    consulta nueva y los datos solo se leen en to_pandas() o count().
+    """
+
+    def __init__(self, store, columns=None, filters=()):
+        """
+        Inicializa la consulta.
+
+        :param store: PartitionedStore sobre el que se consulta.
+        :param columns: Columnas a leer (None para todas).
+        :param filters: Tupla de filtros (columna, operador, valor).
+        """
+        self.store = store
+        self.columns = columns
+        self.filters = tuple(filters)
+
+    def select(self, *columns):
+        """
+        Indica las columnas a leer.
+
+        :param columns: Nombres de las columnas.
+        :return: LazyQuery nueva.
+        """
+        return LazyQuery(self.store, list(columns), self.filters)
+
+    def where(self, column, operator, value):
+        """
+        Añade un filtro (se combinan con AND).
+
+        :param column: Columna del filtro.
+        :param operator: '==', '!=', '<', '<=', '>', '>=', 'in' o 'not in'.
+        :param value: Valor (o lista de valores para 'in' y 'not in').
+        :return: LazyQuery nueva.
+        """
+        if operator not in OPERATORS:
+            raise ValueError(f"Operador no soportado: {operator}. Usa uno de {list(OPERATORS)}")
+        return LazyQuery(self.store, self.columns, self.filters + ((column, operator, value),))
+
+    def filter(self, **equals):
+        """
+        Añade filtros de igualdad (una lista de valores equivale a 'in').
+
+        :param equals: Filtros columna=valor (country="USA", fatal=1).
+        :return: LazyQuery nueva.
+        """
+        query = self
+        for column, value in equals.items():
+            operator = "in" if isinstance(value, (list, tuple, set)) else "=="
+            query = query.where(column, operator, value)
+        return query
+
+    def expression(self):
+        """
+        Construye la expresión de pyarrow de los filtros, añadiendo los filtros
+        equivalentes sobre 'decade' para descartar particiones por año.
+
+        :return: Expresión de pyarrow o None si no hay filtros.
+        """
+        expressions = []
+        for column, operator, value in self.filters:
+            expressions.append(OPERATORS[operator](pc.field(column), value))
+            if column == "year":
+                expressions += self._decade_expressions(operator, value)
+
+        if not expressions:
+            return None
+        expression = expressions[0]
+        for other in expressions[1:]:
+            expression = expression & other
+        return expression
+
+    def fragments(self):
+        """
+        Devuelve los archivos que hay que leer después de descartar particiones.
+
+        :return: Lista de rutas.
+        """
+        return [fragment.path for fragment in self.store.dataset.get_fragments(filter=self.expression())]
+
+    def to_pandas(self):
+        """
+        Ejecuta la consulta. Sin select() se leen todas las columnas; 'country' sale
+        de la partición y queda al final.
+
+        :return: DataFrame con las filas y columnas pedidas.
+        """
+        columns = self.columns or [name for name in self.store.dataset.schema.names if name != "decade"]
+        table = self.store.dataset.to_table(columns=columns, filter=self.expression())
+        return table.to_pandas()
+
+    def count(self):
+        """
+        Cuenta las filas que cumplen los filtros (sin leer más columnas que las de los filtros).
+
+        :return: Número de filas.
+        """
+        return self.store.dataset.count_rows(filter=self.expression())
+
+    @staticmethod
+    def _decade_expressions(operator, value):
+        """
+        Traduce un filtro de 'year' a filtros sobre la partición 'decade'.
+
+        :param operator: Operador del filtro.
+        :param value: Valor del filtro.
+        :return: Lista de expresiones (vacía si el filtro no permite descartar décadas).
+        """
+        decade = pc.field("decade")
+        if operator == "in":
+            return [decade.isin(sorted({int(year) // 10 * 10 for year in value}))]
+        if operator == "==":
+            return [decade == int(value) // 10 * 10]
+        if operator in ("<", "<="):
+            return [decade <= int(value) // 10 * 10]
+        if operator in (">", ">="):
+            return [decade >= int(value) // 10 * 10]
+        return []
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    df = pd.read_excel("../data/processed/GSAF5_cleaned.xlsx", engine="openpyxl")
+    store = PartitionedStore("../data/processed/GSAF5_partitioned")
+    store.write(df)
+
+    query = store.query().filter(country="USA").where("year", ">=", 2000).select("year", "state", "fatal")
+    print(f"🔹 Archivos a leer: {len(query.fragments())} de {len(store.dataset.files)}")
+    usa = query.to_pandas()
+    print(usa.groupby("state").size().sort_values(ascending=False).head())
+    print(f"🔹 Ataques fatales en Australia: {store.query().filter(country='AUSTRALIA', fatal=1).count()}")
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+
+from file_cache import atomic_write
+
+# Paquete de reglas por defecto (se puede cambiar con la variable de entorno SHARK_EDA_RULES)
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "rules.json")
+
+# Versión del compilador: forma parte de la huella, así que al cambiar RulePack
+# las cachés compiladas con la versión anterior dejan de usarse
+COMPILER_VERSION = 1
+
+# Secciones y claves obligatorias de un paquete de reglas
+REQUIRED_RULES = {
+    "country": ("mapping",),
+    "type": ("invalid",),
+    "sex": ("valid", "invalid"),
+    "fatal": ("invalid", "fatal"),
+    "time": ("invalid", "periods", "hours", "other_hours"),
+    "species": ("invalid", "thresholds", "sizes"),
+}
+
+# Paquetes ya cargados en este proceso, por huella, y huella de cada archivo ya
+# leído (por ruta, fecha de modificación y tamaño) para no volver a leerlo
+RULE_PACKS = {}
+RULE_FILES = {}
+
+class RulePack:
+    """
+    Clase con las reglas de limpieza compiladas en estructuras de búsqueda:
+    diccionarios y conjuntos (frozenset) para las listas de valores y una sola
+    expresión regular para las franjas horarias de 'time'.
+
+    Las reglas se declaran en JSON o YAML (ver config/rules.json). Compilar un
+    paquete es un poco más caro que leerlo, así que load_rule_pack() guarda el
+    paquete compilado en una caché en disco cuyo nombre lleva la huella de las
+    reglas: si no cambian, los siguientes arranques no vuelven a compilarlas.
+    """
+
+    def __init__(self, rules):
+        """
+        Valida y compila las reglas.
+
+        :param rules: Diccionario con las secciones de REQUIRED_RULES.
+        """
+        for section, keys in REQUIRED_RULES.items():
+            missing = [key for key in keys if key not in rules.get(section, {})]
+            if missing:
+                raise ValueError(f"Faltan reglas en la sección '{section}': {', '.join(missing)}")
+
+        self.hash = self.rule_hash(rules)
+
+        self.country_mapping = dict(rules["country"]["mapping"])
+        self.type_invalid = frozenset(rules["type"]["invalid"])
+        self.sex_valid = frozenset(rules["sex"]["valid"])
+        self.sex_invalid = frozenset(rules["sex"]["invalid"])
+        self.fatal_invalid = frozenset(rules["fatal"]["invalid"])
+        self.fatal_values = frozenset(str(value).strip().upper() for value in rules["fatal"]["fatal"])
+
+        time = rules["time"]
+        self.time_invalid = frozenset(time["invalid"])
+        # Cada franja es un lookahead opcional con su propio grupo; el orden de
+        # 'periods' es la prioridad (el primer grupo que encaja decide)
+        self.time_periods = [(f"period_{position}", category) for position, category in enumerate(time["periods"])]
+        self.time_pattern = self.compile_time_pattern(list(time["periods"].values()))
+        self.time_hours = [(int(start), int(end), category) for category, (start, end) in time["hours"].items()]
+        self.time_other_hours = time["other_hours"]
+
+        species = rules["species"]
+        self.species_invalid = frozenset(species["invalid"])
+        self.species_thresholds = tuple(float(threshold) for threshold in species["thresholds"])
+        self.species_sizes = {str(name).lower(): size for name, size in species["sizes"].items()}
+        self._species_classifier = None
+
+    @staticmethod
+    def rule_hash(rules):
+        """
+        Huella de las reglas: SHA-256 de su JSON canónico (sin espacios y con el
+        orden de las claves, que importa en las franjas horarias) y de COMPILER_VERSION.
+
+        :param rules: Diccionario con las reglas.
+        :return: Cadena hexadecimal de 16 caracteres.
+        """
+        canonical = json.dumps([COMPILER_VERSION, rules], ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def compile_time_pattern(periods):
+        """
+        Une las palabras de todas las franjas en un único autómata: cada franja va
+        en un lookahead opcional, así se conserva la prioridad entre franjas con
+        una sola búsqueda. La hora es el primer grupo de 1-2 dígitos
+        ('14h00-15h00' -> 14, '09h30 / 10h00' -> 9).
+
+        :param periods: Lista con las palabras de cada franja (en minúsculas).
+        :return: Expresión regular compilada.
+        """
+        lookaheads = "".join(
+            rf"(?=.*?\b(?P<period_{position}>" + "|".join(re.escape(word) for word in words) + r")\b)?"
+            for position, words in enumerate(periods)
+        )
+        return re.compile(r"(?s)^" + lookaheads + r"(?=\D*(?P<hour>\d{1,2}))?")
+
+    @property
+    def species_classifier(self):
+        """
+        SpeciesSizeClassifier con los tamaños y límites del paquete. Se crea una
+        vez por paquete y su caché de valores distintos se conserva entre llamadas.
+        """
+        if self._species_classifier is None:
+            from species_classifier import SpeciesSizeClassifier
+
+            self._species_classifier = SpeciesSizeClassifier(self.species_thresholds, self.species_sizes)
+        return self._species_classifier
+
+    def __getstate__(self):
+        """
+        Estado que se guarda en la caché en disco (sin el clasificador ni su caché).
+        """
+        state = dict(self.__dict__)
+        state["_species_classifier"] = None
+        return state
+
+def read_rules(path):
+    """
+    Lee un archivo de reglas en JSON o YAML (según la extensión).
+
+    :param path: Ruta del archivo.
+    :return: Diccionario con las reglas.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8") as source:
+        if extension in (".yaml", ".yml"):
+            import yaml  # Solo hace falta para las reglas en YAML
+
+            return yaml.safe_load(source)
+        if extension == ".json":
+            return json.load(source)
+    raise ValueError(f"Formato de reglas no soportado: {extension}. Usa .json, .yaml o .yml")
+
+def load_rule_pack(rules=None, cache_dir=None):
+    """
+    Devuelve un paquete de reglas compilado. Un archivo solo se vuelve a leer
+    si ha cambiado, y las reglas solo se compilan si su huella no está en este
+    proceso ni en la caché en disco.
+
+    :param rules: RulePack (se devuelve tal cual), ruta de un archivo de reglas,
+                  diccionario de reglas o None para el paquete por defecto
+                  (SHARK_EDA_RULES o DEFAULT_RULES_PATH).
+    :param cache_dir: Carpeta de la caché. Por defecto .cache junto al archivo de reglas
+                      (con un diccionario, sin caché en disco).
+    :return: RulePack.
+    """
+    if isinstance(rules, RulePack):
+        return rules
+
+    path = None
+    if rules is None or isinstance(rules, (str, os.PathLike)):
+        path = os.path.abspath(os.fspath(rules or os.environ.get("SHARK_EDA_RULES") or DEFAULT_RULES_PATH))
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        if signature in RULE_FILES:
+            return RULE_PACKS[RULE_FILES[signature]]
+        rules = read_rules(path)
+        cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), ".cache")
+
+    key = RulePack.rule_hash(rules)
+    if path is not None:
+        RULE_FILES[signature] = key
+    if key in RULE_PACKS:
+        return RULE_PACKS[key]
+
+    cache_path = os.path.join(cache_dir, f"rules.{key}.pkl") if cache_dir else None
+    if cache_path is not None and os.path.exists(cache_path):
+        with open(cache_path, "rb") as source:
+            pack = pickle.load(source)
+    else:
+        pack = RulePack(rules)
+        if cache_path is not None:
+            def write(temp_path):
+                with open(temp_path, "wb") as sink:
+                    pickle.dump(pack, sink, protocol=pickle.HIGHEST_PROTOCOL)
+
+            atomic_write(cache_path, write)
+            print(f"✅ Reglas de {path} compiladas en {cache_path}")
+
+    RULE_PACKS[key] = pack
+    return pack
+
+def default_rule_pack():
+    """
+    Paquete de reglas por defecto (el que usan los limpiadores si no se les pasa otro).
+
+    :return: RulePack.
+    """
+    return load_rule_pack()
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    pack = default_rule_pack()
+    print(f"🔹 Huella: {pack.hash}")
+    print(f"🔹 Países mapeados: {len(pack.country_mapping)}, especies con tamaño: {len(pack.species_sizes)}")
+    print(f"🔹 Franjas horarias: {pack.time_periods}")
+
+    # Un paquete ajustado a partir del de por defecto (sin archivo, sin caché en disco)
+    tuned = read_rules(DEFAULT_RULES_PATH)
+    tuned["sex"]["invalid"].append("M & F")
+    tuned_pack = load_rule_pack(tuned)
+    print(f"🔹 Huella del paquete ajustado: {tuned_pack.hash} ('M & F' inválido: {'M & F' in tuned_pack.sex_invalid})")
@@ -0,0 +1,126 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from rule_pack import load_rule_pack
+
+# Longitudes: metros, centímetros y pies ('6'', '6 ft', '6 feet')
+NUMBER = r"(\d+(?:[.,]\d+)?)"
+METRES_PATTERN = NUMBER + r"\s*m\b"
+CENTIMETRES_PATTERN = NUMBER + r"\s*cm\b"
+FEET_PATTERN = NUMBER + r"\s*(?:'|’|′|ft\b|feet\b|foot\b)"
+FOOT_IN_METRES = 0.3048
+
+class SpeciesSizeClassifier:
+    """
+    Clase para clasificar el texto libre de 'species' en Small, Medium o Large.
+
+    Primero busca una longitud (en metros si aparece, si no en centímetros o
+    pies; en los rangos como "1.2 m to 1.5 m" se usa el límite superior) y la
+    compara con los límites de tamaño. Si no hay longitud, usa el tamaño típico
+    de la especie nombrada. Las expresiones regulares se aplican de forma
+    vectorizada sobre los valores distintos y el resultado de cada valor se
+    guarda en caché entre llamadas.
+    """
+
+    def __init__(self, thresholds=None, species_sizes=None):
+        """
+        Inicializa la clase con los límites de tamaño y el tamaño de cada especie.
+
+        :param thresholds: Tupla (límite Small/Medium, límite Medium/Large) en metros.
+                           Por defecto 'species.thresholds' del paquete de reglas por defecto.
+        :param species_sizes: Diccionario {nombre de especie en minúsculas: tamaño}.
+                              Por defecto 'species.sizes' del paquete de reglas por defecto.
+        """
+        if thresholds is None or species_sizes is None:
+            rules = load_rule_pack()
+            thresholds = rules.species_thresholds if thresholds is None else thresholds
+            species_sizes = rules.species_sizes if species_sizes is None else species_sizes
+        self.thresholds = tuple(thresholds)
+        self.species_sizes = dict(species_sizes)
+        # Las especies más largas primero, para que "grey nurse" gane a "nurse"
+        names = sorted(self.species_sizes, key=len, reverse=True)
+        self.species_pattern = r"\b(" + "|".join(re.escape(name) for name in names) + r")\b"
+        self.cache = {}
+
+    def classify(self, species):
+        """
+        Clasifica una serie de textos de especies.
+
+        :param species: Serie de Pandas con los valores originales.
+        :return: Serie con 'Small', 'Medium', 'Large' o None si no se puede clasificar.
+        """
+        codes, uniques = pd.factorize(species)
+
+        new_values = [value for value in uniques if value not in self.cache]
+        if new_values:
+            sizes = self.classify_values(pd.Series(new_values, dtype=object))
+            self.cache.update(zip(new_values, sizes))
+
+        # La última posición guarda el resultado para los nulos (código -1)
+        results = np.empty(len(uniques) + 1, dtype=object)
+        results[:-1] = [self.cache[value] for value in uniques]
+        results[-1] = None
+
+        classified = pd.Series(results).infer_objects().take(codes)
+        classified.index = species.index
+        classified.name = species.name
+        return classified
+
+    def classify_values(self, values):
+        """
+        Clasifica textos distintos sin usar la caché.
+
+        :param values: Serie de Pandas con valores distintos y no nulos.
+        :return: Array con el tamaño de cada valor (None si no se puede clasificar).
+        """
+        text = values.astype(str).str.lower()
+        lengths = self.extract_lengths(text)
+        species_names = text.str.extract(self.species_pattern, expand=False)
+        species_sizes = species_names.map(self.species_sizes)
+
+        small_limit, large_limit = self.thresholds
+        sizes = np.select(
+            [lengths < small_limit, lengths < large_limit, lengths >= large_limit],
+            ["Small", "Medium", "Large"],
+            default="",
+        ).astype(object)
+        no_length = lengths.isna().to_numpy()
+        sizes[no_length] = species_sizes.to_numpy(dtype=object)[no_length]
+        sizes[pd.isna(sizes)] = None
+        return sizes
+
+    @staticmethod
+    def extract_lengths(text):
+        """
+        Extrae la longitud del tiburón en metros. Se usa el mayor valor en metros
+        si lo hay (límite superior de los rangos) y si no el de centímetros o pies.
+
+        :param text: Serie de textos en minúsculas.
+        :return: Serie de longitudes en metros (NaN si no hay ninguna).
+        """
+        def largest(pattern, factor):
+            numbers = text.str.extractall(pattern)[0].str.replace(",", ".", regex=False).astype(float)
+            return (numbers.groupby(level=0).max() * factor).reindex(text.index)
+
+        lengths = largest(METRES_PATTERN, 1.0)
+        lengths = lengths.fillna(largest(CENTIMETRES_PATTERN, 0.01))
+        return lengths.fillna(largest(FEET_PATTERN, FOOT_IN_METRES))
+
+    def clear_cache(self):
+        """
+        Vacía la caché de resultados.
+        """
+        self.cache.clear()
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.Series([
+        "White shark", "1.2 m to 1.5 m [4' to 5'] shark", "Bull shark, 6'", "Sand tiger shark",
+        "Said to be a 2.7 m [9'] hammerhead", "Grey nurse shark, 150 cm", "Wobbegong", "Shark involvement prior to death",
+        None,
+    ])
+
+    classifier = SpeciesSizeClassifier()
+    print(pd.DataFrame({"species": sample_data, "size": classifier.classify(sample_data)}))
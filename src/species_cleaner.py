@@ -1,122 +1,188 @@
 import pandas as pd
 
+from data_exporter import DataExporter
+from group_imputer import GroupImputer
+from imputation_stats import count_values, mode_from_counts
+from rule_pack import load_rule_pack
+
+# Valores reales de 'species' y su tamaño (el antiguo mapeo manual). El clasificador
+# los reproduce todos; se conservan como ejemplos y para los datos sintéticos de benchmarks
+SPECIES_MAPPING = {
+    "White shark": "Large",
+    "Tiger shark": "Large",
+    "Bull shark": "Large",
+    "6' shark": "Medium",
+    "4' shark": "Small",
+    "1.8 m [6'] shark": "Medium",
+    "1.5 m [5'] shark": "Small",
+    "5' shark": "Small",
+    "1.2 m [4'] shark": "Small",
+    "4' to 5' shark": "Small",
+    "2 m shark": "Medium",
+    "3' shark": "Small",
+    "3 m [10'] shark": "Large",
+    "Nurse shark": "Medium",
+    "Blacktip shark": "Medium",
+    "3' to 4' shark": "Small",
+    "3 m shark": "Large",
+    "2.4 m [8'] shark": "Medium",
+    "12' shark": "Large",
+    "3.7 m [12'] shark": "Large",
+    "Blue shark": "Large",
+    "7' shark": "Medium",
+    "1.2 m to 1.5 m [4' to 5'] shark": "Small",
+    "Mako shark": "Large",
+    "1.5 m shark": "Small",
+    "Bronze whaler shark": "Medium",
+    "Raggedtooth shark": "Medium",
+    "6 m [20'] white shark": "Large",
+    "10' shark": "Large",
+    "5 m [16.5'] white shark": "Large",
+    "Grey nurse shark": "Medium",
+    "Zambesi shark": "Medium",
+    "Sandtiger shark": "Medium",
+    "Hammerhead shark": "Large",
+    "Oceanic whitetip shark": "Large",
+    "Lemon shark": "Medium",
+    "4 m [13'] white shark": "Large",
+    "8' shark": "Medium",
+    "2' to 3' shark": "Small",
+    "2.1 m [7'] shark": "Medium",
+    "1 m shark": "Small",
+    "Bull shark, 6'": "Medium",
+    "9' shark": "Medium",
+    "3 m [10'] white shark": "Large",
+    "2.5 m shark": "Medium",
+    "Spinner shark": "Medium",
+    "1.8 m shark": "Medium",
+    "Basking shark": "Large",
+    "2' shark": "Small",
+    "5' to 6' shark": "Medium",
+    "14' shark": "Large",
+    "4 m to 5 m [13' to 16.5'] white shark": "Large",
+    "Angel shark": "Medium",
+    "6' to 8' shark": "Medium",
+    "2.5 m [8.25'] white shark": "Medium",
+    "1.8 m [6'] blacktip shark": "Medium",
+    "4.3 m [14'] shark": "Large",
+    "3 m [10'] bull shark": "Large",
+    "1.8 m to 2.4 m [6' to 8'] shark": "Medium",
+    "15' shark": "Large",
+    "13' shark": "Large",
+    "4.6 m [15'] shark": "Large",
+    "Sevengill shark": "Medium",
+    "0.9 m [3'] shark": "Small",
+    "5 m to 6 m [16.5' to 20'] white shark": "Large",
+    "5.5 m [18'] white shark": "Large",
+    "Grey reef shark": "Medium",
+    "Tiger shark, 3 m [10']": "Large",
+    "4 m [13'] shark": "Large",
+    "Caribbean reef shark": "Medium",
+    "Bull shark, 4' to 5'": "Small"
+}
+
 class SpeciesCleaner:
     """
     Clase para limpiar la columna 'species' del DataFrame.
     """
 
-    def __init__(self, df):
+    column = "species"
+    rule_section = "species"
+
+    def __init__(self, df, copy=True, rules=None):
         """
         Inicializa la clase con un DataFrame.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas).
+                      Por defecto el de config/rules.json (ver load_rule_pack).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
+        self.rules = load_rule_pack(rules)
 
-    def clean_species_column(self):
+    def clean_species_column(self, fill_value=None, group_by=None):
         """
         Limpia la columna 'species':
         - Normaliza nombres de especies
         - Agrupa especies por tamaño
         - Rellena valores nulos y 'Unknown' con la moda
+
+        :param fill_value: Valor de relleno ya calculado (por ejemplo, sobre todo el archivo
+                           en StreamingCleaner). Por defecto se calcula sobre esta columna.
+        :param group_by: Niveles de agrupación para rellenar con la moda de cada grupo
+                         (ver GroupImputer; por ejemplo, IMPUTATION_LEVELS). fill_value
+                         queda como valor para las filas sin grupo con datos suficientes.
         """
         if "species" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
-
-            # Mapeo de especies por tamaño
-            species_mapping = {
-                "White shark": "Large",
-                "Tiger shark": "Large",
-                "Bull shark": "Large",
-                "6' shark": "Medium",
-                "4' shark": "Small",
-                "1.8 m [6'] shark": "Medium",
-                "1.5 m [5'] shark": "Small",
-                "5' shark": "Small",
-                "1.2 m [4'] shark": "Small",
-                "4' to 5' shark": "Small",
-                "2 m shark": "Medium",
-                "3' shark": "Small",
-                "3 m [10'] shark": "Large",
-                "Nurse shark": "Medium",
-                "Blacktip shark": "Medium",
-                "3' to 4' shark": "Small",
-                "3 m shark": "Large",
-                "2.4 m [8'] shark": "Medium",
-                "12' shark": "Large",
-                "3.7 m [12'] shark": "Large",
-                "Blue shark": "Large",
-                "7' shark": "Medium",
-                "1.2 m to 1.5 m [4' to 5'] shark": "Small",
-                "Mako shark": "Large",
-                "1.5 m shark": "Small",
-                "Bronze whaler shark": "Medium",
-                "Raggedtooth shark": "Medium",
-                "6 m [20'] white shark": "Large",
-                "10' shark": "Large",
-                "5 m [16.5'] white shark": "Large",
-                "Grey nurse shark": "Medium",
-                "Zambesi shark": "Medium",
-                "Sandtiger shark": "Medium",
-                "Hammerhead shark": "Large",
-                "Oceanic whitetip shark": "Large",
-                "Lemon shark": "Medium",
-                "4 m [13'] white shark": "Large",
-                "8' shark": "Medium",
-                "2' to 3' shark": "Small",
-                "2.1 m [7'] shark": "Medium",
-                "1 m shark": "Small",
-                "Bull shark, 6'": "Medium",
-                "9' shark": "Medium",
-                "3 m [10'] white shark": "Large",
-                "2.5 m shark": "Medium",
-                "Spinner shark": "Medium",
-                "1.8 m shark": "Medium",
-                "Basking shark": "Large",
-                "2' shark": "Small",
-                "5' to 6' shark": "Medium",
-                "14' shark": "Large",
-                "4 m to 5 m [13' to 16.5'] white shark": "Large",
-                "Angel shark": "Medium",
-                "6' to 8' shark": "Medium",
-                "2.5 m [8.25'] white shark": "Medium",
-                "1.8 m [6'] blacktip shark": "Medium",
-                "4.3 m [14'] shark": "Large",
-                "3 m [10'] bull shark": "Large",
-                "1.8 m to 2.4 m [6' to 8'] shark": "Medium",
-                "15' shark": "Large",
-                "13' shark": "Large",
-                "4.6 m [15'] shark": "Large",
-                "Sevengill shark": "Medium",
-                "0.9 m [3'] shark": "Small",
-                "5 m to 6 m [16.5' to 20'] white shark": "Large",
-                "5.5 m [18'] white shark": "Large",
-                "Grey reef shark": "Medium",
-                "Tiger shark, 3 m [10']": "Large",
-                "4 m [13'] shark": "Large",
-                "Caribbean reef shark": "Medium",
-                "Bull shark, 4' to 5'": "Small"
-            }
-
-            # Función de limpieza con apply()
-            def clean_value(value):
-                if pd.isna(value) or value in ["?", "Invalid", "No shark involvement", "Shark involvement not confirmed"]:
-                    return None  # Convertimos valores problemáticos a NaN
-                return species_mapping.get(value, "Unknown")  # Mapeamos especies o asignamos "Unknown"
-
-            self.cleaned_df["species"] = self.cleaned_df["species"].apply(clean_value)
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            species = self.clean_values(self.cleaned_df["species"], self.rules)
 
             # Rellenar valores nulos y 'Unknown' con la moda
-            valid_species = self.cleaned_df["species"][self.cleaned_df["species"] != "Unknown"]
-            mode_value = valid_species.mode()[0]
-            self.cleaned_df["species"].fillna(mode_value, inplace=True)
-            self.cleaned_df["species"].replace("Unknown", mode_value, inplace=True)
+            if fill_value is None:
+                fill_value = self.fill_value_from_statistics(self.collect_statistics(species))
+            if group_by is not None:
+                fill_value = GroupImputer(group_by).fill_values(species.mask(species == "Unknown"), self.cleaned_df, fallback=fill_value)
+            self.cleaned_df["species"] = self.fill_missing(species, fill_value)
 
             print("✅ Columna 'species' limpiada y valores nulos y 'Unknown' rellenados con la moda.")
         else:
             print("❌ La columna 'species' no existe en el DataFrame.")
 
+    @staticmethod
+    def clean_values(species, rules=None):
+        """
+        Clasifica los valores de 'species' por tamaño sin rellenar los nulos,
+        a partir de la longitud o de la especie que aparece en el texto
+        (SpeciesSizeClassifier). Los que no se pueden clasificar quedan como 'Unknown'.
+
+        :param species: Serie de Pandas con los valores originales.
+        :param rules: Paquete de reglas (por defecto el de config/rules.json). Cada
+                      paquete tiene su clasificador, cuya caché se conserva entre llamadas.
+        :return: Serie limpia.
+        """
+        rules = load_rule_pack(rules)
+        valid = species.where(~species.isin(rules.species_invalid))  # Convertimos valores problemáticos a NaN
+        sizes = rules.species_classifier.classify(valid)
+        return sizes.fillna("Unknown").mask(valid.isna())
+
+    @staticmethod
+    def collect_statistics(values):
+        """
+        Calcula la estadística parcial de la columna limpia (conteos para la moda,
+        sin contar 'Unknown').
+
+        :param values: Serie devuelta por clean_values().
+        :return: Serie con el número de apariciones por valor.
+        """
+        return count_values(values[values != "Unknown"])
+
+    @staticmethod
+    def fill_value_from_statistics(statistics):
+        """
+        Calcula el valor de relleno a partir de las estadísticas (combinadas) de la columna.
+
+        :param statistics: Conteos devueltos por collect_statistics().
+        :return: La moda.
+        """
+        return mode_from_counts(statistics)
+
+    @staticmethod
+    def fill_missing(values, fill_value):
+        """
+        Rellena los valores nulos y 'Unknown' con el valor indicado.
+
+        :param values: Serie devuelta por clean_values().
+        :param fill_value: Valor de relleno (si es None no se rellena).
+        :return: Serie rellenada.
+        """
+        if fill_value is None:
+            return values
+        return values.mask(values == "Unknown").fillna(fill_value)
+
     def get_cleaned_data(self):
         """
         Devuelve el DataFrame con la columna 'species' limpia.
@@ -125,14 +191,16 @@ class SpeciesCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
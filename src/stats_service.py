@@ -0,0 +1,284 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from attack_cube import AttackCube, CUBE_DIMENSIONS
+from data_loader import DataLoader
+
+# Dimensiones que se agrupan con pandas porque no están en el cubo (más lentas)
+EXTRA_DIMENSIONS = ("activity",)
+
+# Estados HTTP que usa el servicio
+HTTP_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+class StatsService:
+    """
+    Servicio HTTP local (asyncio) con las estadísticas de ataques del análisis
+    exploratorio en JSON:
+
+    - GET /health
+    - GET /attacks/by/<dimensión>?country=USA&top=10
+    - GET /fatal/by/<dimensión>?country=USA
+    - GET /fatality-rate/by/<dimensión>?min_attacks=10
+
+    Las dimensiones son las del cubo (country, state, year, month, species, type,
+    sex) y 'activity'; el resto de parámetros son filtros de igualdad (separando
+    varios valores con comas). Los datos se cargan una vez al arrancar y los
+    agregados salen de un AttackCube. Los resultados se guardan en una caché LRU
+    acotada que se vacía cuando cambia el archivo de datos, y los cálculos que no
+    están en caché se hacen en un pool de hilos para no bloquear el bucle de eventos.
+    """
+
+    def __init__(self, file_path, cache_size=256, max_workers=4):
+        """
+        Inicializa el servicio sin cargar todavía los datos.
+
+        :param file_path: Ruta del archivo de datos limpios (Excel, CSV, Parquet o Feather).
+        :param cache_size: Número máximo de resultados en la caché.
+        :param max_workers: Número de hilos para los cálculos.
+        """
+        self.file_path = file_path
+        self.cache_size = cache_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cache = OrderedDict()
+        self.df = None
+        self.cube = None
+        self.file_signature = None
+        self.generation = 0  # Cambia con cada carga de datos
+        self.reload_lock = None
+
+    def load(self):
+        """
+        Carga el archivo de datos, construye el cubo, vacía la caché y pasa a la
+        siguiente generación de datos.
+        """
+        signature = self._file_signature()
+        loader = DataLoader(self.file_path)
+        loader.load_data()
+        df = loader.get_data()
+        if df is None:
+            raise ValueError(f"No se pudieron cargar los datos de {self.file_path}")
+        if "month" not in df.columns:
+            df["month"] = pd.to_datetime(df["date"], errors="coerce", format="mixed").dt.month
+
+        self.df = df
+        self.cube = AttackCube(df)
+        self.generation += 1
+        self.cache.clear()
+        self.file_signature = signature
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """
+        Carga los datos y atiende peticiones hasta que se cancela la tarea.
+
+        :param host: Dirección en la que escuchar.
+        :param port: Puerto (0 para elegir uno libre).
+        """
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Carga los datos y arranca el servidor sin bloquear.
+
+        :param host: Dirección en la que escuchar.
+        :param port: Puerto (0 para elegir uno libre).
+        :return: asyncio.Server (server.sockets[0].getsockname() da el puerto real).
+        """
+        self.reload_lock = asyncio.Lock()
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.load)
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"✅ Servicio de estadísticas escuchando en http://{address[0]}:{address[1]}")
+        return server
+
+    async def get(self, path, params):
+        """
+        Resuelve una petición GET (con caché).
+
+        :param path: Ruta de la petición.
+        :param params: Diccionario con los parámetros de la consulta.
+        :return: Tupla (estado HTTP, contenido JSON serializable).
+        """
+        await self._reload_if_changed()
+        if path == "/health":
+            return 200, {"status": "ok", "rows": len(self.df), "cells": len(self.cube.coords),
+                         "cached_results": len(self.cache)}
+
+        parts = path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] not in ("attacks", "fatal", "fatality-rate") or parts[1] != "by":
+            return 404, {"error": f"Ruta no encontrada: {path}"}
+        metric, dimension = parts[0], parts[2]
+        if dimension not in CUBE_DIMENSIONS + EXTRA_DIMENSIONS:
+            return 404, {"error": f"Dimensión no soportada: {dimension}"}
+
+        key = (metric, dimension, tuple(sorted(params.items())))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return 200, self.cache[key]
+
+        loop = asyncio.get_running_loop()
+        generation = self.generation
+        try:
+            result = await loop.run_in_executor(self.executor, self.aggregate, metric, dimension, dict(params))
+        except ValueError as error:
+            return 400, {"error": str(error)}
+
+        # Si los datos se han recargado durante el cálculo, el resultado es de los
+        # datos anteriores y no se guarda en la caché ya vaciada
+        if generation != self.generation:
+            return 200, result
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return 200, result
+
+    def aggregate(self, metric, dimension, params):
+        """
+        Calcula una estadística (se ejecuta en el pool de hilos).
+
+        :param metric: 'attacks', 'fatal' o 'fatality-rate'.
+        :param dimension: Dimensión por la que se agrupa.
+        :param params: Filtros y opciones ('top', 'min_attacks').
+        :return: Diccionario JSON serializable.
+        """
+        top = int(params.pop("top")) if "top" in params else None
+        min_attacks = int(params.pop("min_attacks", 0))
+        filters = {column: self._parse_values(column, value) for column, value in params.items()}
+
+        if dimension in CUBE_DIMENSIONS and all(column in CUBE_DIMENSIONS for column in filters):
+            attacks = self.cube.rollup(dimension, **filters)
+            fatal = self.cube.rollup(dimension, measure="fatal", **filters)
+        else:
+            df = self.df
+            for column, values in filters.items():
+                if column not in df.columns:
+                    raise ValueError(f"Columna no soportada: {column}")
+                df = df[df[column].isin(values)]
+            attacks = df.groupby(dimension).size()
+            fatal = pd.to_numeric(df["fatal"], errors="coerce").groupby(df[dimension]).sum()
+
+        if metric == "attacks":
+            values = attacks.sort_values(ascending=False, kind="stable")
+        elif metric == "fatal":
+            values = fatal.reindex(attacks.index).sort_values(ascending=False, kind="stable")
+        else:
+            values = (fatal.reindex(attacks.index) / attacks)[attacks >= min_attacks].round(4)
+            values = values.sort_values(ascending=False, kind="stable")
+        if top is not None:
+            values = values.head(top)
+
+        return {
+            "metric": metric,
+            "dimension": dimension,
+            "filters": {column: [self._to_json(value) for value in values_] for column, values_ in filters.items()},
+            "data": [{"key": self._to_json(label), "value": self._to_json(value)} for label, value in values.items()],
+        }
+
+    async def _reload_if_changed(self):
+        """
+        Vuelve a cargar los datos (y vacía la caché) si el archivo ha cambiado.
+        """
+        if self._file_signature() == self.file_signature:
+            return
+        async with self.reload_lock:
+            if self._file_signature() != self.file_signature:
+                await asyncio.get_running_loop().run_in_executor(self.executor, self.load)
+                print(f"✅ Datos recargados desde {self.file_path}")
+
+    def _file_signature(self):
+        """
+        Firma barata del archivo de datos (fecha de modificación y tamaño).
+
+        :return: Tupla o None si el archivo no existe.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Atiende una conexión HTTP/1.1 (una petición por conexión).
+
+        :param reader: StreamReader de la conexión.
+        :param writer: StreamWriter de la conexión.
+        """
+        start = time.perf_counter()
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Las cabeceras no se usan
+
+            if len(request_line) < 2:
+                status, content = 400, {"error": "Petición no válida"}
+            elif request_line[0] != "GET":
+                status, content = 405, {"error": f"Método no soportado: {request_line[0]}"}
+            else:
+                url = urlsplit(request_line[1])
+                try:
+                    status, content = await self.get(url.path, dict(parse_qsl(url.query)))
+                except Exception as error:
+                    status, content = 500, {"error": str(error)}
+                content = dict(content, elapsed_ms=round((time.perf_counter() - start) * 1000, 3))
+
+            body = json.dumps(content, ensure_ascii=False).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def _parse_values(self, column, value):
+        """
+        Convierte el valor de un filtro de la URL al tipo de la columna.
+
+        :param column: Columna del filtro.
+        :param value: Texto del parámetro (varios valores separados por comas).
+        :return: Lista de valores.
+        """
+        values = value.split(",")
+        if column in self.df.columns and pd.api.types.is_numeric_dtype(self.df[column]):
+            try:
+                return [float(item) if "." in item else int(item) for item in values]
+            except ValueError:
+                raise ValueError(f"Valor no numérico para '{column}': {value}")
+        return values
+
+    @staticmethod
+    def _to_json(value):
+        """
+        Convierte un valor de NumPy o pandas a un tipo de JSON.
+
+        :param value: Valor.
+        :return: Valor serializable.
+        """
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float):
+            if np.isnan(value):
+                return None
+            if value.is_integer():
+                return int(value)
+        return value
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    service = StatsService("../data/processed/GSAF5_cleaned.xlsx")
+    try:
+        asyncio.run(service.serve(port=8080))
+    except KeyboardInterrupt:
+        print("✅ Servicio detenido.")
@@ -0,0 +1,384 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from cleaning_pipeline import DEFAULT_STAGES
+from column_cleaner import ColumnCleaner
+from data_exporter import DataExporter
+from data_loader import DataLoader
+from dtype_optimizer import DtypeOptimizer
+from duplicates_cleaner import DuplicatesCleaner
+from file_cache import atomic_write
+from imputation_stats import combine_statistics
+from instrumentation import metrics
+from rule_pack import load_rule_pack
+
+# Las categorías de cada bloque no coinciden entre sí, así que la conversión a
+# tipos compactos se hace al leer los datos ya escritos (DtypeOptimizer)
+STREAMING_STAGES = [stage for stage in DEFAULT_STAGES if stage[0] is not DtypeOptimizer]
+
+class StreamingCleaner:
+    """
+    Clase para limpiar archivos más grandes que la memoria por bloques de filas.
+
+    Hace dos pasadas sobre el archivo:
+    1. Calcula las estadísticas globales de imputación (conteos para la moda,
+       suma y número de valores para la media) bloque a bloque.
+    2. Limpia cada bloque con esas estadísticas y lo escribe en la salida.
+
+    El resultado es el mismo que con CleaningPipeline sobre el archivo completo
+    y la memoria máxima depende del tamaño del bloque (más cada 'case_number'
+    distinto y su hash, que se guardan para quitar los duplicados).
+    """
+
+    def __init__(self, file_path, chunksize=100_000, stages=None, verbose=False, rules=None):
+        """
+        Inicializa la clase con la ruta del archivo de datos.
+
+        :param file_path: Ruta del archivo (CSV, Parquet, Feather o Excel).
+                          El Excel no se puede leer por bloques y se carga completo.
+        :param chunksize: Número de filas por bloque.
+        :param stages: Lista de tuplas (clase limpiadora, método). Por defecto STREAMING_STAGES.
+        :param verbose: Si es True se muestran los mensajes de cada limpiador en cada bloque.
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas) para las
+                      etapas que tienen reglas. Por defecto el de config/rules.json.
+        """
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.stages = list(stages) if stages is not None else list(STREAMING_STAGES)
+        self.verbose = verbose
+        self.rules = load_rule_pack(rules)
+        self.fill_values = None
+        self.text_columns = []
+        self._seen_hashes = np.empty(0, dtype=np.uint64)
+        self._seen_keys = np.empty(0, dtype=object)
+        self._seen_null_key = False
+
+    def iter_raw_chunks(self):
+        """
+        Lee el archivo por bloques. El índice de cada bloque continúa el del anterior,
+        igual que si se hubiera leído el archivo completo.
+
+        :return: Generador de DataFrames.
+        """
+        extension = os.path.splitext(self.file_path)[1].lower()
+        offset = 0
+
+        for chunk in self._read_chunks(extension):
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+
+    def collect_statistics(self):
+        """
+        Primera pasada: acumula las estadísticas de cada limpiador con imputación
+        y calcula sus valores de relleno globales. También anota las columnas que
+        son de texto en unos bloques y numéricas en otros (por ejemplo, una columna
+        'Unnamed:' vacía en el primer bloque), para leerlas como texto en la segunda.
+
+        :return: Diccionario {nombre del limpiador: valor de relleno}.
+        """
+        imputing_stages = [stage for stage, _ in self.stages if hasattr(stage, "collect_statistics")]
+        imputing_inputs = {getattr(stage, "input_column", stage.column) for stage in imputing_stages}
+        statistics = {}
+        column_kinds = {}
+
+        for chunk in self.iter_raw_chunks():
+            raw_columns = chunk.columns
+            with self._quiet():
+                chunk = self._clean_column_names(chunk)
+            for raw_column, column in zip(raw_columns, chunk.columns):
+                kinds = column_kinds.setdefault(raw_column, (column, set()))[1]
+                kinds.add(pd.api.types.is_string_dtype(chunk[column].dtype))
+            for stage in imputing_stages:
+                input_column = getattr(stage, "input_column", stage.column)
+                if input_column in chunk.columns:
+                    values = stage.clean_values(chunk[input_column], **self._rule_options(stage))
+                    statistics[stage] = combine_statistics(statistics.get(stage), stage.collect_statistics(values))
+
+        self.fill_values = {
+            stage.__name__: stage.fill_value_from_statistics(stage_statistics)
+            for stage, stage_statistics in statistics.items()
+        }
+        # Las columnas de entrada de las etapas con imputación se leen igual que
+        # en esta pasada, para que los valores de relleno sigan siendo válidos
+        self.text_columns = [
+            raw_column for raw_column, (column, kinds) in column_kinds.items()
+            if len(kinds) > 1 and column not in imputing_inputs
+        ]
+        print(f"✅ Estadísticas globales calculadas: {self.fill_values}")
+        return self.fill_values
+
+    def iter_cleaned_chunks(self):
+        """
+        Segunda pasada: limpia cada bloque con los valores de relleno globales.
+        Los duplicados de 'case_number' se eliminan también entre bloques.
+
+        :return: Generador de DataFrames limpios.
+        """
+        if self.fill_values is None:
+            self.collect_statistics()
+        self._seen_hashes = np.empty(0, dtype=np.uint64)
+        self._seen_keys = np.empty(0, dtype=object)
+        self._seen_null_key = False
+
+        for chunk in self.iter_raw_chunks():
+            with self._quiet():
+                for cleaner_class, method_name in self.stages:
+                    if cleaner_class is DuplicatesCleaner:
+                        chunk = self._remove_seen_duplicates(chunk)
+                        continue
+
+                    if cleaner_class.__name__ in self.fill_values:
+                        options = {"fill_value": self.fill_values[cleaner_class.__name__]}
+                    else:
+                        options = {}
+
+                    result = metrics.run_stage(cleaner_class, method_name, chunk,
+                                               cleaner_options=self._rule_options(cleaner_class), **options)
+                    if result is not None:
+                        chunk = result
+            yield chunk
+
+    def save_cleaned_data(self, output_path):
+        """
+        Limpia el archivo por bloques y los va escribiendo en CSV o Parquet.
+        La escritura es atómica: el archivo final solo aparece al terminar.
+
+        :param output_path: Ruta del archivo de salida (.csv o .parquet).
+        """
+        file_format = DataExporter.detect_format(output_path)
+        if file_format == "csv":
+            atomic_write(output_path, self._write_csv)
+        elif file_format == "parquet":
+            atomic_write(output_path, self._write_parquet)
+        else:
+            raise ValueError(f"StreamingCleaner solo escribe CSV o Parquet, no '{file_format}'")
+        print(f"✅ Datos limpios guardados en {output_path}")
+
+    def _rule_options(self, cleaner_class):
+        """
+        Argumentos con el paquete de reglas para las etapas que tienen reglas.
+
+        :param cleaner_class: Clase limpiadora.
+        :return: Diccionario de argumentos.
+        """
+        return {"rules": self.rules} if hasattr(cleaner_class, "rule_section") else {}
+
+    def _read_chunks(self, extension):
+        """
+        Devuelve los bloques de filas según el formato del archivo.
+
+        :param extension: Extensión del archivo en minúsculas.
+        :return: Iterador de DataFrames.
+        """
+        if extension == ".csv":
+            dtype = {column: str for column in self.text_columns} or None
+            return pd.read_csv(self.file_path, chunksize=self.chunksize, dtype=dtype)
+
+        if extension == ".parquet":
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(self.file_path)
+            return (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=self.chunksize))
+
+        if extension in (".feather", ".arrow"):
+            import pyarrow as pa
+
+            reader = pa.ipc.open_file(pa.memory_map(self.file_path))
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            return (
+                table.slice(start, self.chunksize).to_pandas()
+                for table in (pa.Table.from_batches([batch]) for batch in batches)
+                for start in range(0, table.num_rows, self.chunksize)
+            )
+
+        print(f"❌ El archivo {self.file_path} no se puede leer por bloques; se carga completo.")
+        with self._quiet():
+            loader = DataLoader(self.file_path)
+            loader.load_data()
+        df = loader.get_data()
+        return (df.iloc[start:start + self.chunksize] for start in range(0, len(df), self.chunksize))
+
+    def _clean_column_names(self, chunk):
+        """
+        Aplica ColumnCleaner al bloque si forma parte de las etapas.
+
+        :param chunk: Bloque de filas.
+        :return: Bloque con los nombres de columnas limpios.
+        """
+        for cleaner_class, method_name in self.stages:
+            if cleaner_class is ColumnCleaner:
+                cleaner = cleaner_class(chunk, copy=False)
+                getattr(cleaner, method_name)()
+                return cleaner.get_cleaned_data()
+        return chunk
+
+    def _remove_seen_duplicates(self, chunk):
+        """
+        Elimina los duplicados de 'case_number' dentro del bloque y los que ya
+        aparecieron en bloques anteriores, manteniendo la primera ocurrencia.
+
+        Los valores ya vistos se guardan ordenados por su hash de 64 bits junto
+        al valor original: el hash localiza el candidato con searchsorted y el
+        valor original confirma que es el mismo (una colisión de hashes no
+        elimina filas, y 2017 y "2017" son valores distintos, igual que con
+        drop_duplicates).
+
+        :param chunk: Bloque de filas.
+        :return: Bloque sin duplicados.
+        """
+        if "case_number" not in chunk.columns:
+            return chunk
+
+        keys = chunk["case_number"]
+        values = keys.to_numpy(dtype=object)
+        is_null = keys.isna().to_numpy()
+        hashes = pd.util.hash_array(values)
+
+        first = np.searchsorted(self._seen_hashes, hashes, side="left")
+        count = np.searchsorted(self._seen_hashes, hashes, side="right") - first
+        already_seen = np.zeros(len(keys), dtype=bool)
+        single = (count == 1) & ~is_null
+        already_seen[single] = self._seen_keys[first[single]] == values[single]
+        # Varios valores ya vistos con el mismo hash: se comparan uno a uno
+        for row in np.flatnonzero((count > 1) & ~is_null):
+            candidates = self._seen_keys[first[row]:first[row] + count[row]]
+            already_seen[row] = any(candidate == values[row] for candidate in candidates)
+        already_seen |= is_null & self._seen_null_key
+        keep = ~already_seen & ~keys.duplicated(keep="first").to_numpy()
+
+        # Se intercalan los valores nuevos en su posición en vez de reordenar todo
+        new = keep & ~is_null
+        order = np.argsort(hashes[new], kind="stable")
+        new_hashes = hashes[new][order]
+        positions = np.searchsorted(self._seen_hashes, new_hashes)
+        self._seen_hashes = np.insert(self._seen_hashes, positions, new_hashes)
+        self._seen_keys = np.insert(self._seen_keys, positions, values[new][order])
+        self._seen_null_key = self._seen_null_key or bool((keep & is_null).any())
+        return chunk[keep]
+
+    def _write_csv(self, output_path):
+        """
+        Escribe los bloques limpios en un CSV, la cabecera solo en el primero.
+
+        :param output_path: Ruta del archivo temporal.
+        """
+        for position, chunk in enumerate(self.iter_cleaned_chunks()):
+            chunk.to_csv(output_path, mode="w" if position == 0 else "a", header=position == 0, index=False)
+
+    def _write_parquet(self, output_path):
+        """
+        Escribe los bloques limpios en un Parquet con un esquema común:
+        las columnas de texto como cadenas y las enteras como float64
+        (un bloque con nulos en una columna entera la convierte en float).
+
+        :param output_path: Ruta del archivo temporal.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        schema = None
+        try:
+            for chunk in self.iter_cleaned_chunks():
+                chunk = self._stringify_objects(chunk)
+                if schema is None:
+                    schema = self._common_schema(pa.Table.from_pandas(chunk, preserve_index=False).schema)
+                    writer = pq.ParquetWriter(output_path, schema)
+                chunk = self._conform_to_schema(chunk, schema)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    @staticmethod
+    def _stringify_objects(chunk):
+        """
+        Convierte a texto los valores no nulos de las columnas de tipo object,
+        para que todas tengan el mismo tipo en todos los bloques.
+
+        :param chunk: Bloque limpio.
+        :return: Bloque con las columnas object como texto.
+        """
+        object_columns = [column for column in chunk.columns if chunk[column].dtype == object]
+        if not object_columns:
+            return chunk
+        chunk = chunk.copy(deep=False)
+        for column in object_columns:
+            chunk[column] = chunk[column].where(chunk[column].isna(), chunk[column].astype(str))
+        return chunk
+
+    @staticmethod
+    def _conform_to_schema(chunk, schema):
+        """
+        Convierte a texto las columnas que el esquema común guarda como texto
+        pero que en este bloque son numéricas (por ejemplo, porque están vacías),
+        y a número las que el esquema guarda como números pero que en este bloque
+        son de tipo object (por ejemplo, una columna imputada sin valores válidos).
+
+        :param chunk: Bloque limpio.
+        :param schema: Esquema común.
+        :return: Bloque compatible con el esquema.
+        """
+        import pyarrow as pa
+
+        columns = [
+            field.name for field in schema
+            if pa.types.is_string(field.type) and field.name in chunk.columns
+            and not pd.api.types.is_string_dtype(chunk[field.name].dtype)
+        ]
+        numeric_columns = [
+            field.name for field in schema
+            if pa.types.is_floating(field.type) and field.name in chunk.columns
+            and not pd.api.types.is_numeric_dtype(chunk[field.name].dtype)
+        ]
+        if not columns and not numeric_columns:
+            return chunk
+        chunk = chunk.copy(deep=False)
+        for column in columns:
+            chunk[column] = chunk[column].astype(object).where(chunk[column].isna(), chunk[column].astype(str))
+        for column in numeric_columns:
+            chunk[column] = pd.to_numeric(chunk[column]).astype("float64")
+        return chunk
+
+    @staticmethod
+    def _common_schema(schema):
+        """
+        Generaliza el esquema del primer bloque para que admita todos los demás.
+        Se conservan los metadatos de pandas, para que al leer el archivo las
+        columnas recuperen su tipo (por ejemplo, 'boolean' con nulos).
+
+        :param schema: Esquema Arrow del primer bloque.
+        :return: Esquema común.
+        """
+        import pyarrow as pa
+
+        fields = []
+        for field in schema:
+            if pa.types.is_null(field.type) or pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                field = field.with_type(pa.string())
+            elif pa.types.is_integer(field.type):
+                field = field.with_type(pa.float64())
+            fields.append(field)
+        return pa.schema(fields, metadata=schema.metadata)
+
+    def _quiet(self):
+        """
+        Silencia los mensajes de los limpiadores salvo en modo detallado, en el que
+        también se imprimen los de las etapas que se ejecutan con metrics.run_stage.
+
+        :return: Gestor de contexto.
+        """
+        if self.verbose:
+            return metrics.show_messages()
+        return contextlib.redirect_stdout(io.StringIO())
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    streaming_cleaner = StreamingCleaner("../data/raw/GSAF5.csv", chunksize=50_000)
+    streaming_cleaner.collect_statistics()
+    streaming_cleaner.save_cleaned_data("../data/processed/GSAF5_cleaned.parquet")
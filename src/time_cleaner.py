@@ -1,63 +1,144 @@
 import pandas as pd
-import re
+import numpy as np
+
+from data_exporter import DataExporter
+from group_imputer import GroupImputer
+from imputation_stats import count_values, mode_from_counts
+from rule_pack import load_rule_pack
+
+# Muestra de valores reales de la columna (ejemplo de uso y datos sintéticos de benchmarks)
+SAMPLE_TIMES = ['Unknown', '07h53', '14h00', '16h10', '07h00', None, '11h17', '12h00', '16h00', '11h30', '12h30', '15h00', '17h45', '10jh45', 'Early morning', '17h30', '13h12', '18h00', '07h30', '11hoo', '11h43', '10h15', '13h00', '20h00', 'Afternoon', '14h09', '10h40', '12h15', '19h12', 'Morning', '10h00', '15h20', '16h40', '15h30', '07h50', '12h50', '16h30', '11h15', '07h31', '14h45', '06h30', '10h30', '19h20', 'Dusk', '09h00', '13h20', '11h45', '06h40', '`17h00', '07h51', '11h46', '20h30', '12h23', '07h07', '16h39', '15h57', '14h30', '16h45', '10j30', '08h15', '08h56', '15h40', '19h00', '18h30', '07h45', '17h00', '07h58', '17h40', '09h00-10h00', '17h10', '09h36', '08h40', '06h00', 'Sunset', '10h45', 1415, '14h00-15h00', '14h15', '09h08', 'Evening', '15h59', '08h30', '12h20', '10h50', 'Midday', 'Early Morning', '09h40', '14h33', '12h58', '"Evening"', '16h15', '06h50', '10h20', '12h45', '11h55', '19h30', '22h20', '08h48', '16h21', '16h26', '18h45', 'Night', '01h00', '03h00', '13h40', '06h15', 'Before 10h00', '06h45', 'Early afternoon', '06h55', '13h45', '13h15', '09h29', '10h47', '14h11', '15h35', '14h40', '14h00  -15h00', 'Late afternoon', '16h50', '21h50', '17h35', '19h00, Dusk', '15h01', '23h30', '10h44', '13h19', '15h45', 'Shortly before 12h00', '17h34', '08h50', '02h00', '09h50', '9h00', '10h43', 'After noon', '15h15', '19h05', 1300, '14h30 / 15h30', '22h00', '16h20', '14h34', '15h25', '14h55', '17h46', 'Morning ', '15h49', 'Midnight', '09h30 / 10h00', '18h15', '04h00', '14h50', 'FATAL  (Wire netting installed at local beaches after this incident.)', '01h30', 'After midnight', 'Late afternon', '05h30', '08h58', '"Early evening"', 'Late Afternoon', '   ', 'Before daybreak', 'dusk', 'Before 10h30', '06h00 -- 07h00', '01h50', '17h00-18h00', '19h00-20h00']
 
 class TimeCleaner:
     """
     Clase para limpiar y dar formato a la columna 'time' del DataFrame.
     """
 
-    def __init__(self, df):
+    column = "time"
+    rule_section = "time"
+
+    def __init__(self, df, copy=True, rules=None):
         """
         Inicializa la clase con un DataFrame.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas).
+                      Por defecto el de config/rules.json (ver load_rule_pack).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
+        self.rules = load_rule_pack(rules)
 
-    def clean_time_column(self):
+    def clean_time_column(self, fill_value=None, group_by=None):
         """
         Limpia la columna 'time':
         - Convierte los valores a tres categorías: mañana ("M"), tarde ("T") y noche ("N")
         - Rellena valores nulos o no concluyentes con "Unknown"
         - Rellena valores nulos con la moda
+
+        :param fill_value: Valor de relleno ya calculado (por ejemplo, sobre todo el archivo
+                           en StreamingCleaner). Por defecto se calcula sobre esta columna.
+        :param group_by: Niveles de agrupación para rellenar con la moda de cada grupo
+                         (ver GroupImputer; por ejemplo, IMPUTATION_LEVELS). fill_value
+                         queda como valor para las filas sin grupo con datos suficientes.
         """
         if "time" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
-
-            # Función de limpieza con apply()
-            def clean_value(value):
-                if pd.isna(value) or value in ["Unknown", "   ", "FATAL  (Wire netting installed at local beaches after this incident.)"]:
-                    return "Unknown"  # Convertimos valores problemáticos a "Unknown"
-                value = str(value).strip().lower()
-                if re.search(r'\b(morning|early morning|midday|before|am|dawn)\b', value):
-                    return "M"  # Mañana
-                elif re.search(r'\b(afternoon|evening|pm|dusk|sunset|late afternoon)\b', value):
-                    return "T"  # Tarde
-                elif re.search(r'\b(night|midnight|after midnight)\b', value):
-                    return "N"  # Noche
-                else:
-                    try:
-                        hour = int(re.search(r'\d{1,2}', value).group())
-                        if 5 <= hour < 12:
-                            return "M"  # Mañana
-                        elif 12 <= hour < 18:
-                            return "T"  # Tarde
-                        else:
-                            return "N"  # Noche
-                    except:
-                        return "Unknown"  # Si no se puede determinar, se marca como "Unknown"
-
-            self.cleaned_df["time"] = self.cleaned_df["time"].apply(clean_value)
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            time = self.clean_values(self.cleaned_df["time"], self.rules)
 
             # Rellenar valores nulos con la moda
-            mode_value = self.cleaned_df["time"].mode()[0]
-            self.cleaned_df["time"] = self.cleaned_df["time"].fillna(mode_value)
+            if fill_value is None:
+                fill_value = self.fill_value_from_statistics(self.collect_statistics(time))
+            if group_by is not None:
+                fill_value = GroupImputer(group_by).fill_values(time, self.cleaned_df, fallback=fill_value)
+            self.cleaned_df["time"] = self.fill_missing(time, fill_value)
 
             print("✅ Columna 'time' limpiada.")
         else:
             print("❌ La columna 'time' no existe en el DataFrame.")
 
+    @staticmethod
+    def clean_values(times, rules=None):
+        """
+        Clasifica los valores de 'time' sin rellenar los nulos.
+
+        :param times: Serie de Pandas con los valores originales.
+        :param rules: Paquete de reglas (por defecto el de config/rules.json).
+        :return: Serie limpia.
+        """
+        return TimeCleaner.classify_times(times, rules)
+
+    @staticmethod
+    def classify_times(times, rules=None):
+        """
+        Clasifica una serie de horas en "M", "T", "N" o "Unknown" de forma vectorizada.
+        Las palabras de cada franja (en orden de prioridad) y los intervalos de horas
+        salen de la sección 'time' del paquete de reglas.
+
+        :param times: Serie de Pandas con los valores originales de 'time'.
+        :param rules: Paquete de reglas (por defecto el de config/rules.json).
+        :return: Serie con las categorías.
+        """
+        rules = load_rule_pack(rules)
+        unknown = times.isna() | times.isin(rules.time_invalid)
+
+        # El patrón se evalúa una vez por valor distinto y se reparte con los códigos
+        codes, uniques = pd.factorize(times.astype(str))
+        text = pd.Series(uniques, dtype=object).str.strip().str.lower()
+        parts = text.str.extract(rules.time_pattern)
+        # int() por valor único: también entiende dígitos no ASCII, como el re original
+        hour = parts["hour"].map({value: int(value) for value in parts["hour"].dropna().unique()})
+
+        # Prioridad: franjas por palabras, intervalos de horas y cualquier otra hora
+        unique_categories = np.select(
+            [parts[group].notna() for group, _ in rules.time_periods]
+            + [(hour >= start) & (hour < end) for start, end, _ in rules.time_hours]
+            + [hour.notna()],
+            [category for _, category in rules.time_periods]
+            + [category for _, _, category in rules.time_hours]
+            + [rules.time_other_hours],
+            default="Unknown",  # Si no se puede determinar, se marca como "Unknown"
+        )
+        categories = np.append(unique_categories, "Unknown")[codes]
+        categories[unknown.to_numpy()] = "Unknown"
+        return pd.Series(categories, index=times.index, name=times.name)
+
+    @staticmethod
+    def collect_statistics(values):
+        """
+        Calcula la estadística parcial de la columna limpia (conteos para la moda).
+
+        :param values: Serie devuelta por clean_values().
+        :return: Serie con el número de apariciones por valor.
+        """
+        return count_values(values)
+
+    @staticmethod
+    def fill_value_from_statistics(statistics):
+        """
+        Calcula el valor de relleno a partir de las estadísticas (combinadas) de la columna.
+
+        :param statistics: Conteos devueltos por collect_statistics().
+        :return: La moda.
+        """
+        return mode_from_counts(statistics)
+
+    @staticmethod
+    def fill_missing(values, fill_value):
+        """
+        Rellena los valores nulos con el valor indicado.
+
+        :param values: Serie devuelta por clean_values().
+        :param fill_value: Valor de relleno (si es None no se rellena).
+        :return: Serie rellenada.
+        """
+        if fill_value is None:
+            return values
+        return values.fillna(fill_value)
+
     def get_cleaned_data(self):
         """
         Devuelve el DataFrame con la columna 'time' limpia.
@@ -66,14 +147,16 @@ class TimeCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
@@ -81,7 +164,7 @@ class TimeCleaner:
 # Ejemplo de uso
 if __name__ == "__main__":
     sample_data = pd.DataFrame({
-        "time": ['Unknown', '07h53', '14h00', '16h10', '07h00', None, '11h17', '12h00', '16h00', '11h30', '12h30', '15h00', '17h45', '10jh45', 'Early morning', '17h30', '13h12', '18h00', '07h30', '11hoo', '11h43', '10h15', '13h00', '20h00', 'Afternoon', '14h09', '10h40', '12h15', '19h12', 'Morning', '10h00', '15h20', '16h40', '15h30', '07h50', '12h50', '16h30', '11h15', '07h31', '14h45', '06h30', '10h30', '19h20', 'Dusk', '09h00', '13h20', '11h45', '06h40', '`17h00', '07h51', '11h46', '20h30', '12h23', '07h07', '16h39', '15h57', '14h30', '16h45', '10j30', '08h15', '08h56', '15h40', '19h00', '18h30', '07h45', '17h00', '07h58', '17h40', '09h00-10h00', '17h10', '09h36', '08h40', '06h00', 'Sunset', '10h45', 1415, '14h00-15h00', '14h15', '09h08', 'Evening', '15h59', '08h30', '12h20', '10h50', 'Midday', 'Early Morning', '09h40', '14h33', '12h58', '"Evening"', '16h15', '06h50', '10h20', '12h45', '11h55', '19h30', '22h20', '08h48', '16h21', '16h26', '18h45', 'Night', '01h00', '03h00', '13h40', '06h15', 'Before 10h00', '06h45', 'Early afternoon', '06h55', '13h45', '13h15', '09h29', '10h47', '14h11', '15h35', '14h40', '14h00  -15h00', 'Late afternoon', '16h50', '21h50', '17h35', '19h00, Dusk', '15h01', '23h30', '10h44', '13h19', '15h45', 'Shortly before 12h00', '17h34', '08h50', '02h00', '09h50', '9h00', '10h43', 'After noon', '15h15', '19h05', 1300, '14h30 / 15h30', '22h00', '16h20', '14h34', '15h25', '14h55', '17h46', 'Morning ', '15h49', 'Midnight', '09h30 / 10h00', '18h15', '04h00', '14h50', 'FATAL  (Wire netting installed at local beaches after this incident.)', '01h30', 'After midnight', 'Late afternon', '05h30', '08h58', '"Early evening"', 'Late Afternoon', '   ', 'Before daybreak', 'dusk', 'Before 10h30', '06h00 -- 07h00', '01h50', '17h00-18h00', '19h00-20h00']
+        "time": SAMPLE_TIMES
     })
 
     cleaner = TimeCleaner(sample_data)
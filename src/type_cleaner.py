@@ -1,36 +1,50 @@
 import pandas as pd
 
+from data_exporter import DataExporter
+from rule_pack import load_rule_pack
+from value_mapper import ValueMapper
+
 class TypeCleaner:
     """
     Clase para limpiar la columna 'type' del DataFrame.
     """
 
-    def __init__(self, df):
+    column = "type"
+    rule_section = "type"
+
+    def __init__(self, df, copy=True, rules=None):
         """
         Inicializa la clase con un DataFrame.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
+        :param rules: Paquete de reglas (RulePack o ruta de un archivo de reglas).
+                      Por defecto el de config/rules.json (ver load_rule_pack).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
+        self.rules = load_rule_pack(rules)
 
     def clean_type_column(self):
         """
         Limpia la columna 'type':
         - Elimina espacios en blanco al inicio y final
-        - Convierte valores dudosos en NaN
+        - Convierte valores dudosos (reglas 'type.invalid') en NaN
         - Normaliza valores comunes
         """
         if "type" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            invalid = self.rules.type_invalid
 
-            # Función de limpieza con apply()
+            # Función de limpieza (se aplica una sola vez por valor distinto)
             def clean_value(value):
-                if pd.isna(value) or value in ["?", "Unconfirmed", "Unverified", "Invalid", "Under investigation"]:
+                if pd.isna(value) or value in invalid:
                     return None  # Convertimos valores problemáticos a NaN
                 return str(value).strip()  # Eliminamos espacios extra
 
-            self.cleaned_df["type"] = self.cleaned_df["type"].apply(clean_value)
+            self.cleaned_df["type"] = ValueMapper(clean_value).map(self.cleaned_df["type"])
 
             print("✅ Columna 'type' limpiada.")
         else:
@@ -44,14 +58,16 @@ class TypeCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
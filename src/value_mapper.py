@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+class ValueMapper:
+    """
+    Clase para aplicar una función de limpieza una sola vez por cada valor distinto
+    de una columna, en lugar de una vez por fila como hace Series.apply.
+    """
+
+    def __init__(self, func, memoize=False):
+        """
+        Inicializa la clase con la función de limpieza.
+
+        :param func: Función que recibe un valor y devuelve el valor limpio.
+        :param memoize: Si es True guarda los resultados entre llamadas a map()
+                        (útil al limpiar varios bloques con la misma función).
+        """
+        self.func = func
+        self.memoize = memoize
+        self.cache = {}
+
+    def map(self, series):
+        """
+        Factoriza la serie, limpia cada valor distinto y reparte el resultado
+        a todas las filas mediante los códigos enteros.
+
+        :param series: Serie de Pandas a limpiar.
+        :return: Serie limpia con el mismo índice y nombre.
+        """
+        codes, uniques = pd.factorize(series)
+
+        # La última posición guarda el resultado para los nulos (código -1)
+        results = np.empty(len(uniques) + 1, dtype=object)
+        for position, value in enumerate(uniques):
+            results[position] = self._clean(value)
+        results[-1] = self.func(np.nan)
+
+        # El tipo se infiere sobre los valores distintos (mismo resultado que apply())
+        # y después se reparten a todas las filas con los códigos
+        unique_results = pd.Series(results).infer_objects()
+        mapped = unique_results.take(codes)
+        mapped.index = series.index
+        mapped.name = series.name
+        return mapped
+
+    def clear_cache(self):
+        """
+        Vacía la caché de resultados.
+        """
+        self.cache.clear()
+
+    def _clean(self, value):
+        """
+        Limpia un valor usando la caché si está activada.
+
+        :param value: Valor distinto de la columna.
+        :return: Valor limpio.
+        """
+        if not self.memoize:
+            return self.func(value)
+        if value not in self.cache:
+            self.cache[value] = self.func(value)
+        return self.cache[value]
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    sample_data = pd.Series([" USA", "USA ", None, "ENGLAND", " USA"] * 3)
+
+    mapper = ValueMapper(lambda value: None if pd.isna(value) else str(value).strip(), memoize=True)
+    print("🔹 Antes de la limpieza:", sample_data.unique())
+    print("🔹 Después de la limpieza:", mapper.map(sample_data).unique())
+    print("🔹 Valores en caché:", len(mapper.cache))
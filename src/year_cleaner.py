@@ -1,50 +1,111 @@
 import pandas as pd
 import numpy as np
 
+from data_exporter import DataExporter
+from group_imputer import GroupImputer
+from imputation_stats import mean_from_sums, sum_values
+from value_mapper import ValueMapper
+
 class YearCleaner:
     """
     Clase para limpiar la columna 'year' del DataFrame.
     """
 
-    def __init__(self, df):
+    column = "year"
+
+    def __init__(self, df, copy=True):
         """
         Inicializa la clase con un DataFrame.
         
         :param df: DataFrame de Pandas con los datos originales.
+        :param copy: Si es False no se copia el DataFrame de entrada y solo se
+                     reemplazan las columnas que cambian (lo usa CleaningPipeline).
         """
-        self.original_df = df.copy()  # Guardamos copia del DataFrame original
+        self.copy = copy
+        self.original_df = df.copy() if copy else df  # Guardamos copia del DataFrame original
         self.cleaned_df = None
 
-    def clean_year_column(self):
+    def clean_year_column(self, fill_value=None, group_by=None):
         """
         Limpia la columna 'year':
         - Convierte valores a enteros de 4 dígitos
         - Elimina puntos finales
         - Rellena valores nulos o extraños con la media
+
+        :param fill_value: Valor de relleno ya calculado (por ejemplo, sobre todo el archivo
+                           en StreamingCleaner). Por defecto se calcula sobre esta columna.
+        :param group_by: Niveles de agrupación para rellenar con la media de cada grupo
+                         (ver GroupImputer; por ejemplo, IMPUTATION_LEVELS). fill_value
+                         queda como valor para las filas sin grupo con datos suficientes.
         """
         if "year" in self.original_df.columns:
-            self.cleaned_df = self.original_df.copy()
-
-            # Convertir valores a enteros de 4 dígitos y eliminar puntos finales
-            def clean_value(value):
-                try:
-                    year = int(value)
-                    if year < 1000 or year > 9999:
-                        return np.nan  # Consideramos valores fuera del rango como NaN
-                    return year
-                except (ValueError, TypeError):
-                    return np.nan  # Convertimos valores problemáticos a NaN
-
-            self.cleaned_df["year"] = self.cleaned_df["year"].apply(clean_value)
+            self.cleaned_df = self.original_df.copy(deep=self.copy)
+            year = self.clean_values(self.cleaned_df["year"])
 
             # Rellenar valores nulos con la media
-            mean_value = int(self.cleaned_df["year"].mean())
-            self.cleaned_df["year"].fillna(mean_value, inplace=True)
+            if fill_value is None:
+                fill_value = self.fill_value_from_statistics(self.collect_statistics(year))
+            if group_by is not None:
+                fill_value = GroupImputer(group_by, strategy="mean").fill_values(year, self.cleaned_df, fallback=fill_value)
+            self.cleaned_df["year"] = self.fill_missing(year, fill_value)
 
             print("✅ Columna 'year' limpiada y valores nulos rellenados con la media.")
         else:
             print("❌ La columna 'year' no existe en el DataFrame.")
 
+    @staticmethod
+    def clean_values(years):
+        """
+        Convierte los valores de 'year' a enteros de 4 dígitos sin rellenar los nulos.
+
+        :param years: Serie de Pandas con los valores originales.
+        :return: Serie limpia.
+        """
+        # Convertir valores a enteros de 4 dígitos y eliminar puntos finales
+        def clean_value(value):
+            try:
+                year = int(value)
+                if year < 1000 or year > 9999:
+                    return np.nan  # Consideramos valores fuera del rango como NaN
+                return year
+            except (ValueError, TypeError):
+                return np.nan  # Convertimos valores problemáticos a NaN
+
+        return ValueMapper(clean_value).map(years)
+
+    @staticmethod
+    def collect_statistics(values):
+        """
+        Calcula la estadística parcial de la columna limpia (suma y número de valores).
+
+        :param values: Serie devuelta por clean_values().
+        :return: Tupla (suma, número de valores).
+        """
+        return sum_values(values)
+
+    @staticmethod
+    def fill_value_from_statistics(statistics):
+        """
+        Calcula el valor de relleno a partir de las estadísticas (combinadas) de la columna.
+
+        :param statistics: Tupla devuelta por collect_statistics().
+        :return: La media truncada a entero.
+        """
+        return mean_from_sums(statistics)
+
+    @staticmethod
+    def fill_missing(values, fill_value):
+        """
+        Rellena los valores nulos con el valor indicado.
+
+        :param values: Serie devuelta por clean_values().
+        :param fill_value: Valor de relleno (si es None no se rellena).
+        :return: Serie rellenada.
+        """
+        if fill_value is None:
+            return values
+        return values.fillna(fill_value)
+
     def get_cleaned_data(self):
         """
         Devuelve el DataFrame con la columna 'year' limpia.
@@ -53,14 +114,16 @@ class YearCleaner:
         """
         return self.cleaned_df
 
-    def save_cleaned_data(self, output_path):
+    def save_cleaned_data(self, output_path, **options):
         """
-        Guarda el DataFrame procesado en un archivo Excel.
+        Guarda el DataFrame procesado. El formato (Parquet, Feather, CSV o Excel)
+        se deduce de la extensión del archivo.
         
-        :param output_path: Ruta donde guardar el archivo Excel.
+        :param output_path: Ruta donde guardar el archivo.
+        :param options: Opciones de DataExporter.save (file_format, compression, chunksize).
         """
         if self.cleaned_df is not None:
-            self.cleaned_df.to_excel(output_path, index=False, engine="openpyxl")
+            DataExporter(self.cleaned_df).save(output_path, **options)
             print(f"✅ Datos limpios guardados en {output_path}")
         else:
             print("❌ No hay datos limpios para guardar.")
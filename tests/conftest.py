@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Los módulos de src y el generador de los benchmarks se importan por su nombre
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "benchmarks")]
+
+from synthetic_gsaf import make_synthetic_gsaf
+
+@pytest.fixture(scope="session")
+def raw_gsaf():
+    """
+    GSAF sintético sin limpiar (con duplicados y valores sucios reales).
+    Los tests no deben modificarlo.
+    """
+    return make_synthetic_gsaf(3000, seed=0)
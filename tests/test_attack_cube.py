@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from attack_cube import AttackCube, CUBE_DIMENSIONS
+from cleaning_pipeline import CleaningPipeline
+from dtype_optimizer import INTEGER_COLUMNS
+
+@pytest.fixture(scope="module")
+def cleaned(raw_gsaf):
+    pipeline = CleaningPipeline(raw_gsaf)
+    pipeline.run()
+    df = pipeline.get_cleaned_data()
+    month = pd.to_datetime(df["date"], errors="coerce", format="mixed").dt.month
+    return df.assign(month=month.astype(INTEGER_COLUMNS["month"]))
+
+@pytest.fixture(scope="module")
+def cube(cleaned):
+    # Se construye en dos partes para comprobar también que append suma las celdas
+    return AttackCube(cleaned.iloc[:1000]).append(cleaned.iloc[1000:])
+
+@pytest.fixture(scope="module")
+def flat(cleaned):
+    # Las etiquetas del cubo son object (salvo year y month), como las dimensiones sin categorías
+    return cleaned.astype({column: object for column in CUBE_DIMENSIONS if column not in INTEGER_COLUMNS})
+
+@pytest.mark.parametrize("dimensions", [["country"], ["country", "year"], ["species", "sex"], ["month"], ["state", "type"]])
+def test_rollup_matches_groupby(cube, flat, dimensions):
+    """
+    rollup da lo mismo que groupby().size() y groupby()['fatal'].sum().
+    """
+    pd.testing.assert_series_equal(cube.rollup(dimensions), flat.groupby(dimensions).size().rename("attacks"),
+                                   check_index_type=False)
+    expected_fatal = flat.groupby(dimensions)["fatal"].sum().astype("int64").rename("fatal")
+    pd.testing.assert_series_equal(cube.rollup(dimensions, measure="fatal"), expected_fatal, check_index_type=False)
+
+def test_rollup_with_filters_matches_groupby(cube, flat):
+    """
+    Los filtros equivalen a filtrar las filas antes del groupby y sin dimensiones se obtiene el total.
+    """
+    subset = flat[flat["country"].isin(["USA", "AUSTRALIA"]) & (flat["year"] >= 2000)]
+    result = cube.rollup("month", country=["USA", "AUSTRALIA"], year=range(2000, 2030))
+
+    pd.testing.assert_series_equal(result, subset.groupby("month").size().rename("attacks"), check_index_type=False)
+    assert cube.rollup() == len(flat)
+    assert cube.rollup(measure="fatal") == int(flat["fatal"].sum())
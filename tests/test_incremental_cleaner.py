@@ -0,0 +1,41 @@
+import pandas as pd
+
+from cleaning_pipeline import CleaningPipeline
+from data_exporter import DataExporter
+from data_loader import DataLoader
+from incremental_cleaner import IncrementalCleaner
+from synthetic_gsaf import make_synthetic_gsaf
+
+def clean_full(path):
+    loader = DataLoader(str(path))
+    loader.load_data()
+    pipeline = CleaningPipeline(loader.get_data())
+    pipeline.run()
+    return pipeline.get_cleaned_data()
+
+def refresh(raw_path, state_path):
+    cleaner = IncrementalCleaner(str(raw_path), str(state_path))
+    cleaner.refresh()
+    return cleaner.get_cleaned_data()
+
+def test_incremental_matches_full(raw_gsaf, tmp_path):
+    """
+    La primera limpieza, una repetida sin cambios y una con filas nuevas,
+    modificadas y eliminadas dan lo mismo que limpiar todo con CleaningPipeline.
+    """
+    raw_path = tmp_path / "raw.parquet"
+    state_path = tmp_path / "state.pkl"
+
+    DataExporter(raw_gsaf).save(str(raw_path))
+    pd.testing.assert_frame_equal(refresh(raw_path, state_path), clean_full(raw_path))
+    pd.testing.assert_frame_equal(refresh(raw_path, state_path), clean_full(raw_path))
+
+    new_rows = make_synthetic_gsaf(200, seed=1)
+    new_rows["Case Number"] = [f"NEW{i}" for i in range(len(new_rows))]
+    updated = pd.concat([new_rows, raw_gsaf], ignore_index=True)
+    updated.loc[300:320, "Time"] = "Night"
+    updated.loc[400:410, "Species "] = "?"
+    updated = updated.drop(index=range(1000, 1100)).reset_index(drop=True)
+
+    DataExporter(updated).save(str(raw_path))
+    pd.testing.assert_frame_equal(refresh(raw_path, state_path), clean_full(raw_path))
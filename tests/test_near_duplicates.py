@@ -0,0 +1,23 @@
+import pandas as pd
+
+from near_duplicates import NearDuplicateDetector
+
+def test_sibling_cases_are_never_grouped():
+    """
+    Los casos .a y .b del mismo día no acaban en el mismo grupo aunque los una
+    una tercera fila; la copia .R del caso sin sufijo sí es un casi duplicado.
+    """
+    df = pd.DataFrame({
+        "case_number": ["2016.07.16.a", "2016.07.16.b", "2016.07.16", "2016.07.16.R"],
+        "date": ["16-Jul-2016"] * 4,
+        "year": [2016] * 4,
+        "country": ["USA"] * 4,
+        "location": ["Cocoa Beach"] * 4,
+        "name": ["male"] * 4,
+        "activity": ["Surfing"] * 4,
+        "injury": ["Bite to left foot"] * 4,
+    })
+    detector = NearDuplicateDetector(df)
+
+    assert detector.find_clusters()["row"].tolist() == [2, 3]
+    assert detector.collapse(detector.clusters)["case_number"].tolist() == ["2016.07.16.a", "2016.07.16.b", "2016.07.16"]
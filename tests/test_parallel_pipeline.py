@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+
+from cleaning_pipeline import CleaningPipeline
+from group_imputer import IMPUTATION_LEVELS
+from parallel_pipeline import ParallelCleaningPipeline
+
+@pytest.mark.parametrize("group_by", [None, IMPUTATION_LEVELS])
+def test_parallel_matches_serial(raw_gsaf, group_by):
+    """
+    Repartir las etapas en un pool de procesos da el mismo DataFrame que
+    ejecutarlas en orden, también con imputación por grupos.
+    """
+    serial = CleaningPipeline(raw_gsaf, group_by=group_by)
+    serial.run()
+    parallel = ParallelCleaningPipeline(raw_gsaf, max_workers=2, min_rows=0, group_by=group_by)
+    parallel.run()
+
+    pd.testing.assert_frame_equal(parallel.get_cleaned_data(), serial.get_cleaned_data())
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from cleaning_pipeline import CleaningPipeline
+from dtype_optimizer import DtypeOptimizer
+from streaming_cleaner import StreamingCleaner
+
+def clean_full(df):
+    pipeline = CleaningPipeline(df)
+    pipeline.run()
+    return pipeline.get_cleaned_data()
+
+def test_streaming_matches_in_memory(raw_gsaf, tmp_path):
+    """
+    Limpiar el CSV por bloques y optimizar los tipos al leerlo da el mismo
+    DataFrame que CleaningPipeline sobre el archivo completo (incluidos los
+    duplicados entre bloques y la imputación con estadísticas globales).
+    """
+    raw_path = tmp_path / "raw.csv"
+    output_path = tmp_path / "cleaned.parquet"
+    raw_gsaf.to_csv(raw_path, index=False)
+
+    StreamingCleaner(str(raw_path), chunksize=700).save_cleaned_data(str(output_path))
+    optimizer = DtypeOptimizer(pd.read_parquet(output_path))
+    optimizer.optimize_dtypes()
+
+    expected = clean_full(pd.read_csv(raw_path)).reset_index(drop=True)
+    pd.testing.assert_frame_equal(optimizer.get_cleaned_data(), expected)
+
+def test_streaming_keeps_distinct_case_number_types():
+    """
+    Los duplicados entre bloques se comparan por el valor exacto: 2017 y "2017"
+    son casos distintos y un valor ya visto se elimina aunque llegue en otro bloque.
+    """
+    cleaner = StreamingCleaner("unused.csv")
+    first = pd.DataFrame({"case_number": pd.Series([2017, "a", None, "a"], dtype=object)})
+    second = pd.DataFrame({"case_number": pd.Series(["2017", "a", None, 2017, "b"], dtype=object)})
+
+    assert cleaner._remove_seen_duplicates(first)["case_number"].tolist() == [2017, "a", None]
+    assert cleaner._remove_seen_duplicates(second)["case_number"].tolist() == ["2017", "b"]